@@ -1,87 +1,258 @@
+import datetime
+
 from django.contrib import admin
+from django.db.models import Q
+from django.utils.formats import date_format
 from .models import (
     Institution, IFRS17Submission, ComplianceAlert, InsuranceRevenue, 
     CSMProfitability, DiscountRates, ReinsuranceHeld, IFRS4Transition, 
-    ContractGrouping, DataQualityCheck
+    ContractGrouping, DataQualityCheck, FXRate, FilingCalendar, SubmissionEvent,
+    Reinsurer, ReinsuranceExposure, CSMRollforward, RiskAdjustmentReconciliation, LossComponentAnalysis
 )
+from .lookups import distinct_values
+from .pagination import EstimatedCountPaginator
+from .reviews import REVIEW_ACTIONS, review_submissions, resolve_alerts
+from .search import search_ids
+from .workflow import record_event
+
+
+class FullTextSearchMixin:
+    """Answer changelist searches from the full-text index instead of LIKE scans."""
+    search_kind = None
+    
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return super().get_search_results(request, queryset, search_term)
+        matches = Q(pk__in=search_ids(self.search_kind, search_term))
+        if self.search_kind != 'institution':
+            matches |= Q(institution_id__in=search_ids('institution', search_term))
+        return queryset.filter(matches), False
+
+
+class CachedDistinctFilter(admin.SimpleListFilter):
+    """List filter offering a field's distinct values from the cache rather than a DISTINCT scan per page."""
+    
+    def lookups(self, request, model_admin):
+        return [
+            (str(value), date_format(value) if isinstance(value, datetime.date) else value)
+            for value in distinct_values(model_admin.model, self.parameter_name)
+        ]
+    
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.parameter_name: self.value()})
+        return queryset
+
+
+def cached_distinct_filter(field, title=None):
+    return type(f'{field}_filter', (CachedDistinctFilter,), {
+        'title': title or field.replace('_', ' '),
+        'parameter_name': field,
+    })
+
+
+class InstitutionScopedAdmin(admin.ModelAdmin):
+    """
+    Changelist defaults for tables with a row per institution: the institution
+    is joined in the list query, picked with an autocomplete widget, and
+    totals are estimated instead of counted on every page.
+    """
+    list_select_related = ['institution']
+    autocomplete_fields = ['institution']
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
 
 
 @admin.register(Institution)
-class InstitutionAdmin(admin.ModelAdmin):
+class InstitutionAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_kind = 'institution'
     list_display = ['name', 'registration_number', 'institution_type', 'status', 'contact_person', 'email']
-    list_filter = ['institution_type', 'status', 'country']
+    list_filter = ['institution_type', 'status', cached_distinct_filter('country')]
     search_fields = ['name', 'registration_number', 'license_number', 'contact_person', 'email']
     ordering = ['name']
+    show_full_result_count = False
 
 
 @admin.register(IFRS17Submission)
-class IFRS17SubmissionAdmin(admin.ModelAdmin):
-    list_display = ['institution', 'reporting_period', 'status', 'contractual_service_margin', 'total_liabilities', 'submission_date']
-    list_filter = ['status', 'reporting_period', 'institution__institution_type']
+class IFRS17SubmissionAdmin(FullTextSearchMixin, InstitutionScopedAdmin):
+    search_kind = 'submission'
+    list_display = ['institution', 'reporting_period', 'status', 'version', 'is_current', 'contractual_service_margin', 'total_liabilities', 'submission_date']
+    list_filter = ['status', 'is_current', cached_distinct_filter('reporting_period'), 'institution__institution_type']
     search_fields = ['institution__name', 'notes']
     ordering = ['-submission_date']
-    date_hierarchy = 'submission_date'
+    # Status only changes through the review actions so every move is logged
+    readonly_fields = ['status', 'blob', 'version', 'is_current', 'supersedes']
+    actions = ['start_review', 'approve', 'reject']
+    
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if not change:
+            # Start the history of submissions keyed in by hand, as uploads do
+            record_event(obj, 'uploaded', request.user, from_status='', detail='Entered in admin')
+    
+    def _review(self, request, queryset, action):
+        ids = list(queryset.values_list('id', flat=True))
+        changed = review_submissions(ids, action, request.user)
+        status = REVIEW_ACTIONS[action].replace('_', ' ')
+        self.message_user(request, f'{len(changed)} submission(s) marked {status}; {len(ids) - len(changed)} skipped.')
+    
+    @admin.action(description='Start review of selected submissions', permissions=['change'])
+    def start_review(self, request, queryset):
+        self._review(request, queryset, 'start_review')
+    
+    @admin.action(description='Approve selected submissions', permissions=['change'])
+    def approve(self, request, queryset):
+        self._review(request, queryset, 'approve')
+    
+    @admin.action(description='Reject selected submissions', permissions=['change'])
+    def reject(self, request, queryset):
+        self._review(request, queryset, 'reject')
 
 
 @admin.register(ComplianceAlert)
-class ComplianceAlertAdmin(admin.ModelAdmin):
+class ComplianceAlertAdmin(FullTextSearchMixin, InstitutionScopedAdmin):
+    search_kind = 'alert'
     list_display = ['institution', 'title', 'alert_type', 'severity', 'is_resolved', 'created_at']
     list_filter = ['alert_type', 'severity', 'is_resolved', 'created_at']
     search_fields = ['title', 'description', 'institution__name']
     ordering = ['-created_at']
+    actions = ['resolve']
+    
+    @admin.action(description='Resolve selected alerts', permissions=['change'])
+    def resolve(self, request, queryset):
+        ids = list(queryset.values_list('id', flat=True))
+        changed = resolve_alerts(ids, request.user)
+        self.message_user(request, f'{len(changed)} alert(s) resolved; {len(ids) - len(changed)} already resolved.')
 
 
 @admin.register(InsuranceRevenue)
-class InsuranceRevenueAdmin(admin.ModelAdmin):
+class InsuranceRevenueAdmin(InstitutionScopedAdmin):
     list_display = ['institution', 'reporting_period', 'currency', 'total_revenue', 'service_performance_ratio', 'created_at']
-    list_filter = ['currency', 'reporting_period', 'institution__institution_type', 'created_at']
+    list_filter = ['currency', cached_distinct_filter('reporting_period'), 'institution__institution_type', 'created_at']
     search_fields = ['institution__name', 'notes']
     ordering = ['-reporting_period']
 
 
 @admin.register(CSMProfitability)
-class CSMProfitabilityAdmin(admin.ModelAdmin):
+class CSMProfitabilityAdmin(InstitutionScopedAdmin):
     list_display = ['institution', 'reporting_period', 'currency', 'closing_csm', 'csm_profit_margin', 'csm_roi', 'created_at']
-    list_filter = ['currency', 'reporting_period', 'institution__institution_type', 'created_at']
+    list_filter = ['currency', cached_distinct_filter('reporting_period'), 'institution__institution_type', 'created_at']
     search_fields = ['institution__name', 'notes']
     ordering = ['-reporting_period']
 
 
 @admin.register(DiscountRates)
-class DiscountRatesAdmin(admin.ModelAdmin):
+class DiscountRatesAdmin(InstitutionScopedAdmin):
     list_display = ['institution', 'reporting_period', 'currency', 'total_discount_rate', 'net_finance_result', 'created_at']
-    list_filter = ['currency', 'reporting_period', 'institution__institution_type', 'created_at']
+    list_filter = ['currency', cached_distinct_filter('reporting_period'), 'institution__institution_type', 'created_at']
     search_fields = ['institution__name', 'notes']
     ordering = ['-reporting_period']
 
 
 @admin.register(ReinsuranceHeld)
-class ReinsuranceHeldAdmin(admin.ModelAdmin):
+class ReinsuranceHeldAdmin(InstitutionScopedAdmin):
     list_display = ['institution', 'reporting_period', 'currency', 'total_reinsurance_held', 'risk_transfer_ratio', 'created_at']
-    list_filter = ['currency', 'reporting_period', 'institution__institution_type', 'created_at']
+    list_filter = ['currency', cached_distinct_filter('reporting_period'), 'institution__institution_type', 'created_at']
     search_fields = ['institution__name', 'notes']
     ordering = ['-reporting_period']
 
 
 @admin.register(IFRS4Transition)
-class IFRS4TransitionAdmin(admin.ModelAdmin):
+class IFRS4TransitionAdmin(InstitutionScopedAdmin):
     list_display = ['institution', 'reporting_period', 'currency', 'implementation_status', 'equity_impact', 'created_at']
-    list_filter = ['currency', 'implementation_status', 'reporting_period', 'institution__institution_type', 'created_at']
+    list_filter = ['currency', 'implementation_status', cached_distinct_filter('reporting_period'), 'institution__institution_type', 'created_at']
     search_fields = ['institution__name', 'notes']
     ordering = ['-reporting_period']
 
 
 @admin.register(ContractGrouping)
-class ContractGroupingAdmin(admin.ModelAdmin):
+class ContractGroupingAdmin(InstitutionScopedAdmin):
     list_display = ['institution', 'reporting_period', 'currency', 'product_line', 'contract_type', 'number_of_contracts', 'created_at']
-    list_filter = ['currency', 'product_line', 'contract_type', 'measurement_model', 'risk_profile', 'reporting_period', 'created_at']
+    list_filter = ['currency', cached_distinct_filter('product_line'), cached_distinct_filter('contract_type'), 'measurement_model', 'risk_profile', cached_distinct_filter('reporting_period'), 'created_at']
     search_fields = ['institution__name', 'product_line', 'contract_type', 'notes']
     ordering = ['-reporting_period', 'product_line']
 
 
 @admin.register(DataQualityCheck)
-class DataQualityCheckAdmin(admin.ModelAdmin):
+class DataQualityCheckAdmin(InstitutionScopedAdmin):
     list_display = ['institution', 'reporting_period', 'currency', 'overall_quality_score', 'data_governance_score', 'critical_issues', 'created_at']
-    list_filter = ['currency', 'reporting_period', 'institution__institution_type', 'created_at']
+    list_filter = ['currency', cached_distinct_filter('reporting_period'), 'institution__institution_type', 'created_at']
     search_fields = ['institution__name', 'notes', 'remediation_plan']
     ordering = ['-reporting_period']
+
+
+@admin.register(CSMRollforward)
+class CSMRollforwardAdmin(InstitutionScopedAdmin):
+    list_display = ['institution', 'reporting_period', 'currency', 'contract_group', 'opening_csm_balance', 'closing_csm_balance', 'created_at']
+    list_filter = ['currency', cached_distinct_filter('reporting_period'), 'institution__institution_type', 'created_at']
+    search_fields = ['institution__name', 'contract_group', 'notes']
+    ordering = ['-reporting_period', 'contract_group']
+
+
+@admin.register(RiskAdjustmentReconciliation)
+class RiskAdjustmentReconciliationAdmin(InstitutionScopedAdmin):
+    list_display = ['institution', 'reporting_period', 'currency', 'contract_group', 'opening_risk_adjustment', 'closing_risk_adjustment', 'created_at']
+    list_filter = ['currency', cached_distinct_filter('reporting_period'), 'institution__institution_type', 'created_at']
+    search_fields = ['institution__name', 'contract_group', 'notes']
+    ordering = ['-reporting_period', 'contract_group']
+
+
+@admin.register(LossComponentAnalysis)
+class LossComponentAnalysisAdmin(InstitutionScopedAdmin):
+    list_display = ['institution', 'reporting_period', 'currency', 'contract_group', 'onerous_contracts_count', 'total_loss_component', 'created_at']
+    list_filter = ['currency', cached_distinct_filter('reporting_period'), 'institution__institution_type', 'created_at']
+    search_fields = ['institution__name', 'contract_group', 'notes']
+    ordering = ['-reporting_period', 'contract_group']
+
+
+@admin.register(Reinsurer)
+class ReinsurerAdmin(admin.ModelAdmin):
+    list_display = ['name', 'country', 'is_domestic', 'created_at']
+    list_filter = ['is_domestic']
+    search_fields = ['name']
+    ordering = ['name']
+
+
+@admin.register(ReinsuranceExposure)
+class ReinsuranceExposureAdmin(InstitutionScopedAdmin):
+    list_display = ['institution', 'reporting_period', 'currency', 'reinsurer', 'exposure', 'created_at']
+    list_filter = ['currency', cached_distinct_filter('reporting_period'), 'reinsurer__is_domestic', 'created_at']
+    list_select_related = ['institution', 'reinsurer']
+    autocomplete_fields = ['institution', 'reinsurer']
+    search_fields = ['institution__name', 'reinsurer__name', 'notes']
+    ordering = ['-reporting_period', '-exposure']
+
+
+@admin.register(FXRate)
+class FXRateAdmin(admin.ModelAdmin):
+    list_display = ['reporting_period', 'currency', 'rate_to_usd', 'source', 'updated_at']
+    list_filter = ['currency', 'source']
+    ordering = ['-reporting_period', 'currency']
+
+
+@admin.register(FilingCalendar)
+class FilingCalendarAdmin(admin.ModelAdmin):
+    list_display = ['institution_type', 'reporting_period', 'due_date']
+    list_filter = ['institution_type']
+    ordering = ['-reporting_period', 'institution_type']
+
+
+@admin.register(SubmissionEvent)
+class SubmissionEventAdmin(admin.ModelAdmin):
+    # By id: events of deleted submissions stay listed
+    list_display = ['submission_id', 'event', 'from_status', 'to_status', 'user', 'ts']
+    list_filter = ['event', 'to_status']
+    list_select_related = ['user']
+    raw_id_fields = ['submission']
+    show_full_result_count = False
+    ordering = ['-ts', '-id']
+    
+    # The event log is append-only
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,165 @@
+"""
+Rule-driven compliance alert engine.
+
+Each rule receives the set of (institution_id, reporting_period) pairs whose
+fact rows changed since the engine's last run and returns candidate alerts
+for those pairs only. Candidates are de-duplicated against unresolved alerts
+raised by the same rule for the same period and written with bulk_create, so
+a run costs time in proportion to the changes rather than the whole history.
+
+Overdue submissions arise from missing data rather than changed data and are
+detected separately against the filing calendar (see filings.py).
+"""
+from django.conf import settings
+from django.db.models import Min, Sum, OuterRef, Subquery
+
+from .changelog import TRACKED_MODELS, consume_changes
+from .models import ComplianceAlert, IFRS17Submission, ReinsuranceHeld
+from .search import index_objects
+
+
+ALERT_CONSUMER = 'compliance_alerts'
+
+RULES = {}
+
+
+def rule(name):
+    """Register an alert rule under a stable name."""
+    def register(func):
+        RULES[name] = func
+        return func
+    return register
+
+
+def _for_pairs(queryset, pairs):
+    """Narrow a fact queryset to the institutions and periods appearing in pairs."""
+    return queryset.filter(
+        institution_id__in={institution_id for institution_id, period in pairs},
+        reporting_period__in={period for institution_id, period in pairs},
+    )
+
+
+def _alert(name, row, alert_type, severity, title, description):
+    return ComplianceAlert(
+        institution_id=row['institution_id'],
+        reporting_period=row['reporting_period'],
+        rule=name,
+        alert_type=alert_type,
+        severity=severity,
+        title=f"{title} ({row['reporting_period']:%d %b %Y})",
+        description=description,
+    )
+
+
+@rule('low_solvency')
+def low_solvency(pairs):
+    minimum = getattr(settings, 'ALERT_MIN_SOLVENCY_RATIO', 100)
+    rows = _for_pairs(IFRS17Submission.current.filter(solvency_ratio__lt=minimum), pairs).values(
+        'institution_id', 'reporting_period'
+    ).annotate(ratio=Min('solvency_ratio'))
+    return [
+        _alert(
+            'low_solvency', row, 'non_compliant',
+            'critical' if row['ratio'] < minimum * 0.8 else 'high',
+            'Solvency ratio below minimum',
+            f"Reported solvency ratio of {row['ratio']:.2f}% is below the {minimum}% minimum.",
+        )
+        for row in rows
+        if (row['institution_id'], row['reporting_period']) in pairs
+    ]
+
+
+@rule('onerous_contracts')
+def onerous_contracts(pairs):
+    rows = _for_pairs(IFRS17Submission.current.exclude(loss_component=0), pairs).values(
+        'institution_id', 'reporting_period'
+    ).annotate(loss=Sum('loss_component'))
+    return [
+        _alert(
+            'onerous_contracts', row, 'warning', 'medium',
+            'Onerous contracts reported',
+            f"A loss component of {abs(row['loss']):,.2f} has been recognised for onerous contract groups.",
+        )
+        for row in rows
+        if row['loss'] and (row['institution_id'], row['reporting_period']) in pairs
+    ]
+
+
+@rule('concentration_risk')
+def concentration_risk(pairs):
+    limit = getattr(settings, 'ALERT_CONCENTRATION_LIMIT', 40)
+    spike = getattr(settings, 'ALERT_CONCENTRATION_SPIKE', 10)
+    previous = ReinsuranceHeld.objects.filter(
+        institution_id=OuterRef('institution_id'),
+        currency=OuterRef('currency'),
+        reporting_period__lt=OuterRef('reporting_period'),
+    ).order_by('-reporting_period').values('concentration_risk')[:1]
+    rows = _for_pairs(ReinsuranceHeld.objects.all(), pairs).annotate(
+        previous=Subquery(previous)
+    ).values('institution_id', 'reporting_period', 'currency', 'concentration_risk', 'previous')
+
+    alerts = {}
+    for row in rows:
+        key = (row['institution_id'], row['reporting_period'])
+        if key not in pairs or key in alerts:
+            continue
+        current = row['concentration_risk']
+        if current >= limit:
+            alerts[key] = _alert(
+                'concentration_risk', row, 'warning', 'high',
+                'Reinsurance concentration above limit',
+                f"{row['currency']} reinsurance concentration risk of {current}% exceeds the {limit}% limit.",
+            )
+        elif row['previous'] is not None and current - row['previous'] >= spike:
+            alerts[key] = _alert(
+                'concentration_risk', row, 'warning', 'medium',
+                'Reinsurance concentration spike',
+                f"{row['currency']} reinsurance concentration risk rose from {row['previous']}% to {current}%.",
+            )
+    return list(alerts.values())
+
+
+def evaluate(pairs, rules=None):
+    """Run rules over the changed pairs and return the new, de-duplicated alerts."""
+    rules = rules or RULES
+    candidates = []
+    for func in rules.values():
+        candidates.extend(func(pairs))
+    if not candidates:
+        return []
+
+    open_alerts = set(ComplianceAlert.objects.filter(
+        is_resolved=False,
+        rule__in=list(rules),
+        institution_id__in={alert.institution_id for alert in candidates},
+    ).values_list('institution_id', 'rule', 'reporting_period'))
+
+    new_alerts = []
+    for alert in candidates:
+        key = (alert.institution_id, alert.rule, alert.reporting_period)
+        if key not in open_alerts:
+            open_alerts.add(key)
+            new_alerts.append(alert)
+    created = ComplianceAlert.objects.bulk_create(new_alerts)
+    index_objects(created)
+    return created
+
+
+def all_pairs():
+    """Every (institution_id, reporting_period) pair with fact data."""
+    pairs = set()
+    for model in TRACKED_MODELS:
+        pairs.update(model.objects.values_list('institution_id', 'reporting_period').distinct())
+    return pairs
+
+
+def run_alert_engine(full=False):
+    """
+    Evaluate all rules for the pairs changed since the last run, or for all
+    data when full is True. Returns (pairs evaluated, alerts created).
+    """
+    with consume_changes(ALERT_CONSUMER) as pairs:
+        if full:
+            pairs = all_pairs()
+        created = evaluate(pairs) if pairs else []
+    return len(pairs), len(created)
@@ -0,0 +1,183 @@
+"""
+Statistical anomaly detection over submitted fact values.
+
+Every numeric field of every fact model for a reporting period is melted into
+one long frame of cells (model, institution, currency, segment, field,
+value), so all checks run as grouped, vectorised pandas operations over the
+whole industry at once:
+
+- industry: robust z-score of a value against all institutions reporting the
+  same field and currency, using the median and MAD (falling back to the
+  mean absolute deviation when more than half the values are equal);
+- peer: the same score within institutions of the same institution_type;
+- jump: robust z-score of the quarter-on-quarter change, flagged only when
+  the change is also at least ANOMALY_MIN_JUMP_PCT percent.
+
+Cells scoring above ANOMALY_Z_THRESHOLD in groups of at least
+ANOMALY_MIN_PEERS are returned with their scores. Results are cached per
+period until a fact row of that period or the quarter before it changes;
+uploads warm the cache on the background pool.
+"""
+import calendar
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache
+
+from .background import submit_background
+from .deltas import numeric_fields, segment_fields
+from .models import (
+    InsuranceRevenue, CSMProfitability, DiscountRates, ReinsuranceHeld,
+    IFRS4Transition, ContractGrouping
+)
+
+
+# DataQualityCheck is left out: its counts are what the detector feeds
+ANOMALY_MODELS = [
+    InsuranceRevenue, CSMProfitability, DiscountRates, ReinsuranceHeld,
+    IFRS4Transition, ContractGrouping,
+]
+
+CELL_COLUMNS = ['model', 'institution_id', 'currency', 'segment', 'field']
+RESULT_COLUMNS = [*CELL_COLUMNS, 'value', 'expected', 'check', 'score']
+
+# Generation scope bumped when institutions (and so peer groups) change
+INSTITUTIONS = 'institutions'
+
+# Scales the MAD (or mean absolute deviation) to a standard deviation under normality
+MAD_SCALE = 0.6745
+MEAN_AD_SCALE = 0.7979
+
+
+def quarter_before(period):
+    """The quarter-end date three months before a quarter-end period."""
+    year, month = (period.year, period.month - 3) if period.month > 3 else (period.year - 1, period.month + 9)
+    return date(year, month, calendar.monthrange(year, month)[1])
+
+
+def cells(periods, models=None):
+    """Long frame of every non-null numeric fact value for the given periods."""
+    frames = []
+    for model in models or ANOMALY_MODELS:
+        fields = numeric_fields(model)
+        segments = segment_fields(model)
+        columns = ['institution_id', 'institution__institution_type', 'reporting_period', 'currency', *segments, *fields]
+        df = pd.DataFrame.from_records(
+            model.objects.filter(reporting_period__in=periods).values_list(*columns), columns=columns
+        )
+        if df.empty:
+            continue
+        df['segment'] = df[segments].astype(str).agg(' / '.join, axis=1) if segments else ''
+        long = df.melt(
+            id_vars=['institution_id', 'institution__institution_type', 'reporting_period', 'currency', 'segment'],
+            value_vars=fields, var_name='field', value_name='value',
+        ).dropna(subset=['value'])
+        long['value'] = long['value'].astype(float)
+        long['model'] = model._meta.model_name
+        frames.append(long)
+
+    if not frames:
+        return pd.DataFrame(columns=[*CELL_COLUMNS, 'institution_type', 'reporting_period', 'value'])
+    return pd.concat(frames, ignore_index=True).rename(columns={'institution__institution_type': 'institution_type'})
+
+
+def robust_z(frame, column, keys):
+    """Robust z-score of frame[column] within groups of keys; NaN where a group is too small or constant."""
+    groups = [frame[key] for key in keys]
+    values = frame[column]
+    median = values.groupby(groups).transform('median')
+    deviation = (values - median).abs()
+    mad = deviation.groupby(groups).transform('median')
+    mean_ad = deviation.groupby(groups).transform('mean')
+    size = values.groupby(groups).transform('size')
+
+    scale = np.where(mad > 0, mad / MAD_SCALE, mean_ad / MEAN_AD_SCALE)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (values - median).to_numpy() / scale
+    minimum = getattr(settings, 'ANOMALY_MIN_PEERS', 5)
+    z[(scale == 0) | (size.to_numpy() < minimum)] = np.nan
+    return z, median.to_numpy()
+
+
+def _flagged(frame, z, expected, check):
+    threshold = getattr(settings, 'ANOMALY_Z_THRESHOLD', 3.5)
+    with np.errstate(invalid='ignore'):
+        mask = np.abs(z) > threshold
+    result = frame.loc[mask, [*CELL_COLUMNS, 'value']].copy()
+    result['expected'] = expected[mask]
+    result['check'] = check
+    result['score'] = z[mask]
+    return result
+
+
+def scan(reporting_period, models=None):
+    """Run every check over one period. Returns a DataFrame of flagged cells (RESULT_COLUMNS)."""
+    previous_period = quarter_before(reporting_period)
+    frame = cells([reporting_period, previous_period], models)
+    current = frame[frame['reporting_period'] == reporting_period].reset_index(drop=True)
+    if current.empty:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+
+    group = ['model', 'field', 'currency', 'segment']
+    results = []
+
+    z, median = robust_z(current, 'value', group)
+    results.append(_flagged(current, z, median, 'industry'))
+
+    z, median = robust_z(current, 'value', [*group, 'institution_type'])
+    results.append(_flagged(current, z, median, 'peer'))
+
+    previous = frame[frame['reporting_period'] == previous_period][[*CELL_COLUMNS, 'value']]
+    paired = current.merge(previous, on=CELL_COLUMNS, suffixes=('', '_previous'))
+    paired = paired[paired['value_previous'] != 0].reset_index(drop=True)
+    if not paired.empty:
+        paired['change'] = (paired['value'] - paired['value_previous']) / paired['value_previous'].abs() * 100
+        z, median = robust_z(paired, 'change', group)
+        minimum_jump = getattr(settings, 'ANOMALY_MIN_JUMP_PCT', 50)
+        z[paired['change'].abs().to_numpy() < minimum_jump] = np.nan
+        jumps = _flagged(paired, z, paired['value_previous'].to_numpy(), 'jump')
+        results.append(jumps)
+
+    return pd.concat(results, ignore_index=True)[RESULT_COLUMNS].sort_values(
+        'score', key=np.abs, ascending=False, ignore_index=True
+    )
+
+
+def detect_anomalies(reporting_period):
+    """Flagged cells for a period, cached until its facts, the previous quarter's or an institution change."""
+    key = 'anomalies:{}:{}:{}:{}'.format(
+        reporting_period,
+        _generation(reporting_period),
+        _generation(quarter_before(reporting_period)),
+        _generation(INSTITUTIONS),
+    )
+    result = cache.get(key)
+    if result is None:
+        result = scan(reporting_period)
+        cache.set(key, result, getattr(settings, 'ANOMALY_CACHE_TIMEOUT', 3600))
+    return result
+
+
+def anomaly_counts(reporting_period, institution_id):
+    """Number of distinct flagged cells per currency for one institution."""
+    flagged = detect_anomalies(reporting_period)
+    flagged = flagged[flagged['institution_id'] == institution_id].drop_duplicates(CELL_COLUMNS)
+    return flagged['currency'].value_counts().to_dict()
+
+
+def invalidate_period(reporting_period):
+    """Drop cached results that read a period's facts (pass INSTITUTIONS when peer groups change)."""
+    key = f'anomalies:generation:{reporting_period}'
+    if not cache.add(key, 1, None):
+        cache.incr(key)
+
+
+def _generation(scope):
+    return cache.get(f'anomalies:generation:{scope}', 0)
+
+
+def queue_scan(reporting_period):
+    """Refresh a period's anomaly results on the background pool after new data arrives."""
+    return submit_background(detect_anomalies, reporting_period, description=f'Anomaly scan for {reporting_period}')
@@ -0,0 +1,44 @@
+"""
+Background jobs for the web process.
+
+Report packs, anomaly scans, cube refreshes, reinsurance aggregation and blob
+reclamation run on one shared thread pool. The pool lives in the web
+process, so a restart drops whatever it was running; callers that need to
+survive that keep their own state in the database.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+
+
+_executor = None
+
+
+def get_executor():
+    """Return the shared background thread pool."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'BACKGROUND_WORKERS', 4),
+            thread_name_prefix='background',
+        )
+    return _executor
+
+
+def submit_background(func, *args, description):
+    """
+    Run func(*args) on the shared pool. A failure is logged to func's module
+    logger as '<description> failed', and the worker thread's database
+    connection is closed afterwards.
+    """
+    def run():
+        try:
+            return func(*args)
+        except Exception:
+            logging.getLogger(func.__module__).exception('%s failed', description)
+        finally:
+            connection.close()
+
+    return get_executor().submit(run)
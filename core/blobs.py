@@ -0,0 +1,81 @@
+"""
+Content-addressed storage for uploaded files.
+
+Each distinct file is stored once under its SHA-256 as a FileBlob, and every
+submission version that uploads the same bytes points at the same blob, so
+re-uploading an unchanged file costs no storage. Blobs no longer referenced
+by any submission are reclaimed in batches by reclaim_blobs, run from the
+reclaim_blobs management command or queued on the background pool after a
+submission is deleted.
+"""
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .background import submit_background
+from .models import FileBlob, IFRS17Submission
+
+
+def file_digest(uploaded_file):
+    """SHA-256 of an uploaded file, read in chunks."""
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
+
+
+def store_blob(uploaded_file):
+    """Return the FileBlob holding uploaded_file's content, writing it to storage only if it is new."""
+    sha256 = file_digest(uploaded_file)
+    blob = FileBlob.objects.filter(sha256=sha256).first()
+    if blob is not None:
+        return blob
+
+    blob = FileBlob(sha256=sha256, size=uploaded_file.size)
+    blob.file.save(uploaded_file.name, uploaded_file, save=False)
+    try:
+        with transaction.atomic():
+            blob.save()
+    except IntegrityError:
+        # Another upload stored the same content first
+        blob.file.delete(save=False)
+        blob = FileBlob.objects.get(sha256=sha256)
+    return blob
+
+
+def unreferenced_blobs():
+    """Blobs no submission version points at, past the grace period that protects in-flight uploads."""
+    grace = timedelta(seconds=getattr(settings, 'BLOB_GRACE_SECONDS', 3600))
+    referenced = IFRS17Submission.objects.filter(blob=OuterRef('pk'))
+    return FileBlob.objects.filter(created_at__lt=timezone.now() - grace).exclude(Exists(referenced))
+
+
+def reclaim_blobs(batch_size=None):
+    """Delete unreferenced blobs and their files, a batch at a time. Returns the number reclaimed."""
+    batch_size = batch_size or getattr(settings, 'BLOB_RECLAIM_BATCH_SIZE', 500)
+    reclaimed = 0
+    while True:
+        batch = {blob.id: blob.file.name for blob in unreferenced_blobs().order_by('id')[:batch_size]}
+        if not batch:
+            break
+        # Re-check references in the DELETE itself, then remove files only for rows actually gone
+        unreferenced_blobs().filter(id__in=list(batch)).delete()
+        kept = set(FileBlob.objects.filter(id__in=list(batch)).values_list('id', flat=True))
+        removed = [name for blob_id, name in batch.items() if blob_id not in kept]
+        for name in removed:
+            default_storage.delete(name)
+        reclaimed += len(removed)
+        if len(batch) < batch_size or not removed:
+            break
+    return reclaimed
+
+
+def queue_reclaim():
+    """Run reclaim_blobs on the background pool."""
+    return submit_background(reclaim_blobs, description='Blob reclamation')
@@ -0,0 +1,121 @@
+"""
+Fact change log.
+
+Every save or delete of a fact row appends its (institution, reporting
+period) pair to FactChange. Incremental jobs read the log through a named
+ChangeCursor, so each job only re-evaluates the pairs that changed since its
+own last run. Consumers are declared in CONSUMERS, and entries are only
+pruned once every declared consumer has moved past them, including jobs that
+have not run for the first time yet.
+"""
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .models import (
+    FactChange, ChangeCursor, IFRS17Submission, InsuranceRevenue,
+    CSMProfitability, DiscountRates, ReinsuranceHeld, IFRS4Transition,
+    ContractGrouping, DataQualityCheck, ReinsuranceExposure, CSMRollforward,
+    RiskAdjustmentReconciliation, LossComponentAnalysis
+)
+
+
+TRACKED_MODELS = [
+    IFRS17Submission, InsuranceRevenue, CSMProfitability, DiscountRates,
+    ReinsuranceHeld, IFRS4Transition, ContractGrouping, DataQualityCheck,
+    ReinsuranceExposure, CSMRollforward, RiskAdjustmentReconciliation, LossComponentAnalysis,
+]
+
+# Every job that reads the log through consume_changes
+CONSUMERS = ['compliance_alerts', 'fact_deltas', 'contract_cube', 'reinsurance_exposure']
+
+# Seconds between attempts to take a cursor another run is holding
+LEASE_POLL_SECONDS = 1
+
+
+def record_change(instance):
+    """Log a change to a single fact row."""
+    FactChange.objects.create(
+        institution_id=instance.institution_id,
+        reporting_period=instance.reporting_period,
+        model_name=instance._meta.model_name,
+    )
+
+
+def record_changes(model, pairs):
+    """Log changes made in bulk (bulk_create/update bypass signals)."""
+    FactChange.objects.bulk_create([
+        FactChange(institution_id=institution_id, reporting_period=period, model_name=model._meta.model_name)
+        for institution_id, period in set(pairs)
+    ])
+
+
+def _claim(consumer):
+    """
+    Take the consumer's cursor lease, waiting while another run holds it.
+    Each attempt is a single conditional UPDATE, so no transaction is held
+    while waiting or while the consumer works. Returns the lease expiry,
+    which identifies this run's hold on the cursor.
+    """
+    ChangeCursor.objects.get_or_create(consumer=consumer)
+    lease = timedelta(seconds=getattr(settings, 'CHANGE_CURSOR_LEASE_SECONDS', 3600))
+    while True:
+        now = timezone.now()
+        leased_until = now + lease
+        claimed = ChangeCursor.objects.filter(
+            Q(leased_until__isnull=True) | Q(leased_until__lt=now), consumer=consumer,
+        ).update(leased_until=leased_until)
+        if claimed:
+            return leased_until
+        time.sleep(LEASE_POLL_SECONDS)
+
+
+@contextmanager
+def consume_changes(consumer, models=None):
+    """
+    Yield the distinct (institution_id, reporting_period) pairs changed since
+    the consumer's last run, optionally limited to some models. The cursor
+    only advances if the block completes without raising.
+
+    Two runs of the same consumer (e.g. a management command and a background
+    job) take turns through a lease on the cursor row. A run that outlives
+    CHANGE_CURSOR_LEASE_SECONDS loses the lease and does not advance the
+    cursor, so its pairs are evaluated again by the next run.
+    """
+    if consumer not in CONSUMERS:
+        raise ValueError(f'Undeclared change log consumer: {consumer}')
+    held = ChangeCursor.objects.filter(consumer=consumer, leased_until=_claim(consumer))
+    try:
+        last_change_id = ChangeCursor.objects.values_list('last_change_id', flat=True).get(consumer=consumer)
+        changes = FactChange.objects.filter(id__gt=last_change_id)
+        last_id = changes.aggregate(last=Max('id'))['last']
+        if last_id is None:
+            yield set()
+            return
+
+        changes = changes.filter(id__lte=last_id)
+        if models:
+            changes = changes.filter(model_name__in=[model._meta.model_name for model in models])
+        yield set(changes.values_list('institution_id', 'reporting_period').distinct())
+
+        with transaction.atomic():
+            if held.update(last_change_id=last_id, leased_until=None):
+                prune()
+    finally:
+        held.update(leased_until=None)
+
+
+def prune():
+    """Delete log entries that every declared consumer has already processed."""
+    cursors = dict(ChangeCursor.objects.filter(consumer__in=CONSUMERS).values_list('consumer', 'last_change_id'))
+    if len(cursors) < len(CONSUMERS):
+        # A consumer that has never run still needs the whole log
+        return
+    oldest = min(cursors.values())
+    if oldest:
+        FactChange.objects.filter(id__lte=oldest).delete()
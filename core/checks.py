@@ -0,0 +1,26 @@
+"""
+System checks for the core app, run by manage.py check and on startup.
+"""
+from django.core import checks
+from django.core.exceptions import FieldError
+
+
+@checks.register()
+def check_export_columns(app_configs, **kwargs):
+    """Every export dataset's column lookups must resolve on its model."""
+    from .exports import EXPORT_DATASETS, export_columns
+
+    errors = []
+    for dataset, (label, model) in EXPORT_DATASETS.items():
+        lookups, headers = export_columns(model)
+        try:
+            # Building the query resolves every lookup without touching the database
+            str(model.objects.values_list(*lookups).query)
+        except FieldError as e:
+            errors.append(checks.Error(
+                f'Export dataset {dataset!r} has a column that does not resolve: {e}',
+                hint='Exclude the field in EXCLUDED_FIELDS or map its related model in RELATED_DISPLAY_FIELDS.',
+                obj=model,
+                id='core.E001',
+            ))
+    return errors
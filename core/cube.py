@@ -0,0 +1,218 @@
+"""
+Roll-up cube over ContractGrouping.
+
+Contract groups are filed per product line, contract type, measurement model
+and risk profile. The cube pre-aggregates them per reporting period and
+currency over every grouping set of DIMENSIONS (the equivalent of SQL
+GROUP BY CUBE, which covers every ROLLUP order as well), so a drill-down
+from the industry total to one institution's high-risk GMM business in a
+product line is a single indexed lookup on ContractGroupCube.
+
+Each cell holds the number of contract groups, sums of the contract counts,
+contract value and materiality thresholds, and averages of the scores
+weighted by contract value. A rolled-up dimension is stored empty and its
+bit is set in the grouping mask (bit i for DIMENSIONS[i]).
+
+Currencies are never summed together. Cells are rebuilt per period, only
+for periods whose contract groups changed since the last run. Refreshes
+queued by uploads are single-flight: while one runs, further requests only
+ask it for another pass, so the pool never runs two rebuilds at once.
+"""
+import threading
+from itertools import compress
+
+import numpy as np
+import pandas as pd
+from django.db import transaction
+
+from .background import submit_background
+from .changelog import consume_changes
+from .models import ContractGrouping, ContractGroupCube
+
+
+CUBE_CONSUMER = 'contract_cube'
+
+# Single-flight state of queued refreshes
+_refresh_lock = threading.Lock()
+_refresh_running = False
+_refresh_again = False
+
+DIMENSIONS = ('institution', 'product_line', 'measurement_model', 'risk_profile')
+DIMENSION_LABELS = {
+    'institution': 'Institution',
+    'product_line': 'Product Line',
+    'measurement_model': 'Measurement Model',
+    'risk_profile': 'Risk Profile',
+}
+
+SUMMED = ['number_of_contracts', 'total_contract_value', 'materiality_threshold']
+WEIGHTED = ['grouping_efficiency', 'volatility_score', 'correlation_score']
+
+
+def grouping_mask(kept):
+    """The grouping bitmask of a cell that keeps the given dimensions and rolls up the rest."""
+    unknown = set(kept) - set(DIMENSIONS)
+    if unknown:
+        raise ValueError(f'Unknown cube dimension: {", ".join(sorted(unknown))}')
+    return sum(1 << index for index, dimension in enumerate(DIMENSIONS) if dimension not in kept)
+
+
+def _groups(reporting_period):
+    columns = ['institution_id', 'currency', *DIMENSIONS[1:], *SUMMED, *WEIGHTED]
+    df = pd.DataFrame.from_records(
+        ContractGrouping.objects.filter(reporting_period=reporting_period).values_list(*columns), columns=columns
+    ).rename(columns={'institution_id': 'institution'})
+    df[SUMMED + WEIGHTED] = df[SUMMED + WEIGHTED].astype(float)
+    # Scores are averaged by contract value, falling back to a plain mean where the value is zero
+    weights = df['total_contract_value'].clip(lower=0)
+    for field in WEIGHTED:
+        df[f'{field}_weighted'] = df[field] * weights
+        df[f'{field}_weight'] = weights.where(df[field].notna(), 0)
+    return df
+
+
+def build_cube(reporting_period):
+    """Every cell of the cube for one period, as unsaved ContractGroupCube rows."""
+    df = _groups(reporting_period)
+    if df.empty:
+        return []
+
+    aggregations = {field: 'sum' for field in df.columns if field not in DIMENSIONS and field != 'currency'}
+    aggregations.update({field: 'mean' for field in WEIGHTED})
+    cells = []
+    for mask in range(1 << len(DIMENSIONS)):
+        kept = list(compress(DIMENSIONS, [not mask & (1 << index) for index in range(len(DIMENSIONS))]))
+        grouped = df.groupby(['currency', *kept], sort=False)
+        frame = grouped.agg(aggregations)
+        frame['groups'] = grouped.size()
+        frame = frame.reset_index()
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for field in WEIGHTED:
+                weighted = frame[f'{field}_weighted'] / frame[f'{field}_weight']
+                frame[field] = weighted.where(frame[f'{field}_weight'] > 0, frame[field])
+            frame['average_contract_value'] = (
+                frame['total_contract_value'] / frame['number_of_contracts']
+            ).where(frame['number_of_contracts'] > 0)
+
+        for row in frame.to_dict('records'):
+            cells.append(ContractGroupCube(
+                reporting_period=reporting_period,
+                currency=row['currency'],
+                grouping=mask,
+                institution_id=int(row['institution']) if 'institution' in row else None,
+                product_line=row.get('product_line', ''),
+                measurement_model=row.get('measurement_model', ''),
+                risk_profile=row.get('risk_profile', ''),
+                groups=int(row['groups']),
+                number_of_contracts=int(row['number_of_contracts']),
+                total_contract_value=round(row['total_contract_value'], 2),
+                materiality_threshold=round(row['materiality_threshold'], 2),
+                average_contract_value=None if pd.isna(row['average_contract_value']) else round(row['average_contract_value'], 2),
+                **{field: None if pd.isna(row[field]) else row[field] for field in WEIGHTED},
+            ))
+    return cells
+
+
+def refresh_cube(periods):
+    """Rebuild the cube for some periods. Returns the number of cells written."""
+    written = 0
+    for reporting_period in periods:
+        cells = build_cube(reporting_period)
+        with transaction.atomic():
+            ContractGroupCube.objects.filter(reporting_period=reporting_period).delete()
+            written += len(ContractGroupCube.objects.bulk_create(cells, batch_size=2000))
+    return written
+
+
+def run_cube(full=False):
+    """
+    Rebuild the periods whose contract groups changed since the last run, or
+    every period when full is True or the cube is empty. Returns (periods
+    rebuilt, cells written).
+    """
+    with consume_changes(CUBE_CONSUMER, [ContractGrouping]) as pairs:
+        if full or not ContractGroupCube.objects.exists():
+            periods = set(ContractGrouping.objects.values_list('reporting_period', flat=True).order_by().distinct())
+        else:
+            periods = {reporting_period for institution_id, reporting_period in pairs}
+        written = refresh_cube(periods) if periods else 0
+    return len(periods), written
+
+
+def _refresh_while_requested():
+    """Run the cube until no refresh was requested during the last run."""
+    global _refresh_running, _refresh_again
+    try:
+        while True:
+            with _refresh_lock:
+                _refresh_again = False
+            run_cube()
+            with _refresh_lock:
+                if not _refresh_again:
+                    _refresh_running = False
+                    return
+    except BaseException:
+        with _refresh_lock:
+            _refresh_running = False
+        raise
+
+
+def queue_cube_refresh():
+    """
+    Rebuild changed periods of the cube on the background pool after new
+    contract groups arrive. Returns the job's future, or None when a running
+    refresh was asked to make another pass instead.
+    """
+    global _refresh_running, _refresh_again
+    with _refresh_lock:
+        if _refresh_running:
+            _refresh_again = True
+            return None
+        _refresh_running = True
+    return submit_background(_refresh_while_requested, description='Contract group cube refresh')
+
+
+def cube_slice(reporting_period, by=(), currency=None, **fixed):
+    """
+    Cells of a period broken down by the dimensions in by, with the
+    dimensions in fixed pinned to a value and every other dimension rolled
+    up. cube_slice(period, by=['risk_profile'], institution=3, product_line='Life')
+    gives one institution's Life business per risk profile.
+    """
+    kept = [*by, *fixed]
+    cells = ContractGroupCube.objects.filter(
+        reporting_period=reporting_period, grouping=grouping_mask(kept),
+        **{('institution_id' if dimension == 'institution' else dimension): value for dimension, value in fixed.items()}
+    )
+    if currency:
+        cells = cells.filter(currency=currency)
+    return cells
+
+
+def breakdowns(institution_id, reporting_period=None):
+    """
+    One institution's totals and its breakdown by each other dimension for a
+    period (default: its latest with contract groups). Returns (period,
+    sections), sections being (label, cells) pairs led by the totals; each
+    cell's label is its value of the section's dimension.
+    """
+    if reporting_period is None:
+        reporting_period = ContractGroupCube.objects.filter(institution_id=institution_id).order_by(
+            '-reporting_period'
+        ).values_list('reporting_period', flat=True).first()
+        if reporting_period is None:
+            return None, []
+
+    totals = list(cube_slice(reporting_period, institution=institution_id).order_by('currency'))
+    for cell in totals:
+        cell.label = 'All contract groups'
+    sections = [('Total', totals)]
+    for dimension in DIMENSIONS[1:]:
+        cells = list(cube_slice(reporting_period, by=[dimension], institution=institution_id).order_by(
+            'currency', '-total_contract_value'
+        ))
+        for cell in cells:
+            cell.label = getattr(cell, dimension)
+        sections.append((DIMENSION_LABELS[dimension], cells))
+    return reporting_period, sections
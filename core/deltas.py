@@ -0,0 +1,184 @@
+"""
+Period-over-period delta engine.
+
+For each fact model one query annotates every numeric field with its value
+one and four quarters earlier, using LAG window functions partitioned by
+institution, currency and any extra key fields and ordered by reporting
+period. The quarter-on-quarter and year-on-year changes are materialised
+into FactDelta, which views read directly. A lagged row only counts if it
+is exactly 3 (or 12) months earlier, so gaps in an institution's filings
+leave the change empty rather than comparing the wrong quarters.
+
+Runs are incremental: only institutions whose fact rows changed since the
+last run (per the FactChange log) are recomputed.
+"""
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import F, Window
+from django.db.models.functions import Lag
+
+from .changelog import consume_changes
+from .models import (
+    FactDelta, InsuranceRevenue, CSMProfitability, DiscountRates,
+    ReinsuranceHeld, IFRS4Transition, ContractGrouping, DataQualityCheck
+)
+
+
+DELTA_CONSUMER = 'fact_deltas'
+
+DELTA_MODELS = [
+    InsuranceRevenue, CSMProfitability, DiscountRates, ReinsuranceHeld,
+    IFRS4Transition, ContractGrouping, DataQualityCheck,
+]
+
+# Figures shown on the institution overview, as (model, field, label)
+HEADLINE_FIELDS = [
+    (CSMProfitability, 'closing_csm', 'Closing CSM'),
+    (IFRS4Transition, 'ifrs17_risk_adjustment', 'Risk Adjustment'),
+    (IFRS4Transition, 'ifrs17_liabilities', 'Insurance Contract Liabilities'),
+    (InsuranceRevenue, 'total_revenue', 'Insurance Revenue'),
+    (ReinsuranceHeld, 'total_reinsurance_held', 'Reinsurance Held'),
+]
+
+NUMERIC_FIELDS = (models.DecimalField, models.IntegerField, models.FloatField)
+CONTEXT_FIELDS = {'institution', 'reporting_period', 'currency'}
+
+
+def numeric_fields(model):
+    return [
+        field.name for field in model._meta.concrete_fields
+        if isinstance(field, NUMERIC_FIELDS) and not field.primary_key
+    ]
+
+
+def segment_fields(model):
+    """Key fields beyond institution, period and currency (from unique_together)."""
+    segments = []
+    for fields in model._meta.unique_together:
+        segments.extend(field for field in fields if field not in CONTEXT_FIELDS and field not in segments)
+    return segments
+
+
+def _months(period):
+    return period.year * 12 + period.month
+
+
+def _change(value, earlier):
+    if earlier is None:
+        return None, None
+    change = value - earlier
+    pct = float(change) / abs(float(earlier)) * 100 if earlier else None
+    return change, pct
+
+
+def lagged_rows(model, institution_ids=None):
+    """Fact rows annotated with prev_<field>/year_<field> and the periods they came from, in one query."""
+    fields = numeric_fields(model)
+    segments = segment_fields(model)
+
+    def lag(expression, offset):
+        return Window(
+            Lag(expression, offset),
+            partition_by=[F('institution_id'), F('currency'), *[F(name) for name in segments]],
+            order_by=F('reporting_period').asc(),
+        )
+
+    annotations = {'prev_period': lag('reporting_period', 1), 'year_period': lag('reporting_period', 4)}
+    for field in fields:
+        annotations[f'prev_{field}'] = lag(field, 1)
+        annotations[f'year_{field}'] = lag(field, 4)
+
+    queryset = model.objects.order_by()
+    if institution_ids is not None:
+        # Partitions are per institution, so filtering first keeps every window complete
+        queryset = queryset.filter(institution_id__in=institution_ids)
+    return queryset.annotate(**annotations).values(
+        'institution_id', 'reporting_period', 'currency', *segments, *fields, *annotations
+    )
+
+
+def build_deltas(model, institution_ids=None):
+    """Return unsaved FactDelta rows for every numeric field of a model."""
+    fields = numeric_fields(model)
+    segments = segment_fields(model)
+    deltas = []
+    for row in lagged_rows(model, institution_ids):
+        period = row['reporting_period']
+        quarter_ago = row['prev_period'] is not None and _months(period) - _months(row['prev_period']) == 3
+        year_ago = row['year_period'] is not None and _months(period) - _months(row['year_period']) == 12
+        segment = ' / '.join(str(row[name]) for name in segments)
+
+        for field in fields:
+            value = row[field]
+            if value is None:
+                continue
+            value = Decimal(value)
+            previous = Decimal(row[f'prev_{field}']) if quarter_ago and row[f'prev_{field}'] is not None else None
+            earlier = Decimal(row[f'year_{field}']) if year_ago and row[f'year_{field}'] is not None else None
+            qoq_change, qoq_pct = _change(value, previous)
+            yoy_change, yoy_pct = _change(value, earlier)
+            deltas.append(FactDelta(
+                model_name=model._meta.model_name,
+                institution_id=row['institution_id'],
+                reporting_period=period,
+                currency=row['currency'],
+                segment=segment,
+                field=field,
+                value=value,
+                previous_value=previous,
+                qoq_change=qoq_change,
+                qoq_pct=qoq_pct,
+                year_ago_value=earlier,
+                yoy_change=yoy_change,
+                yoy_pct=yoy_pct,
+            ))
+    return deltas
+
+
+def refresh_deltas(institution_ids=None, models=None):
+    """Recompute the delta table for some institutions (or all). Returns the number of rows written."""
+    written = 0
+    for model in models or DELTA_MODELS:
+        deltas = build_deltas(model, institution_ids)
+        with transaction.atomic():
+            stale = FactDelta.objects.filter(model_name=model._meta.model_name)
+            if institution_ids is not None:
+                stale = stale.filter(institution_id__in=institution_ids)
+            stale.delete()
+            written += len(FactDelta.objects.bulk_create(deltas, batch_size=2000))
+    return written
+
+
+def run_delta_engine(full=False):
+    """
+    Refresh deltas for institutions whose facts changed since the last run,
+    or for everything when full is True or the table is empty. Returns
+    (institutions refreshed or None for all, rows written).
+    """
+    with consume_changes(DELTA_CONSUMER, DELTA_MODELS) as pairs:
+        if full or not FactDelta.objects.exists():
+            return None, refresh_deltas()
+        institution_ids = {institution_id for institution_id, period in pairs}
+        written = refresh_deltas(institution_ids) if institution_ids else 0
+    return len(institution_ids), written
+
+
+def headline_deltas(institution_id):
+    """Latest delta of each headline figure per currency for one institution."""
+    labels = {(model._meta.model_name, field): label for model, field, label in HEADLINE_FIELDS}
+    rows = FactDelta.objects.filter(
+        institution_id=institution_id,
+        model_name__in={model_name for model_name, field in labels},
+        field__in={field for model_name, field in labels},
+        segment='',
+    ).order_by('model_name', 'field', 'currency', '-reporting_period')
+
+    latest = {}
+    for delta in rows:
+        key = (delta.model_name, delta.field, delta.currency)
+        if (delta.model_name, delta.field) in labels and key not in latest:
+            delta.label = labels[delta.model_name, delta.field]
+            latest[key] = delta
+    order = {key: position for position, key in enumerate(labels)}
+    return sorted(latest.values(), key=lambda delta: (order[delta.model_name, delta.field], delta.currency))
@@ -0,0 +1,126 @@
+"""
+Fast JSON encoding for API responses.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise. Both backends encode Decimal as a JSON number (or as a string
+when it has more significant digits than a float holds exactly), dates and
+datetimes as ISO 8601 strings, numpy/pandas scalars as their Python
+equivalents, and NaN and infinite floats as null.
+"""
+import datetime
+import decimal
+import json
+import math
+
+import pandas as pd
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Significant digits a float reproduces exactly
+FLOAT_DIGITS = 15
+
+
+def _default(obj):
+    """Encode the types neither backend handles natively."""
+    # Decimal first: it is by far the most common type in query results
+    if isinstance(obj, decimal.Decimal):
+        if not obj.is_finite():
+            return None
+        text = str(obj)
+        # The length bound (sign and point aside) skips the digit count for ordinary amounts
+        if len(text) > FLOAT_DIGITS + 2 and len(obj.as_tuple().digits) > FLOAT_DIGITS:
+            return text
+        return float(text)
+    if obj is pd.NA or obj is pd.NaT:
+        return None
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    if hasattr(obj, 'item'):
+        # numpy and pandas scalars
+        return _finite(obj.item())
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def _finite(obj):
+    """Replace NaN and infinite floats with None, as orjson does, throughout lists and dicts."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+class _StdlibEncoder(json.JSONEncoder):
+    def default(self, obj):
+        return _default(obj)
+
+
+def get_backend():
+    """Return the name of the JSON backend in use."""
+    backend = getattr(settings, 'JSON_BACKEND', 'auto')
+    if backend == 'stdlib' or orjson is None:
+        return 'stdlib'
+    return 'orjson'
+
+
+def dumps(obj):
+    """Serialize obj to JSON bytes."""
+    if get_backend() == 'orjson':
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    try:
+        return json.dumps(obj, cls=_StdlibEncoder, separators=(',', ':'), allow_nan=False).encode('utf-8')
+    except ValueError:
+        # The payload holds a NaN or infinite float, which the stdlib can only write as an invalid
+        # literal; only then is it copied with those values replaced
+        return json.dumps(_finite(obj), cls=_StdlibEncoder, separators=(',', ':')).encode('utf-8')
+
+
+class FastJsonResponse(HttpResponse):
+    """Drop-in replacement for JsonResponse using the fast encoder."""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
+
+
+def iter_json_array(items, envelope=None, key='data', chunk_size=500):
+    """
+    Yield a JSON document piece by piece.
+
+    The document is the envelope dict with its `key` entry holding every item
+    of the iterable as an array. Items are encoded in chunks so large payloads
+    never have to be held in memory at once.
+    """
+    envelope = dict(envelope or {})
+    envelope.pop(key, None)
+    head = dumps(envelope)[:-1]
+    yield head + (b',' if envelope else b'') + dumps(key) + b':['
+
+    first = True
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield (b'' if first else b',') + dumps(chunk)[1:-1]
+            first = False
+            chunk = []
+    if chunk:
+        yield (b'' if first else b',') + dumps(chunk)[1:-1]
+
+    yield b']}'
+
+
+class StreamingJsonResponse(StreamingHttpResponse):
+    """Stream an array payload, wrapped in an optional envelope, as JSON."""
+
+    def __init__(self, items, envelope=None, key='data', chunk_size=500, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(iter_json_array(items, envelope, key, chunk_size), **kwargs)
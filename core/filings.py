@@ -0,0 +1,110 @@
+"""
+Filing calendar and overdue-submission detection.
+
+FilingCalendar lists the reporting periods each institution type must file
+and when they fall due. Overdue filings are found with a single anti-join of
+active institutions against the calendar, excluding pairs that already have
+a non-draft IFRS17Submission or an open overdue alert.
+"""
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import ComplianceAlert, FilingCalendar, IFRS17Submission, Institution
+from .search import index_objects
+
+
+OVERDUE_RULE = 'overdue_submission'
+
+QUARTER_ENDS = [(3, 31), (6, 30), (9, 30), (12, 31)]
+
+
+def generate_calendar(year, deadline_days=None):
+    """Create quarterly calendar entries for every institution type. Returns the number created."""
+    if deadline_days is None:
+        deadline_days = getattr(settings, 'SUBMISSION_DEADLINE_DAYS', 45)
+
+    institution_types = [value for value, label in Institution._meta.get_field('institution_type').choices]
+    entries = [
+        FilingCalendar(
+            institution_type=institution_type,
+            reporting_period=date(year, month, day),
+            due_date=date(year, month, day) + timedelta(days=deadline_days),
+        )
+        for institution_type in institution_types
+        for month, day in QUARTER_ENDS
+    ]
+    existing = FilingCalendar.objects.count()
+    FilingCalendar.objects.bulk_create(entries, ignore_conflicts=True)
+    return FilingCalendar.objects.count() - existing
+
+
+def overdue_filings(as_of=None):
+    """Return (institution_id, reporting_period, due_date) rows for filings past due without a submission."""
+    as_of = as_of or timezone.now().date()
+    sql = f"""
+        SELECT i.id, c.reporting_period, c.due_date
+        FROM {Institution._meta.db_table} i
+        INNER JOIN {FilingCalendar._meta.db_table} c ON c.institution_type = i.institution_type
+        WHERE i.status = %s
+          AND c.due_date < %s
+          AND NOT EXISTS (
+              SELECT 1 FROM {IFRS17Submission._meta.db_table} s
+              WHERE s.institution_id = i.id
+                AND s.reporting_period = c.reporting_period
+                AND s.status <> %s
+                AND s.is_current = %s
+          )
+          AND NOT EXISTS (
+              SELECT 1 FROM {ComplianceAlert._meta.db_table} a
+              WHERE a.institution_id = i.id
+                AND a.reporting_period = c.reporting_period
+                AND a.rule = %s
+                AND a.is_resolved = %s
+          )
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, ['active', as_of, 'draft', True, OVERDUE_RULE, False])
+        return [
+            (institution_id, _as_date(period), _as_date(due_date))
+            for institution_id, period, due_date in cursor.fetchall()
+        ]
+
+
+def detect_overdue(as_of=None):
+    """
+    Raise alerts for newly overdue filings and resolve overdue alerts that
+    have since been filed. Returns (alerts created, alerts resolved).
+    """
+    alerts = ComplianceAlert.objects.bulk_create([
+        ComplianceAlert(
+            institution_id=institution_id,
+            reporting_period=period,
+            rule=OVERDUE_RULE,
+            alert_type='overdue',
+            severity='high',
+            title=f'Submission overdue ({period:%d %b %Y})',
+            description=f'No IFRS 17 submission has been filed for this period; it was due on {due_date:%d %b %Y}.',
+        )
+        for institution_id, period, due_date in overdue_filings(as_of)
+    ])
+    index_objects(alerts)
+
+    filed = IFRS17Submission.current.filter(
+        institution_id=OuterRef('institution_id'),
+        reporting_period=OuterRef('reporting_period'),
+    ).exclude(status='draft')
+    resolved = ComplianceAlert.objects.filter(rule=OVERDUE_RULE, is_resolved=False).filter(
+        Exists(filed)
+    ).update(is_resolved=True, resolved_date=timezone.now())
+    return len(alerts), resolved
+
+
+def _as_date(value):
+    # SQLite hands dates back from raw queries as strings
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
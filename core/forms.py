@@ -1,5 +1,6 @@
 from django import forms
 from .models import Institution, IFRS17Submission
+from .exports import DATASET_CHOICES
 
 
 class InstitutionForm(forms.ModelForm):
@@ -158,3 +159,77 @@ class IFRS17FileUploadForm(forms.ModelForm):
         for field_name, field in self.fields.items():
             if field.required:
                 field.widget.attrs['required'] = True
+
+
+class ExportForm(forms.Form):
+    """Filters for streaming data extracts."""
+    
+    dataset = forms.ChoiceField(
+        choices=DATASET_CHOICES,
+        widget=forms.Select(attrs={
+            'class': 'w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500'
+        })
+    )
+    institution = forms.ModelChoiceField(
+        queryset=Institution.objects.all(),
+        required=False,
+        empty_label='All institutions',
+        widget=forms.Select(attrs={
+            'class': 'w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500'
+        })
+    )
+    period_from = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={
+            'class': 'w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500',
+            'type': 'date'
+        })
+    )
+    period_to = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={
+            'class': 'w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500',
+            'type': 'date'
+        })
+    )
+    currency = forms.ChoiceField(
+        choices=[('', 'All currencies'), ('ZWL', 'Zimbabwe Dollar'), ('USD', 'US Dollar')],
+        required=False,
+        widget=forms.Select(attrs={
+            'class': 'w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500'
+        })
+    )
+    file_format = forms.ChoiceField(
+        choices=[('csv', 'CSV'), ('xlsx', 'Excel')],
+        initial='csv',
+        widget=forms.Select(attrs={
+            'class': 'w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500'
+        })
+    )
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        period_from = cleaned_data.get('period_from')
+        period_to = cleaned_data.get('period_to')
+        if period_from and period_to and period_from > period_to:
+            raise forms.ValidationError('The period start must not be after the period end.')
+        return cleaned_data
+
+
+class ReportPackForm(forms.Form):
+    """Request quarterly regulatory report packs for a reporting period."""
+    
+    reporting_period = forms.DateField(
+        widget=forms.DateInput(attrs={
+            'class': 'w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500',
+            'type': 'date'
+        })
+    )
+    institution = forms.ModelChoiceField(
+        queryset=Institution.objects.filter(status='active'),
+        required=False,
+        empty_label='All active institutions',
+        widget=forms.Select(attrs={
+            'class': 'w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500'
+        })
+    )
@@ -0,0 +1,172 @@
+"""
+Multi-currency normalisation.
+
+FX rates are held per reporting period in FXRate, seeded from the
+exchange_rate reported on DiscountRates when no rate has been entered. Fact
+rows are converted in bulk: the rate table for every period involved is
+loaded once, merged onto the DataFrame and applied as a column-wise multiply.
+Consolidated per-period totals are memoised in the cache and invalidated
+whenever a rate or a fact row for that period changes.
+"""
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+
+from .models import (
+    FXRate, InsuranceRevenue, CSMProfitability, DiscountRates,
+    ReinsuranceHeld, IFRS4Transition, ContractGrouping
+)
+
+
+REPORTING_CURRENCY = 'USD'
+
+# Fact models carrying monetary amounts
+FX_FACT_MODELS = [
+    InsuranceRevenue, CSMProfitability, DiscountRates,
+    ReinsuranceHeld, IFRS4Transition, ContractGrouping,
+]
+
+
+def money_fields(model):
+    """Return the names of a fact model's monetary amount fields."""
+    return [
+        field.name for field in model._meta.concrete_fields
+        if isinstance(field, models.DecimalField) and field.max_digits >= 15
+    ]
+
+
+def derive_rates(reporting_period):
+    """
+    Seed FXRate rows for a period from the median exchange_rate reported on
+    DiscountRates. Returns the number of rates created.
+    """
+    reported = pd.DataFrame.from_records(
+        DiscountRates.objects.filter(
+            reporting_period=reporting_period,
+            exchange_rate__isnull=False,
+        ).exclude(currency=REPORTING_CURRENCY).values('currency', 'exchange_rate')
+    )
+    if reported.empty:
+        return 0
+
+    medians = reported.astype({'exchange_rate': 'float64'}).groupby('currency')['exchange_rate'].median()
+    existing = set(FXRate.objects.filter(reporting_period=reporting_period).values_list('currency', flat=True))
+    created = FXRate.objects.bulk_create([
+        FXRate(
+            reporting_period=reporting_period,
+            currency=currency,
+            rate_to_usd=round(rate, 8),
+            source='discount_rates',
+        )
+        for currency, rate in medians.items()
+        if currency not in existing and rate > 0
+    ])
+    return len(created)
+
+
+def rate_table(periods):
+    """Return a DataFrame of (reporting_period, currency, rate_to_usd) for the given periods."""
+    periods = set(periods)
+    rates = pd.DataFrame.from_records(
+        FXRate.objects.filter(reporting_period__in=periods).values_list('reporting_period', 'currency', 'rate_to_usd'),
+        columns=['reporting_period', 'currency', 'rate_to_usd'],
+    )
+
+    # Periods without any rate are seeded from reported data once
+    missing = periods - set(rates['reporting_period'])
+    if missing and sum([derive_rates(period) for period in missing]):
+        return rate_table(periods)
+
+    # The reporting currency always converts at par
+    par = pd.DataFrame({
+        'reporting_period': list(periods),
+        'currency': REPORTING_CURRENCY,
+        'rate_to_usd': 1.0,
+    })
+    rates = pd.concat([rates[rates['currency'] != REPORTING_CURRENCY], par], ignore_index=True)
+    return rates.astype({'rate_to_usd': 'float64'})
+
+
+def get_rates(reporting_period):
+    """Return {currency: rate_to_usd} for one period, cached."""
+    key = f'fx:rates:{reporting_period}:{generation(reporting_period)}'
+    rates = cache.get(key)
+    if rates is None:
+        table = rate_table([reporting_period])
+        rates = dict(zip(table['currency'], table['rate_to_usd']))
+        cache.set(key, rates, _timeout())
+    return rates
+
+
+def normalize_frame(df, columns, to_currency=REPORTING_CURRENCY):
+    """
+    Convert monetary columns of a fact DataFrame to to_currency.
+
+    df needs reporting_period and currency columns. Rows without a known rate
+    get NaN amounts rather than being silently left unconverted.
+    """
+    if df.empty:
+        return df.assign(currency=to_currency)
+
+    rates = rate_table(df['reporting_period'].unique())
+    frame = df.merge(rates, on=['reporting_period', 'currency'], how='left')
+    factor = frame['rate_to_usd']
+    if to_currency != REPORTING_CURRENCY:
+        target = rates[rates['currency'] == to_currency][['reporting_period', 'rate_to_usd']]
+        target = target.rename(columns={'rate_to_usd': 'target_rate'})
+        factor = factor / frame[['reporting_period']].merge(target, on='reporting_period', how='left')['target_rate']
+
+    frame[columns] = frame[columns].astype('float64').mul(factor, axis=0)
+    frame['currency'] = to_currency
+    return frame.drop(columns=['rate_to_usd'])
+
+
+def normalize_queryset(queryset, fields=None, to_currency=REPORTING_CURRENCY):
+    """Load a fact queryset into a DataFrame with its monetary fields converted to to_currency."""
+    fields = fields or money_fields(queryset.model)
+    df = pd.DataFrame.from_records(
+        queryset.values('institution_id', 'reporting_period', 'currency', *fields),
+        columns=['institution_id', 'reporting_period', 'currency', *fields],
+    )
+    return normalize_frame(df, fields, to_currency)
+
+
+def consolidated_totals(model, reporting_period, to_currency=REPORTING_CURRENCY):
+    """
+    Return per-institution totals of a model's monetary fields for a period,
+    converted to to_currency and summed across currencies. Memoised per period.
+    """
+    key = f'fx:totals:{model._meta.model_name}:{reporting_period}:{to_currency}:{generation(reporting_period)}'
+    totals = cache.get(key)
+    if totals is None:
+        fields = money_fields(model)
+        frame = normalize_queryset(model.objects.filter(reporting_period=reporting_period), fields, to_currency)
+        totals = frame.groupby('institution_id')[fields].sum(min_count=1)
+        cache.set(key, totals, _timeout())
+    return totals
+
+
+def institution_total(model, reporting_period, institution_id, field, to_currency=REPORTING_CURRENCY):
+    """Return one institution's consolidated total for a field, or None if it cannot be converted."""
+    totals = consolidated_totals(model, reporting_period, to_currency)
+    if institution_id not in totals.index:
+        return None
+    value = totals.at[institution_id, field]
+    return None if pd.isna(value) else float(value)
+
+
+def invalidate_period(reporting_period):
+    """Drop every memoised rate and total for a period."""
+    key = f'fx:generation:{reporting_period}'
+    if not cache.add(key, 1, None):
+        cache.incr(key)
+
+
+def generation(reporting_period):
+    """Counter that moves whenever a rate or fact row of the period changes; use it in cache keys."""
+    return cache.get(f'fx:generation:{reporting_period}', 0)
+
+
+def _timeout():
+    return getattr(settings, 'FX_CACHE_TIMEOUT', 3600)
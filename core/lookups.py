@@ -0,0 +1,48 @@
+"""
+Cached lookup lists for filter dropdowns.
+
+Dropdowns such as the institution filter or the admin's reporting period
+filter are rendered on most list pages but change rarely, so they are read
+from the cache and rebuilt only after the underlying rows are saved or
+deleted, instead of running a DISTINCT scan over the table on every page.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Institution
+
+
+INSTITUTION_CHOICES_KEY = 'lookups:institutions'
+
+
+def institution_choices():
+    """Return [{'id', 'name'}] for every institution, ordered by name."""
+    choices = cache.get(INSTITUTION_CHOICES_KEY)
+    if choices is None:
+        choices = list(Institution.objects.order_by('name').values('id', 'name'))
+        cache.set(INSTITUTION_CHOICES_KEY, choices, getattr(settings, 'LOOKUP_CACHE_TIMEOUT', 3600))
+    return choices
+
+
+def invalidate_institution_choices():
+    cache.delete(INSTITUTION_CHOICES_KEY)
+
+
+def distinct_values(model, field):
+    """Return the sorted distinct non-null values of a model field, cached until the model changes."""
+    key = f'lookups:distinct:{model._meta.label_lower}:{field}:{_generation(model)}'
+    values = cache.get(key)
+    if values is None:
+        values = sorted(model.objects.exclude(**{f'{field}__isnull': True}).order_by().values_list(field, flat=True).distinct())
+        cache.set(key, values, getattr(settings, 'LOOKUP_CACHE_TIMEOUT', 3600))
+    return values
+
+
+def invalidate_distinct_values(model):
+    key = f'lookups:distinct:{model._meta.label_lower}:generation'
+    if not cache.add(key, 1, None):
+        cache.incr(key)
+
+
+def _generation(model):
+    return cache.get(f'lookups:distinct:{model._meta.label_lower}:generation', 0)
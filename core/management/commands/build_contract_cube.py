@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.cube import run_cube
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the contract group roll-up cube for periods whose contract groups changed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rebuild the cube for every reporting period')
+
+    def handle(self, *args, **options):
+        periods, written = run_cube(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} cube cell(s) for {periods} period(s)'))
@@ -0,0 +1,33 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Institution
+from core.reports import queue_report_packs
+
+
+class Command(BaseCommand):
+    help = 'Build quarterly regulatory report packs in parallel across institutions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('period', help='Reporting period date (YYYY-MM-DD)')
+        parser.add_argument('--institution', type=int, action='append', help='Limit to an institution id (repeatable)')
+
+    def handle(self, *args, **options):
+        try:
+            reporting_period = date.fromisoformat(options['period'])
+        except ValueError:
+            raise CommandError('period must be a date in YYYY-MM-DD format')
+
+        institutions = None
+        if options['institution']:
+            institutions = Institution.objects.filter(id__in=options['institution'])
+
+        packs = queue_report_packs(reporting_period, institutions=institutions, block=True)
+        for pack in packs:
+            line = f'{pack.institution.name}: {pack.status}'
+            if pack.status == 'failed':
+                self.stderr.write(f'{line} ({pack.error})')
+            else:
+                self.stdout.write(line)
+        self.stdout.write(self.style.SUCCESS(f'{len(packs)} report pack(s) processed'))
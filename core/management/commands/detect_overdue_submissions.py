@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from core.filings import detect_overdue, generate_calendar
+
+
+class Command(BaseCommand):
+    help = (
+        'Raise overdue-submission alerts from the filing calendar and resolve those since filed. '
+        'Intended to run daily from cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--generate-year', type=int, action='append', help='Create quarterly calendar entries for a year first (repeatable)')
+
+    def handle(self, *args, **options):
+        for year in options['generate_year'] or []:
+            created = generate_calendar(year)
+            self.stdout.write(f'Filing calendar {year}: {created} entr(ies) created')
+
+        created, resolved = detect_overdue()
+        self.stdout.write(self.style.SUCCESS(f'{created} overdue alert(s) raised, {resolved} resolved'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for institutions, submission notes and alerts.'
+
+    def handle(self, *args, **options):
+        total = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} document(s)'))
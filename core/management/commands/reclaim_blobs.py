@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.blobs import reclaim_blobs
+
+
+class Command(BaseCommand):
+    help = 'Delete stored upload files that no submission version references any more.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Blobs to delete per batch')
+
+    def handle(self, *args, **options):
+        reclaimed = reclaim_blobs(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Reclaimed {reclaimed} blob(s)'))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from core.models import CSMProfitability, IFRS17Submission
+from core.reconciliation import reconcile_csm_facts, reconcile_submissions
+
+
+class Command(BaseCommand):
+    help = 'Recompute CSM roll-forwards and liability totals and report reconciliation breaks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--period', help='Only reconcile this reporting period (YYYY-MM-DD)')
+        parser.add_argument('--abs-tolerance', type=float, help='Absolute tolerance (defaults to settings)')
+        parser.add_argument('--rel-tolerance', type=float, help='Relative tolerance (defaults to settings)')
+
+    def handle(self, *args, **options):
+        submissions = IFRS17Submission.current.all()
+        facts = None
+        if options['period']:
+            submissions = submissions.filter(reporting_period=options['period'])
+            facts = CSMProfitability.objects.filter(reporting_period=options['period'])
+        tolerances = options['abs_tolerance'], options['rel_tolerance']
+
+        for label, result in [
+            ('Uploaded files', reconcile_submissions(submissions, *tolerances)),
+            ('CSM profitability facts', reconcile_csm_facts(facts, *tolerances)),
+        ]:
+            breaks = result[result['is_break']]
+            self.stdout.write(f'{label}: {len(result)} row(s) reconciled, {len(breaks)} break(s)')
+            for row in breaks.to_dict('records'):
+                subject = row.get('contract_group') or row.get('id')
+                self.stdout.write(
+                    f"  {row['check']} {subject}: reported {row['reported']:,.2f}, "
+                    f"expected {row['expected']:,.2f}, difference {row['difference']:,.2f}"
+                )
+        self.stdout.write(self.style.SUCCESS('Reconciliation complete'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.alerts import run_alert_engine
+
+
+class Command(BaseCommand):
+    help = 'Raise compliance alerts for institutions and periods whose data changed since the last run.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Re-evaluate every institution and period')
+
+    def handle(self, *args, **options):
+        pairs, created = run_alert_engine(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Evaluated {pairs} institution/period pair(s), created {created} alert(s)'
+        ))
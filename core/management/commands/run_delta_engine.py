@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.deltas import run_delta_engine
+
+
+class Command(BaseCommand):
+    help = 'Refresh quarter-on-quarter and year-on-year deltas for institutions whose facts changed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Recompute deltas for every institution')
+
+    def handle(self, *args, **options):
+        institutions, written = run_delta_engine(full=options['full'])
+        scope = 'all institutions' if institutions is None else f'{institutions} institution(s)'
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} delta(s) for {scope}'))
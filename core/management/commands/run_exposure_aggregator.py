@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.reinsurance import run_exposure_aggregator
+
+
+class Command(BaseCommand):
+    help = 'Refresh industry reinsurance exposure summaries and concentration indices for changed periods.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Re-aggregate every reporting period')
+
+    def handle(self, *args, **options):
+        periods, written = run_exposure_aggregator(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} reinsurer summary row(s) for {periods} period(s)'))
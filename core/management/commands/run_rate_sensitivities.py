@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import DiscountRates
+from core.sensitivity import parse_shocks, rate_sensitivities
+
+
+class Command(BaseCommand):
+    help = 'Recompute PV and PV01 of every contract group under parallel and twisted discount-rate shocks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--period', help='Reporting period (YYYY-MM-DD); defaults to the latest')
+        parser.add_argument('--parallel', help='Comma-separated parallel shocks in bp, e.g. -100,-50,50,100')
+        parser.add_argument('--twist', help='Comma-separated short:long twists in bp, e.g. -50:50,50:-50')
+
+    def handle(self, *args, **options):
+        period = options['period'] or DiscountRates.objects.order_by('-reporting_period').values_list(
+            'reporting_period', flat=True
+        ).first()
+        if period is None:
+            raise CommandError('No discount rates have been loaded')
+        try:
+            shocks = parse_shocks(options['parallel'], options['twist'])
+        except ValueError as e:
+            raise CommandError(f'Invalid shock: {e}')
+
+        results = rate_sensitivities(period, shocks)
+        for row in results.to_dict('records'):
+            self.stdout.write(
+                f"Institution {row['institution_id']} ({row['currency']}): PV {row['base_pv']:,.2f}, "
+                f"PV01 {row['pv01']:,.2f} (reported {row['reported_1bp']:,.2f})"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Recomputed sensitivities for {len(results)} institution/currency pair(s) for {period}'
+        ))
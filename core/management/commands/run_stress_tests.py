@@ -0,0 +1,40 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import IFRS17Submission
+from core.scenarios import SCENARIOS
+from core.stress import run_scenarios
+
+
+class Command(BaseCommand):
+    help = 'Apply stress scenarios to every institution for a reporting period and store solvency outcomes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--period', help='Reporting period (YYYY-MM-DD); defaults to the latest')
+        parser.add_argument(
+            '--scenario', action='append', choices=list(SCENARIOS),
+            help='Scenario to run (repeatable); defaults to all built-in scenarios',
+        )
+        parser.add_argument('--definition', help='JSON file holding a custom scenario definition')
+        parser.add_argument('--force', action='store_true', help='Re-evaluate even if a stored run is current')
+
+    def handle(self, *args, **options):
+        period = options['period'] or IFRS17Submission.current.order_by('-reporting_period').values_list(
+            'reporting_period', flat=True
+        ).first()
+        if period is None:
+            raise CommandError('No submissions have been loaded')
+
+        scenarios = list(options['scenario'] or [])
+        if options['definition']:
+            with open(options['definition']) as f:
+                scenarios.append(json.load(f))
+        try:
+            runs = run_scenarios(period, scenarios or None, force=options['force'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for run in runs:
+            self.stdout.write(f'{run.label}: {run.institutions} institution(s), {run.breaches} breach(es)')
+        self.stdout.write(self.style.SUCCESS(f'Stress tests complete for {period}'))
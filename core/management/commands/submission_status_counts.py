@@ -0,0 +1,45 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from core.workflow import rebuild_status_counts, status_counts, status_counts_at
+
+
+class Command(BaseCommand):
+    help = (
+        'Print the number of submissions in each status, recount them from the submissions table, '
+        'or read them back from the event log as of a past moment.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Recount the running totals, e.g. after rows were changed outside the ORM')
+        parser.add_argument('--at', help='Counts as of this date or datetime (YYYY-MM-DD[ HH:MM])')
+
+    def handle(self, *args, **options):
+        if options['rebuild'] and options['at']:
+            raise CommandError('--rebuild and --at cannot be combined')
+
+        if options['at']:
+            try:
+                day = parse_date(options['at'])
+                when = parse_datetime(options['at'])
+            except ValueError:
+                day = when = None
+            if day is not None:
+                # A bare date means the end of that day
+                when = datetime.datetime.combine(day, datetime.time.max)
+            elif when is None:
+                raise CommandError(f"Invalid --at value: {options['at']}")
+            if timezone.is_naive(when):
+                when = timezone.make_aware(when)
+            counts = status_counts_at(when)
+        elif options['rebuild']:
+            counts = rebuild_status_counts()
+        else:
+            counts = status_counts()
+
+        for status, count in counts.items():
+            self.stdout.write(f'{status}: {count}')
+        self.stdout.write(self.style.SUCCESS(f'{sum(counts.values())} submission(s)'))
@@ -0,0 +1,311 @@
+"""
+Application metrics in the Prometheus text format.
+
+Counters, gauges and histograms are declared once at import time and
+updated in memory under a lock. Each WSGI worker process periodically
+writes its values to its own JSON file in METRICS_DIR (at most every
+METRICS_FLUSH_SECONDS, checked at the end of each request), and the
+/metrics endpoint merges the files of every worker: counters and histograms
+are summed, gauges are summed over live processes only. Without METRICS_DIR
+the endpoint shows the serving process alone.
+
+Files of exited workers are kept so counters stay cumulative; empty the
+directory when the application is redeployed, as Prometheus expects
+counters to reset with a restart.
+
+Metric names use the ipec_ prefix, and durations are in seconds and sizes
+in bytes, following Prometheus naming conventions.
+"""
+import glob
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.http import HttpResponse
+
+
+REGISTRY = {}
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (1024, 10240, 102400, 512000, 1048576, 5242880, 10485760, 52428800)
+
+_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric:
+    """A named metric with a fixed set of label names and one value per label combination."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        if name in REGISTRY:
+            raise ValueError(f'Duplicate metric: {name}')
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.values = {}
+        REGISTRY[name] = self
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f'{self.name} expects labels {self.labels}, got {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def dump(self):
+        """Values as JSON-friendly [label values, value] pairs."""
+        with _lock:
+            return [[list(key), value] for key, value in self.values.items()]
+
+    def reset(self):
+        with _lock:
+            self.values.clear()
+
+
+class Counter(Metric):
+    """A value that only goes up."""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    @staticmethod
+    def merge(values):
+        return sum(values)
+
+    def samples(self, merged):
+        for key, value in sorted(merged.items()):
+            yield f'{self.name}{_format_labels(self.labels, key)} {_format_value(value)}'
+
+
+class Gauge(Counter):
+    """A value that goes up and down, e.g. requests in progress."""
+
+    kind = 'gauge'
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with _lock:
+            self.values[key] = value
+
+    @contextmanager
+    def track(self, **labels):
+        """Increment the gauge for the duration of the block."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, with their sum and count."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with _lock:
+            state = self.values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, then the +Inf overflow, sum and count
+                state = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            state[bisect_left(self.buckets, value)] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    @staticmethod
+    def merge(values):
+        return [sum(parts) for parts in zip(*values)]
+
+    def samples(self, merged):
+        for key, state in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), state):
+                cumulative += count
+                labels = _format_labels(self.labels, key, [('le', _format_value(bound))])
+                yield f'{self.name}_bucket{labels} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(self.labels, key)} {_format_value(state[-2])}'
+            yield f'{self.name}_count{_format_labels(self.labels, key)} {state[-1]}'
+
+
+# Multi-process storage
+
+class _Storage:
+    """Tracks this process's metrics file and when it was last written."""
+
+    def __init__(self):
+        self.pid = None
+        self.path = None
+        self.flushed = 0.0
+
+    def check_fork(self):
+        """A forked worker starts from zero under its own file rather than repeating its parent's values."""
+        pid = os.getpid()
+        if pid != self.pid:
+            if self.pid is not None:
+                for metric in REGISTRY.values():
+                    metric.reset()
+            self.pid = pid
+            directory = metrics_dir()
+            self.path = os.path.join(directory, f'metrics-{pid}-{time.time_ns()}.json') if directory else None
+            self.flushed = 0.0
+
+
+_storage = _Storage()
+
+
+def metrics_dir():
+    return getattr(settings, 'METRICS_DIR', '')
+
+
+def flush(force=False):
+    """Write this process's values to its file in METRICS_DIR (rate limited unless force is True)."""
+    _storage.check_fork()
+    if not _storage.path:
+        return
+    now = time.monotonic()
+    if not force and now - _storage.flushed < getattr(settings, 'METRICS_FLUSH_SECONDS', 1.0):
+        return
+    payload = {'pid': _storage.pid, 'metrics': {name: metric.dump() for name, metric in REGISTRY.items()}}
+    directory = os.path.dirname(_storage.path)
+    os.makedirs(directory, exist_ok=True)
+    # Write then rename, so readers never see a half-written file
+    handle, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(handle, 'w') as fileobj:
+        json.dump(payload, fileobj)
+    os.replace(temporary, _storage.path)
+    _storage.flushed = now
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def collect():
+    """Merged values per metric name: {name: {label values: value}}."""
+    _storage.check_fork()
+    if not _storage.path:
+        return {name: dict(metric.values) for name, metric in REGISTRY.items()}
+
+    flush(force=True)
+    parts = {name: {} for name in REGISTRY}
+    for path in glob.glob(os.path.join(os.path.dirname(_storage.path), 'metrics-*.json')):
+        try:
+            with open(path) as fileobj:
+                payload = json.load(fileobj)
+        except (OSError, ValueError):
+            continue
+        alive = _alive(payload['pid'])
+        for name, values in payload['metrics'].items():
+            metric = REGISTRY.get(name)
+            if metric is None or (metric.kind == 'gauge' and not alive):
+                continue
+            for key, value in values:
+                parts[name].setdefault(tuple(key), []).append(value)
+    return {
+        name: {key: REGISTRY[name].merge(values) for key, values in merged.items()}
+        for name, merged in parts.items()
+    }
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for name, merged in collect().items():
+        metric = REGISTRY[name]
+        lines.append(f'# HELP {name} {metric.documentation}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        lines.extend(metric.samples(merged))
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint, guarded by METRICS_TOKEN when one is configured."""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+    return HttpResponse(render(), content_type=CONTENT_TYPE)
+
+
+# Application metrics
+
+REQUESTS = Counter('ipec_http_requests_total', 'HTTP requests by view, method and status.', ['view', 'method', 'status'])
+REQUEST_SECONDS = Histogram('ipec_http_request_duration_seconds', 'HTTP request latency by view.', ['view', 'method'])
+REQUESTS_IN_PROGRESS = Gauge('ipec_http_requests_in_progress', 'HTTP requests being served.', ['method'])
+
+UPLOAD_BYTES = Histogram('ipec_upload_size_bytes', 'Size of uploaded submission files.', ['file_type'], SIZE_BUCKETS)
+UPLOADS = Counter('ipec_uploads_total', 'Uploaded submission files by file type and load outcome.', ['file_type', 'outcome'])
+PARSE_SECONDS = Histogram('ipec_parse_duration_seconds', 'Time to parse an uploaded file.', ['source', 'file_type'])
+VALIDATION_SECONDS = Histogram('ipec_validation_duration_seconds', 'Time to run data validation for an institution.')
+EXPORT_SECONDS = Histogram('ipec_export_duration_seconds', 'Time to produce a data export or report pack.', ['format'])
+EXPORT_ROWS = Counter('ipec_export_rows_total', 'Rows written to data exports.', ['format'])
+
+
+class MetricsMiddleware:
+    """Count and time every request by its resolved view name."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        with REQUESTS_IN_PROGRESS.track(method=request.method):
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match is not None else 'unmatched'
+        REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        REQUEST_SECONDS.observe(duration, view=view, method=request.method)
+        flush()
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_alter_ifrs17submission_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ifrs17submission',
+            name='template',
+            field=models.CharField(blank=True, choices=[('ifrs17_summary', 'IFRS 17 Summary'), ('contract_liabilities', 'Insurance Contract Liabilities'), ('csm_rollforward', 'CSM Roll-forward'), ('risk_adjustment_reconciliation', 'Risk Adjustment Reconciliation'), ('loss_component_analysis', 'Loss Component Analysis'), ('csm_profitability', 'CSM Profitability'), ('insurance_revenue', 'Insurance Revenue'), ('discount_rates', 'Discount Rates'), ('reinsurance_held', 'Reinsurance Held'), ('ifrs4_transition', 'IFRS 4 Transition'), ('contract_grouping', 'Contract Grouping'), ('data_quality', 'Data Quality')], db_index=True, max_length=40),
+        ),
+    ]
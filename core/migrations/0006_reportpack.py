@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:52
+
+import core.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_ifrs17submission_template'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportPack',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('reporting_period', models.DateField()),
+                ('data_version', models.CharField(max_length=40)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('file', models.FileField(blank=True, null=True, upload_to=core.models.report_pack_path)),
+                ('error', models.TextField(blank=True)),
+                ('generated_at', models.DateTimeField(blank=True, null=True)),
+                ('institution', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_packs', to='core.institution')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'unique_together': {('institution', 'reporting_period', 'data_version')},
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_reportpack'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FXRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('reporting_period', models.DateField()),
+                ('currency', models.CharField(choices=[('ZWL', 'Zimbabwe Dollar'), ('USD', 'US Dollar')], max_length=3)),
+                ('rate_to_usd', models.DecimalField(decimal_places=8, max_digits=18)),
+                ('source', models.CharField(choices=[('manual', 'Manual'), ('discount_rates', 'Derived from Discount Rates')], default='manual', max_length=20)),
+            ],
+            options={
+                'ordering': ['-reporting_period', 'currency'],
+                'unique_together': {('reporting_period', 'currency')},
+            },
+        ),
+    ]
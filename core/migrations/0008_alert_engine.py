@@ -0,0 +1,59 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_fxrate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('consumer', models.CharField(max_length=50, unique=True)),
+                ('last_change_id', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='FactChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('reporting_period', models.DateField()),
+                ('model_name', models.CharField(max_length=50)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='compliancealert',
+            name='reporting_period',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='compliancealert',
+            name='rule',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='compliancealert',
+            index=models.Index(fields=['institution', 'rule', 'reporting_period'], name='core_compli_institu_c36926_idx'),
+        ),
+        migrations.AddField(
+            model_name='factchange',
+            name='institution',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fact_changes', to='core.institution'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_alert_engine'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FilingCalendar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('institution_type', models.CharField(choices=[('life', 'Life Insurance'), ('general', 'General Insurance'), ('composite', 'Composite'), ('reinsurance', 'Reinsurance')], max_length=20)),
+                ('reporting_period', models.DateField()),
+                ('due_date', models.DateField(db_index=True)),
+            ],
+            options={
+                'ordering': ['-reporting_period', 'institution_type'],
+                'unique_together': {('institution_type', 'reporting_period')},
+            },
+        ),
+    ]
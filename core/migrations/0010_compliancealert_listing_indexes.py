@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_filingcalendar'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='compliancealert',
+            index=models.Index(fields=['-created_at', '-id'], name='core_compli_created_1c3238_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='compliancealert',
+            index=models.Index(fields=['is_resolved', 'severity', '-created_at', '-id'], name='core_compli_is_reso_3a4645_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='compliancealert',
+            index=models.Index(fields=['is_resolved', 'alert_type', '-created_at', '-id'], name='core_compli_is_reso_53b1d8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='compliancealert',
+            index=models.Index(fields=['institution', 'is_resolved', '-created_at', '-id'], name='core_compli_institu_113d83_idx'),
+        ),
+    ]
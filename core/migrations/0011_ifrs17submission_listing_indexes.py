@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_compliancealert_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ifrs17submission',
+            index=models.Index(fields=['-submission_date', '-id'], name='core_ifrs17_submiss_477d7c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ifrs17submission',
+            index=models.Index(fields=['institution', '-submission_date', '-id'], name='core_ifrs17_institu_94de82_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ifrs17submission',
+            index=models.Index(fields=['status', '-submission_date', '-id'], name='core_ifrs17_status_b081a4_idx'),
+        ),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:59
+
+from django.db import migrations, models
+
+
+SQLITE_FORWARD = [
+    """CREATE VIRTUAL TABLE core_searchdocument_fts USING fts5(
+        body, content='core_searchdocument', content_rowid='id',
+        prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER core_searchdocument_ai AFTER INSERT ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(rowid, body) VALUES (new.id, new.body);
+    END""",
+    """CREATE TRIGGER core_searchdocument_ad AFTER DELETE ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, body) VALUES ('delete', old.id, old.body);
+    END""",
+    """CREATE TRIGGER core_searchdocument_au AFTER UPDATE ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, body) VALUES ('delete', old.id, old.body);
+        INSERT INTO core_searchdocument_fts(rowid, body) VALUES (new.id, new.body);
+    END""",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS core_searchdocument_au",
+    "DROP TRIGGER IF EXISTS core_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS core_searchdocument_ai",
+    "DROP TABLE IF EXISTS core_searchdocument_fts",
+]
+
+POSTGRES_FORWARD = [
+    """ALTER TABLE core_searchdocument ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', body)) STORED""",
+    "CREATE INDEX core_searchdocument_vector_idx ON core_searchdocument USING GIN (search_vector)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS core_searchdocument_vector_idx",
+    "ALTER TABLE core_searchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+# Mirrors core.search.SEARCH_DOCUMENTS at the time of this migration
+DOCUMENTS = {
+    'institution': ('Institution', ['name', 'registration_number', 'license_number', 'contact_person', 'email']),
+    'submission': ('IFRS17Submission', ['notes']),
+    'alert': ('ComplianceAlert', ['title', 'description']),
+}
+
+
+def _run(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD})
+
+    SearchDocument = apps.get_model('core', 'SearchDocument')
+    for kind, (model_name, fields) in DOCUMENTS.items():
+        model = apps.get_model('core', model_name)
+        SearchDocument.objects.bulk_create([
+            SearchDocument(kind=kind, object_id=values['id'], body=' '.join(str(values[field]) for field in fields if values[field]))
+            for values in model.objects.values('id', *fields).iterator()
+            if any(values[field] for field in fields)
+        ], batch_size=2000)
+
+
+def drop_search_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRES_REVERSE})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_ifrs17submission_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('kind', models.CharField(max_length=20)),
+                ('object_id', models.PositiveIntegerField()),
+                ('body', models.TextField()),
+            ],
+            options={
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:04
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def seed_workflow(apps, schema_editor):
+    """Start each existing submission's history and count current statuses."""
+    IFRS17Submission = apps.get_model('core', 'IFRS17Submission')
+    SubmissionEvent = apps.get_model('core', 'SubmissionEvent')
+    SubmissionStatusCount = apps.get_model('core', 'SubmissionStatusCount')
+
+    SubmissionEvent.objects.bulk_create([
+        SubmissionEvent(submission_id=submission_id, event='uploaded', to_status=status, ts=submission_date)
+        for submission_id, status, submission_date in IFRS17Submission.objects.values_list(
+            'id', 'status', 'submission_date'
+        ).iterator()
+    ], batch_size=2000)
+    SubmissionStatusCount.objects.bulk_create([
+        SubmissionStatusCount(status=row['status'], count=row['count'])
+        for row in IFRS17Submission.objects.order_by().values('status').annotate(count=models.Count('id'))
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0012_searchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionStatusCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(max_length=20, unique=True)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SubmissionEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(choices=[('uploaded', 'Uploaded'), ('parsed', 'Parsed'), ('validated', 'Validated'), ('reviewed', 'Reviewed'), ('overridden', 'Overridden')], max_length=20)),
+                ('from_status', models.CharField(blank=True, max_length=20)),
+                ('to_status', models.CharField(blank=True, max_length=20)),
+                ('detail', models.TextField(blank=True)),
+                ('ts', models.DateTimeField(default=django.utils.timezone.now)),
+                ('submission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='core.ifrs17submission')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['ts', 'id'],
+                'indexes': [models.Index(fields=['submission', 'ts'], name='core_submis_submiss_38cf47_idx')],
+            },
+        ),
+        migrations.RunPython(seed_workflow, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:07
+
+import os
+
+import core.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_original_filenames(apps, schema_editor):
+    """Existing uploads are matched for override by their stored file name."""
+    IFRS17Submission = apps.get_model('core', 'IFRS17Submission')
+    submissions = list(IFRS17Submission.objects.exclude(uploaded_file='').exclude(uploaded_file__isnull=True).only('uploaded_file'))
+    for submission in submissions:
+        submission.original_filename = os.path.basename(submission.uploaded_file.name)
+    IFRS17Submission.objects.bulk_update(submissions, ['original_filename'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_submission_workflow'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('file', models.FileField(upload_to=core.models.blob_path)),
+                ('size', models.BigIntegerField()),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='ifrs17submission',
+            name='is_current',
+            field=models.BooleanField(db_index=True, default=True),
+        ),
+        migrations.AddField(
+            model_name='ifrs17submission',
+            name='original_filename',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='ifrs17submission',
+            name='supersedes',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='superseded_by', to='core.ifrs17submission'),
+        ),
+        migrations.AddField(
+            model_name='ifrs17submission',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddIndex(
+            model_name='ifrs17submission',
+            index=models.Index(fields=['institution', 'reporting_period', 'original_filename', 'is_current'], name='core_ifrs17_institu_9e83bd_idx'),
+        ),
+        migrations.AddField(
+            model_name='ifrs17submission',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='submissions', to='core.fileblob'),
+        ),
+        migrations.RunPython(fill_original_filenames, migrations.RunPython.noop),
+    ]
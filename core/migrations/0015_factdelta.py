@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_submission_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FactDelta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('model_name', models.CharField(max_length=50)),
+                ('reporting_period', models.DateField()),
+                ('currency', models.CharField(max_length=3)),
+                ('segment', models.CharField(blank=True, max_length=120)),
+                ('field', models.CharField(max_length=60)),
+                ('value', models.DecimalField(decimal_places=4, max_digits=20)),
+                ('previous_value', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('qoq_change', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('qoq_pct', models.FloatField(blank=True, null=True)),
+                ('year_ago_value', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('yoy_change', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('yoy_pct', models.FloatField(blank=True, null=True)),
+                ('institution', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fact_deltas', to='core.institution')),
+            ],
+            options={
+                'ordering': ['-reporting_period', 'model_name', 'field'],
+                'indexes': [models.Index(fields=['institution', 'model_name', 'field', '-reporting_period'], name='core_factde_institu_2d900f_idx')],
+                'unique_together': {('model_name', 'institution', 'reporting_period', 'currency', 'segment', 'field')},
+            },
+        ),
+    ]
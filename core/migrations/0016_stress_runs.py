@@ -0,0 +1,53 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_factdelta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StressRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('scenario', models.CharField(max_length=60)),
+                ('label', models.CharField(max_length=120)),
+                ('scenario_hash', models.CharField(max_length=64)),
+                ('data_version', models.CharField(max_length=64)),
+                ('reporting_period', models.DateField()),
+                ('definition', models.JSONField(default=dict)),
+                ('institutions', models.IntegerField(default=0)),
+                ('breaches', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-reporting_period', 'scenario', '-created_at'],
+                'indexes': [models.Index(fields=['reporting_period', 'scenario', '-created_at'], name='core_stress_reporti_7ab6e2_idx')],
+                'unique_together': {('scenario_hash', 'data_version', 'reporting_period')},
+            },
+        ),
+        migrations.CreateModel(
+            name='StressResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('own_funds_before', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('own_funds_after', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('required_capital_after', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('solvency_ratio_before', models.FloatField()),
+                ('solvency_ratio_after', models.FloatField()),
+                ('breach', models.BooleanField(default=False)),
+                ('institution', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stress_results', to='core.institution')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='core.stressrun')),
+            ],
+            options={
+                'ordering': ['solvency_ratio_after'],
+                'unique_together': {('run', 'institution')},
+            },
+        ),
+    ]
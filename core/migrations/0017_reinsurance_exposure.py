@@ -0,0 +1,93 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_stress_runs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Reinsurer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=200, unique=True)),
+                ('country', models.CharField(blank=True, max_length=100)),
+                ('is_domestic', models.BooleanField(default=False)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='ifrs17submission',
+            name='template',
+            field=models.CharField(blank=True, choices=[('ifrs17_summary', 'IFRS 17 Summary'), ('contract_liabilities', 'Insurance Contract Liabilities'), ('csm_rollforward', 'CSM Roll-forward'), ('risk_adjustment_reconciliation', 'Risk Adjustment Reconciliation'), ('loss_component_analysis', 'Loss Component Analysis'), ('csm_profitability', 'CSM Profitability'), ('insurance_revenue', 'Insurance Revenue'), ('discount_rates', 'Discount Rates'), ('reinsurance_held', 'Reinsurance Held'), ('reinsurance_counterparties', 'Reinsurance Counterparties'), ('ifrs4_transition', 'IFRS 4 Transition'), ('contract_grouping', 'Contract Grouping'), ('data_quality', 'Data Quality')], db_index=True, max_length=40),
+        ),
+        migrations.CreateModel(
+            name='ReinsuranceConcentration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reporting_period', models.DateField()),
+                ('currency', models.CharField(max_length=3)),
+                ('total_exposure', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('counterparties', models.IntegerField()),
+                ('hhi', models.FloatField()),
+                ('top_counterparties', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('institution', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reinsurance_concentration', to='core.institution')),
+            ],
+            options={
+                'ordering': ['-reporting_period', 'currency'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReinsurerExposureSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reporting_period', models.DateField()),
+                ('currency', models.CharField(max_length=3)),
+                ('total_exposure', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('institutions', models.IntegerField()),
+                ('share', models.FloatField()),
+                ('reinsurer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exposure_summaries', to='core.reinsurer')),
+            ],
+            options={
+                'ordering': ['-reporting_period', 'currency', '-total_exposure'],
+                'unique_together': {('reporting_period', 'currency', 'reinsurer')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ReinsuranceExposure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('reporting_period', models.DateField()),
+                ('currency', models.CharField(choices=[('ZWL', 'Zimbabwe Dollar'), ('USD', 'US Dollar')], max_length=3)),
+                ('exposure', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('notes', models.TextField(blank=True)),
+                ('institution', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reinsurance_exposures', to='core.institution')),
+                ('reinsurer', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='exposures', to='core.reinsurer')),
+            ],
+            options={
+                'ordering': ['-reporting_period', '-exposure'],
+                'indexes': [models.Index(fields=['reporting_period', 'currency', 'reinsurer'], name='core_reinsu_reporti_331326_idx')],
+                'unique_together': {('institution', 'reporting_period', 'currency', 'reinsurer')},
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='reinsuranceconcentration',
+            constraint=models.UniqueConstraint(fields=('reporting_period', 'currency', 'institution'), name='unique_institution_concentration'),
+        ),
+        migrations.AddConstraint(
+            model_name='reinsuranceconcentration',
+            constraint=models.UniqueConstraint(condition=models.Q(('institution__isnull', True)), fields=('reporting_period', 'currency'), name='unique_industry_concentration'),
+        ),
+    ]
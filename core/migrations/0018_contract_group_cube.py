@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_reinsurance_exposure'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContractGroupCube',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reporting_period', models.DateField()),
+                ('currency', models.CharField(max_length=3)),
+                ('grouping', models.PositiveSmallIntegerField()),
+                ('product_line', models.CharField(blank=True, max_length=50)),
+                ('measurement_model', models.CharField(blank=True, max_length=10)),
+                ('risk_profile', models.CharField(blank=True, max_length=20)),
+                ('groups', models.IntegerField()),
+                ('number_of_contracts', models.BigIntegerField()),
+                ('total_contract_value', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('materiality_threshold', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('average_contract_value', models.DecimalField(decimal_places=2, max_digits=15, null=True)),
+                ('grouping_efficiency', models.FloatField(null=True)),
+                ('volatility_score', models.FloatField(null=True)),
+                ('correlation_score', models.FloatField(null=True)),
+                ('institution', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='contract_group_cube', to='core.institution')),
+            ],
+            options={
+                'ordering': ['-reporting_period', 'currency', 'grouping', '-total_contract_value'],
+                'indexes': [models.Index(fields=['reporting_period', 'grouping', 'institution', 'currency', 'product_line', 'measurement_model', 'risk_profile'], name='contract_cube_cell_idx')],
+            },
+        ),
+    ]
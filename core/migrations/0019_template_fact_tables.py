@@ -0,0 +1,83 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_contract_group_cube'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RiskAdjustmentReconciliation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('reporting_period', models.DateField()),
+                ('currency', models.CharField(choices=[('ZWL', 'Zimbabwe Dollar'), ('USD', 'US Dollar')], max_length=3)),
+                ('contract_group', models.CharField(max_length=100)),
+                ('opening_risk_adjustment', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('new_contracts_risk_adj', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('experience_adjustments', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('risk_adj_release', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('closing_risk_adjustment', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('risk_adj_impact_on_liabilities', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('notes', models.TextField(blank=True)),
+                ('institution', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='risk_adjustment_reconciliations', to='core.institution')),
+            ],
+            options={
+                'ordering': ['-reporting_period', 'contract_group'],
+                'unique_together': {('institution', 'reporting_period', 'currency', 'contract_group')},
+            },
+        ),
+        migrations.CreateModel(
+            name='LossComponentAnalysis',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('reporting_period', models.DateField()),
+                ('currency', models.CharField(choices=[('ZWL', 'Zimbabwe Dollar'), ('USD', 'US Dollar')], max_length=3)),
+                ('contract_group', models.CharField(max_length=100)),
+                ('onerous_contracts_count', models.IntegerField(blank=True, null=True)),
+                ('total_loss_component', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('immediate_recognition', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('deferred_recognition', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('impact_on_pl', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('notes', models.TextField(blank=True)),
+                ('institution', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='loss_component_analyses', to='core.institution')),
+            ],
+            options={
+                'verbose_name_plural': 'loss component analyses',
+                'ordering': ['-reporting_period', 'contract_group'],
+                'unique_together': {('institution', 'reporting_period', 'currency', 'contract_group')},
+            },
+        ),
+        migrations.CreateModel(
+            name='CSMRollforward',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('reporting_period', models.DateField()),
+                ('currency', models.CharField(choices=[('ZWL', 'Zimbabwe Dollar'), ('USD', 'US Dollar')], max_length=3)),
+                ('contract_group', models.CharField(max_length=100)),
+                ('opening_csm_balance', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('new_contracts_csm', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('interest_accretion', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('experience_adjustments', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('csm_release', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('closing_csm_balance', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('notes', models.TextField(blank=True)),
+                ('institution', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='csm_rollforwards', to='core.institution')),
+            ],
+            options={
+                'ordering': ['-reporting_period', 'contract_group'],
+                'unique_together': {('institution', 'reporting_period', 'currency', 'contract_group')},
+            },
+        ),
+    ]
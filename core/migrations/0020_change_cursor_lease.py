@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_template_fact_tables'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changecursor',
+            name='leased_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
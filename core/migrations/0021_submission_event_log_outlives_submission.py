@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_change_cursor_lease'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='submissionevent',
+            name='event',
+            field=models.CharField(choices=[('uploaded', 'Uploaded'), ('parsed', 'Parsed'), ('validated', 'Validated'), ('reviewed', 'Reviewed'), ('overridden', 'Overridden'), ('deleted', 'Deleted')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='submissionevent',
+            name='submission',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='events', to='core.ifrs17submission'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:20
+
+import os
+import re
+
+from django.db import migrations
+
+
+# Storage.get_available_name appends '_' and 7 random alphanumerics when the name is taken
+COLLISION_SUFFIX = re.compile(r'^(?P<stem>.+)_[a-zA-Z0-9]{7}(?P<ext>\.[^.]+)?$')
+
+
+def strip_collision_suffixes(apps, schema_editor):
+    """
+    0014 copied the stored basename into original_filename, so a file saved
+    as report_Ab3dE9x.csv because report.csv already existed could never be
+    matched for override. Drop the suffix where the unsuffixed name is taken
+    in the same directory, which is the only way storage adds one.
+    """
+    IFRS17Submission = apps.get_model('core', 'IFRS17Submission')
+    stored = set(
+        IFRS17Submission.objects.exclude(uploaded_file='').exclude(uploaded_file__isnull=True)
+        .values_list('uploaded_file', flat=True)
+    )
+    storage = IFRS17Submission._meta.get_field('uploaded_file').storage
+
+    submissions = []
+    for submission in IFRS17Submission.objects.exclude(uploaded_file='').exclude(uploaded_file__isnull=True).only(
+        'uploaded_file', 'original_filename'
+    ):
+        directory, basename = os.path.split(submission.uploaded_file.name)
+        match = COLLISION_SUFFIX.match(basename)
+        if submission.original_filename != basename or not match:
+            continue
+        original = match['stem'] + (match['ext'] or '')
+        taken = os.path.join(directory, original)
+        if taken in stored or storage.exists(taken):
+            submission.original_filename = original
+            submissions.append(submission)
+    IFRS17Submission.objects.bulk_update(submissions, ['original_filename'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_submission_event_log_outlives_submission'),
+    ]
+
+    operations = [
+        migrations.RunPython(strip_collision_suffixes, migrations.RunPython.noop),
+    ]
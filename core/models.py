@@ -1,5 +1,10 @@
+import os
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .schemas import TEMPLATE_CHOICES
 
 
 class BaseModel(models.Model):
@@ -48,6 +53,29 @@ class Institution(BaseModel):
         return self.name
 
 
+def blob_path(instance, filename):
+    """Store blobs under their content hash, keeping the extension for format detection."""
+    extension = os.path.splitext(filename)[1].lower()
+    return f'blobs/{instance.sha256[:2]}/{instance.sha256}{extension}'
+
+
+class FileBlob(BaseModel):
+    """Uploaded file content, stored once per distinct SHA-256 and shared by every submission that uploads it."""
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to=blob_path)
+    size = models.BigIntegerField()
+    
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.size} bytes)"
+
+
+class CurrentVersionManager(models.Manager):
+    """Only the current version of each submission."""
+    
+    def get_queryset(self):
+        return super().get_queryset().filter(is_current=True)
+
+
 class IFRS17Submission(BaseModel):
     """IFRS 17 data submission from institutions."""
     institution = models.ForeignKey(Institution, on_delete=models.CASCADE, related_name='ifrs17_submissions')
@@ -79,17 +107,44 @@ class IFRS17Submission(BaseModel):
     # File upload
     uploaded_file = models.FileField(upload_to='ifrs17_submissions/%Y/%m/', null=True, blank=True)
     file_type = models.CharField(max_length=10, choices=[('csv', 'CSV'), ('xlsx', 'Excel'), ('xbrl', 'XBRL')], null=True, blank=True)
+    template = models.CharField(max_length=40, choices=TEMPLATE_CHOICES, blank=True, db_index=True)
+    
+    # Versioning: a re-upload supersedes the previous version instead of deleting it
+    blob = models.ForeignKey(FileBlob, on_delete=models.PROTECT, null=True, blank=True, related_name='submissions')
+    original_filename = models.CharField(max_length=255, blank=True)
+    version = models.PositiveIntegerField(default=1)
+    is_current = models.BooleanField(default=True, db_index=True)
+    supersedes = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='superseded_by')
     
     notes = models.TextField(blank=True)
     reviewed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     review_date = models.DateTimeField(null=True, blank=True)
     
+    # The default manager sees every version (detail pages, dumpdata, admin);
+    # lists, totals and rules read the current ones through `current`
+    objects = models.Manager()
+    current = CurrentVersionManager()
+    
     class Meta:
         ordering = ['-submission_date']
         # Removed unique_together to allow multiple files per institution/period
+        indexes = [
+            models.Index(fields=['-submission_date', '-id']),
+            models.Index(fields=['institution', '-submission_date', '-id']),
+            models.Index(fields=['status', '-submission_date', '-id']),
+            models.Index(fields=['institution', 'reporting_period', 'original_filename', 'is_current']),
+        ]
     
     def __str__(self):
         return f"{self.institution.name} - {self.reporting_period}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so saves can adjust the status counts by delta
+        if 'status' in field_names:
+            instance._loaded_status = values[field_names.index('status')]
+        return instance
 
 
 class ComplianceAlert(BaseModel):
@@ -119,8 +174,20 @@ class ComplianceAlert(BaseModel):
     resolved_date = models.DateTimeField(null=True, blank=True)
     resolved_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     
+    # Set on alerts raised by the alert engine
+    rule = models.CharField(max_length=50, blank=True)
+    reporting_period = models.DateField(null=True, blank=True)
+    
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['institution', 'rule', 'reporting_period']),
+            # Keyset pagination on (created_at, id), alone and behind each listing filter
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['is_resolved', 'severity', '-created_at', '-id']),
+            models.Index(fields=['is_resolved', 'alert_type', '-created_at', '-id']),
+            models.Index(fields=['institution', 'is_resolved', '-created_at', '-id']),
+        ]
     
     def __str__(self):
         return f"{self.institution.name} - {self.title}"
@@ -193,6 +260,78 @@ class CSMProfitability(BaseModel):
         return f"{self.institution.name} - CSM Profitability {self.reporting_period} ({self.currency})"
 
 
+class CSMRollforward(BaseModel):
+    """CSM movement per contract group, as filed in the CSM roll-forward template."""
+    institution = models.ForeignKey(Institution, on_delete=models.CASCADE, related_name='csm_rollforwards')
+    reporting_period = models.DateField()
+    currency = models.CharField(max_length=3, choices=[('ZWL', 'Zimbabwe Dollar'), ('USD', 'US Dollar')])
+    contract_group = models.CharField(max_length=100)
+    
+    opening_csm_balance = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    new_contracts_csm = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    interest_accretion = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    experience_adjustments = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    csm_release = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    closing_csm_balance = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    
+    notes = models.TextField(blank=True)
+    
+    class Meta:
+        ordering = ['-reporting_period', 'contract_group']
+        unique_together = ['institution', 'reporting_period', 'currency', 'contract_group']
+    
+    def __str__(self):
+        return f"{self.institution.name} - CSM Roll-forward {self.contract_group} {self.reporting_period} ({self.currency})"
+
+
+class RiskAdjustmentReconciliation(BaseModel):
+    """Risk adjustment movement per contract group, as filed in the risk adjustment reconciliation template."""
+    institution = models.ForeignKey(Institution, on_delete=models.CASCADE, related_name='risk_adjustment_reconciliations')
+    reporting_period = models.DateField()
+    currency = models.CharField(max_length=3, choices=[('ZWL', 'Zimbabwe Dollar'), ('USD', 'US Dollar')])
+    contract_group = models.CharField(max_length=100)
+    
+    opening_risk_adjustment = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    new_contracts_risk_adj = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    experience_adjustments = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    risk_adj_release = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    closing_risk_adjustment = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    risk_adj_impact_on_liabilities = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    
+    notes = models.TextField(blank=True)
+    
+    class Meta:
+        ordering = ['-reporting_period', 'contract_group']
+        unique_together = ['institution', 'reporting_period', 'currency', 'contract_group']
+    
+    def __str__(self):
+        return f"{self.institution.name} - RA Reconciliation {self.contract_group} {self.reporting_period} ({self.currency})"
+
+
+class LossComponentAnalysis(BaseModel):
+    """Onerous contracts and their loss component per contract group."""
+    institution = models.ForeignKey(Institution, on_delete=models.CASCADE, related_name='loss_component_analyses')
+    reporting_period = models.DateField()
+    currency = models.CharField(max_length=3, choices=[('ZWL', 'Zimbabwe Dollar'), ('USD', 'US Dollar')])
+    contract_group = models.CharField(max_length=100)
+    
+    onerous_contracts_count = models.IntegerField(null=True, blank=True)
+    total_loss_component = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    immediate_recognition = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    deferred_recognition = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    impact_on_pl = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    
+    notes = models.TextField(blank=True)
+    
+    class Meta:
+        ordering = ['-reporting_period', 'contract_group']
+        unique_together = ['institution', 'reporting_period', 'currency', 'contract_group']
+        verbose_name_plural = 'loss component analyses'
+    
+    def __str__(self):
+        return f"{self.institution.name} - Loss Component {self.contract_group} {self.reporting_period} ({self.currency})"
+
+
 class DiscountRates(BaseModel):
     """Discount Rates and Insurance Finance Result data."""
     institution = models.ForeignKey(Institution, on_delete=models.CASCADE, related_name='discount_rates')
@@ -405,3 +544,351 @@ class DataQualityCheck(BaseModel):
     
     def __str__(self):
         return f"{self.institution.name} - Data Quality {self.reporting_period} ({self.currency})"
+
+
+def report_pack_path(instance, filename):
+    """Store packs under MEDIA_ROOT keyed by institution, period and data version."""
+    return f'report_packs/{instance.institution_id}/{instance.reporting_period:%Y-%m-%d}/{instance.data_version}/{filename}'
+
+
+class ReportPack(BaseModel):
+    """Generated quarterly regulatory report pack for an institution."""
+    institution = models.ForeignKey(Institution, on_delete=models.CASCADE, related_name='report_packs')
+    reporting_period = models.DateField()
+    data_version = models.CharField(max_length=40)
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            ('pending', 'Pending'),
+            ('running', 'Running'),
+            ('ready', 'Ready'),
+            ('failed', 'Failed'),
+        ],
+        default='pending'
+    )
+    file = models.FileField(upload_to=report_pack_path, null=True, blank=True)
+    error = models.TextField(blank=True)
+    generated_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        unique_together = ['institution', 'reporting_period', 'data_version']
+    
+    def __str__(self):
+        return f"{self.institution.name} - Report Pack {self.reporting_period} ({self.status})"
+
+
+class FXRate(BaseModel):
+    """Exchange rate to USD for a currency and reporting period."""
+    reporting_period = models.DateField()
+    currency = models.CharField(max_length=3, choices=[('ZWL', 'Zimbabwe Dollar'), ('USD', 'US Dollar')])
+    
+    # USD value of one unit of the currency
+    rate_to_usd = models.DecimalField(max_digits=18, decimal_places=8)
+    source = models.CharField(
+        max_length=20,
+        choices=[
+            ('manual', 'Manual'),
+            ('discount_rates', 'Derived from Discount Rates'),
+        ],
+        default='manual'
+    )
+    
+    class Meta:
+        ordering = ['-reporting_period', 'currency']
+        unique_together = ['reporting_period', 'currency']
+    
+    def __str__(self):
+        return f"{self.currency} {self.reporting_period}: {self.rate_to_usd} USD"
+
+
+class FactChange(BaseModel):
+    """Append-only log of institution/period pairs whose fact rows changed."""
+    institution = models.ForeignKey(Institution, on_delete=models.CASCADE, related_name='fact_changes')
+    reporting_period = models.DateField()
+    model_name = models.CharField(max_length=50)
+    
+    class Meta:
+        ordering = ['id']
+    
+    def __str__(self):
+        return f"{self.institution_id} - {self.model_name} {self.reporting_period}"
+
+
+class ChangeCursor(BaseModel):
+    """Position of a change log consumer in the FactChange log."""
+    consumer = models.CharField(max_length=50, unique=True)
+    last_change_id = models.BigIntegerField(default=0)
+    # Set while a run of the consumer holds the cursor; a lapsed lease may be taken over
+    leased_until = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.consumer} @ {self.last_change_id}"
+
+
+class FilingCalendar(BaseModel):
+    """Expected reporting period and due date for each institution type."""
+    institution_type = models.CharField(
+        max_length=20,
+        choices=[
+            ('life', 'Life Insurance'),
+            ('general', 'General Insurance'),
+            ('composite', 'Composite'),
+            ('reinsurance', 'Reinsurance'),
+        ]
+    )
+    reporting_period = models.DateField()
+    due_date = models.DateField(db_index=True)
+    
+    class Meta:
+        ordering = ['-reporting_period', 'institution_type']
+        unique_together = ['institution_type', 'reporting_period']
+    
+    def __str__(self):
+        return f"{self.get_institution_type_display()} - {self.reporting_period} due {self.due_date}"
+
+
+class SearchDocument(BaseModel):
+    """Searchable text of an institution, submission or alert, indexed by the database's full-text engine."""
+    kind = models.CharField(max_length=20)
+    object_id = models.PositiveIntegerField()
+    body = models.TextField()
+    
+    class Meta:
+        unique_together = ['kind', 'object_id']
+    
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}"
+
+
+class SubmissionEvent(models.Model):
+    """Append-only lifecycle log of an IFRS 17 submission."""
+    # No database constraint, so the log outlives a deleted submission
+    submission = models.ForeignKey(
+        IFRS17Submission, on_delete=models.DO_NOTHING, db_constraint=False, related_name='events'
+    )
+    event = models.CharField(
+        max_length=20,
+        choices=[
+            ('uploaded', 'Uploaded'),
+            ('parsed', 'Parsed'),
+            ('validated', 'Validated'),
+            ('reviewed', 'Reviewed'),
+            ('overridden', 'Overridden'),
+            ('deleted', 'Deleted'),
+        ]
+    )
+    from_status = models.CharField(max_length=20, blank=True)
+    to_status = models.CharField(max_length=20, blank=True)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    detail = models.TextField(blank=True)
+    ts = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['ts', 'id']
+        indexes = [
+            models.Index(fields=['submission', 'ts']),
+        ]
+    
+    def __str__(self):
+        return f"Submission #{self.submission_id} {self.event} at {self.ts:%Y-%m-%d %H:%M}"
+
+
+class SubmissionStatusCount(models.Model):
+    """Running number of submissions in each status, adjusted on every status change."""
+    status = models.CharField(max_length=20, unique=True)
+    count = models.IntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.status}: {self.count}"
+
+
+class FactDelta(BaseModel):
+    """Quarter-on-quarter and year-on-year change of one numeric fact field, materialised by the delta engine."""
+    model_name = models.CharField(max_length=50)
+    institution = models.ForeignKey(Institution, on_delete=models.CASCADE, related_name='fact_deltas')
+    reporting_period = models.DateField()
+    currency = models.CharField(max_length=3)
+    # Values of any extra key fields (e.g. product line / contract type), blank for one row per currency
+    segment = models.CharField(max_length=120, blank=True)
+    field = models.CharField(max_length=60)
+    
+    value = models.DecimalField(max_digits=20, decimal_places=4)
+    previous_value = models.DecimalField(max_digits=20, decimal_places=4, null=True, blank=True)
+    qoq_change = models.DecimalField(max_digits=20, decimal_places=4, null=True, blank=True)
+    qoq_pct = models.FloatField(null=True, blank=True)
+    year_ago_value = models.DecimalField(max_digits=20, decimal_places=4, null=True, blank=True)
+    yoy_change = models.DecimalField(max_digits=20, decimal_places=4, null=True, blank=True)
+    yoy_pct = models.FloatField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-reporting_period', 'model_name', 'field']
+        unique_together = ['model_name', 'institution', 'reporting_period', 'currency', 'segment', 'field']
+        indexes = [
+            models.Index(fields=['institution', 'model_name', 'field', '-reporting_period']),
+        ]
+    
+    def __str__(self):
+        return f"{self.institution.name} - {self.model_name}.{self.field} {self.reporting_period} ({self.currency})"
+
+
+class StressRun(BaseModel):
+    """One evaluation of a stress scenario over the industry's data for a reporting period."""
+    scenario = models.CharField(max_length=60)
+    label = models.CharField(max_length=120)
+    # Hash of the scenario definition and model parameters
+    scenario_hash = models.CharField(max_length=64)
+    # Hash of the input slices the scenario was applied to
+    data_version = models.CharField(max_length=64)
+    reporting_period = models.DateField()
+    definition = models.JSONField(default=dict)
+    institutions = models.IntegerField(default=0)
+    breaches = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-reporting_period', 'scenario', '-created_at']
+        unique_together = ['scenario_hash', 'data_version', 'reporting_period']
+        indexes = [
+            models.Index(fields=['reporting_period', 'scenario', '-created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.label} - {self.reporting_period}"
+
+
+class StressResult(models.Model):
+    """Solvency position of one institution before and after a stress run."""
+    run = models.ForeignKey(StressRun, on_delete=models.CASCADE, related_name='results')
+    institution = models.ForeignKey(Institution, on_delete=models.CASCADE, related_name='stress_results')
+    own_funds_before = models.DecimalField(max_digits=20, decimal_places=2)
+    own_funds_after = models.DecimalField(max_digits=20, decimal_places=2)
+    required_capital_after = models.DecimalField(max_digits=20, decimal_places=2)
+    solvency_ratio_before = models.FloatField()
+    solvency_ratio_after = models.FloatField()
+    breach = models.BooleanField(default=False)
+    
+    class Meta:
+        ordering = ['solvency_ratio_after']
+        unique_together = ['run', 'institution']
+    
+    def __str__(self):
+        return f"{self.institution.name} - {self.run.label}: {self.solvency_ratio_after:.1f}%"
+
+
+class Reinsurer(BaseModel):
+    """A reinsurance counterparty, identified by name across all institutions' filings."""
+    name = models.CharField(max_length=200, unique=True)
+    country = models.CharField(max_length=100, blank=True)
+    is_domestic = models.BooleanField(default=False)
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+
+
+class ReinsuranceExposure(BaseModel):
+    """An institution's reinsurance assets with one counterparty."""
+    institution = models.ForeignKey(Institution, on_delete=models.CASCADE, related_name='reinsurance_exposures')
+    reporting_period = models.DateField()
+    currency = models.CharField(max_length=3, choices=[('ZWL', 'Zimbabwe Dollar'), ('USD', 'US Dollar')])
+    reinsurer = models.ForeignKey(Reinsurer, on_delete=models.PROTECT, related_name='exposures')
+    exposure = models.DecimalField(max_digits=15, decimal_places=2)
+    
+    notes = models.TextField(blank=True)
+    
+    class Meta:
+        ordering = ['-reporting_period', '-exposure']
+        unique_together = ['institution', 'reporting_period', 'currency', 'reinsurer']
+        indexes = [
+            models.Index(fields=['reporting_period', 'currency', 'reinsurer']),
+        ]
+    
+    def __str__(self):
+        return f"{self.institution.name} - {self.reinsurer.name} {self.reporting_period} ({self.currency})"
+
+
+class ReinsurerExposureSummary(models.Model):
+    """Industry-wide exposure to one reinsurer in a period and currency, kept by the exposure aggregator."""
+    reporting_period = models.DateField()
+    currency = models.CharField(max_length=3)
+    reinsurer = models.ForeignKey(Reinsurer, on_delete=models.CASCADE, related_name='exposure_summaries')
+    total_exposure = models.DecimalField(max_digits=20, decimal_places=2)
+    institutions = models.IntegerField()
+    # Share of the industry's total reinsurance exposure, in percent
+    share = models.FloatField()
+    
+    class Meta:
+        ordering = ['-reporting_period', 'currency', '-total_exposure']
+        unique_together = ['reporting_period', 'currency', 'reinsurer']
+
+
+class ReinsuranceConcentration(models.Model):
+    """
+    Concentration of reinsurance exposure in a period and currency: for the
+    whole industry when institution is empty, else for one institution.
+    """
+    reporting_period = models.DateField()
+    currency = models.CharField(max_length=3)
+    institution = models.ForeignKey(
+        Institution, on_delete=models.CASCADE, null=True, blank=True, related_name='reinsurance_concentration'
+    )
+    total_exposure = models.DecimalField(max_digits=20, decimal_places=2)
+    counterparties = models.IntegerField()
+    # Herfindahl-Hirschman index of counterparty shares, 0-10000
+    hhi = models.FloatField()
+    # Largest counterparties as [{'reinsurer_id', 'name', 'exposure', 'share'}]
+    top_counterparties = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-reporting_period', 'currency']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['reporting_period', 'currency', 'institution'], name='unique_institution_concentration'
+            ),
+            models.UniqueConstraint(
+                fields=['reporting_period', 'currency'], condition=models.Q(institution__isnull=True),
+                name='unique_industry_concentration',
+            ),
+        ]
+
+
+class ContractGroupCube(models.Model):
+    """
+    ContractGrouping figures pre-aggregated over every combination of the
+    cube dimensions. A dimension left empty is rolled up (all values); the
+    grouping bitmask records which, like SQL GROUPING(), so rolled-up cells
+    are told apart from real values.
+    """
+    reporting_period = models.DateField()
+    currency = models.CharField(max_length=3)
+    grouping = models.PositiveSmallIntegerField()
+    institution = models.ForeignKey(
+        Institution, on_delete=models.CASCADE, null=True, blank=True, related_name='contract_group_cube'
+    )
+    product_line = models.CharField(max_length=50, blank=True)
+    measurement_model = models.CharField(max_length=10, blank=True)
+    risk_profile = models.CharField(max_length=20, blank=True)
+    
+    # Sums over the contract groups in the cell
+    groups = models.IntegerField()
+    number_of_contracts = models.BigIntegerField()
+    total_contract_value = models.DecimalField(max_digits=20, decimal_places=2)
+    materiality_threshold = models.DecimalField(max_digits=20, decimal_places=2)
+    
+    # Averages weighted by total contract value
+    average_contract_value = models.DecimalField(max_digits=15, decimal_places=2, null=True)
+    grouping_efficiency = models.FloatField(null=True)
+    volatility_score = models.FloatField(null=True)
+    correlation_score = models.FloatField(null=True)
+    
+    class Meta:
+        ordering = ['-reporting_period', 'currency', 'grouping', '-total_contract_value']
+        indexes = [
+            models.Index(
+                fields=['reporting_period', 'grouping', 'institution', 'currency', 'product_line', 'measurement_model', 'risk_profile'],
+                name='contract_cube_cell_idx',
+            ),
+        ]
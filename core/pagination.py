@@ -0,0 +1,148 @@
+"""
+Keyset (seek) pagination.
+
+Instead of OFFSET, each page is fetched with a WHERE clause that continues
+after the last row of the previous page, so deep pages cost the same as the
+first one when an index matches the ordering. The ordering must end in a
+unique column (usually id) and its columns must be non-null.
+
+Totals are reported through approximate_count, which stops counting at a
+limit (or reads the planner's row estimate on PostgreSQL) so large tables
+are never scanned in full just to print "of N results".
+"""
+import base64
+import json
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class KeysetPage:
+    """One page of keyset-paginated results."""
+
+    def __init__(self, object_list, next_cursor, cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.cursor = cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def is_first(self):
+        return self.cursor is None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """Paginate a queryset by seeking past the ordering values of the previous page."""
+
+    def __init__(self, queryset, ordering=('-created_at', '-id'), per_page=20):
+        self.queryset = queryset.order_by(*ordering)
+        self.ordering = ordering
+        self.per_page = per_page
+        self.fields = [name.lstrip('-') for name in ordering]
+
+    def page(self, cursor=None):
+        """Return the page following cursor, or the first page if cursor is empty or invalid."""
+        queryset = self.queryset
+        values = self.decode(cursor)
+        if values is None:
+            cursor = None
+        else:
+            queryset = queryset.filter(self._seek(values))
+
+        rows = list(queryset[:self.per_page + 1])
+        next_cursor = None
+        if len(rows) > self.per_page:
+            rows = rows[:self.per_page]
+            next_cursor = self.encode(rows[-1])
+        return KeysetPage(rows, next_cursor, cursor)
+
+    def _seek(self, values):
+        """
+        Build the lexicographic 'comes after' condition for the ordering values.
+
+        The OR of terms alone is not sargable, so it is ANDed with an
+        inclusive range bound on the first ordering column, which lets the
+        planner seek into the matching index instead of scanning it.
+        """
+        condition = Q()
+        for position, name in enumerate(self.ordering):
+            field = self.fields[position]
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            term = Q(**{f'{field}__{lookup}': values[position]})
+            for previous in range(position):
+                term &= Q(**{self.fields[previous]: values[previous]})
+            condition |= term
+        if len(self.ordering) > 1:
+            lookup = 'lte' if self.ordering[0].startswith('-') else 'gte'
+            condition &= Q(**{f'{self.fields[0]}__{lookup}': values[0]})
+        return condition
+
+    def encode(self, row):
+        """Encode the ordering values of a row (model instance or dict) as a URL-safe cursor."""
+        if isinstance(row, dict):
+            values = [row[field] for field in self.fields]
+        else:
+            values = [getattr(row, field) for field in self.fields]
+        payload = json.dumps([str(value) for value in values]).encode('utf-8')
+        return base64.urlsafe_b64encode(payload).decode('ascii')
+
+    def decode(self, cursor):
+        """Decode a cursor back to typed ordering values, or None if it is missing or malformed."""
+        if not cursor:
+            return None
+        try:
+            raw = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            if len(raw) != len(self.fields):
+                return None
+            model = self.queryset.model
+            return [model._meta.get_field(field).to_python(value) for field, value in zip(self.fields, raw)]
+        except Exception:
+            return None
+
+
+def approximate_count(queryset, limit=None):
+    """
+    Return (count, exact) for a queryset without a full COUNT(*) on large tables.
+
+    Unfiltered PostgreSQL tables use the planner's reltuples estimate. Otherwise
+    at most limit + 1 rows are counted; if the limit is exceeded the count is
+    reported as limit with exact=False.
+    """
+    if limit is None:
+        limit = getattr(settings, 'PAGINATION_COUNT_LIMIT', 1000)
+
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql' and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples FROM pg_class WHERE relname = %s', [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        if row and row[0] > limit:
+            return int(row[0]), False
+
+    count = queryset.order_by()[:limit + 1].count()
+    if count > limit:
+        return limit, False
+    return count, True
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Page-number paginator for admin changelists whose total comes from
+    approximate_count, capped at ADMIN_COUNT_LIMIT rows, rather than COUNT(*).
+    """
+
+    @cached_property
+    def count(self):
+        return approximate_count(self.object_list, getattr(settings, 'ADMIN_COUNT_LIMIT', 10000))[0]
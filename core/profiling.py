@@ -0,0 +1,166 @@
+"""
+Per-request SQL query profiling.
+
+A Profile installs an execute wrapper on every database connection of the
+current thread and records each statement's duration: the query count,
+total database time, and the PROFILER_TOP_QUERIES slowest statements.
+Python time is the wall time left after the database.
+
+QueryProfilerMiddleware profiles a PROFILER_SAMPLE_RATE share of requests
+(plus every request when DEBUG is on) and
+
+- adds a Server-Timing header (db, app and total durations) that browser
+  developer tools show next to the request;
+- logs one JSON record per profiled request to the core.profiling logger:
+  at INFO level, or WARNING when the request exceeds PROFILER_MAX_QUERIES,
+  PROFILER_SLOW_REQUEST_MS, or has a statement slower than
+  PROFILER_SLOW_QUERY_MS.
+
+Code outside requests (management commands, background jobs) can use the
+same instrumentation with `with profile('label'):`, which logs the record
+when the block exits.
+"""
+import heapq
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+# Longest SQL text kept for a logged statement
+SQL_MAX_LENGTH = 500
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class Profile:
+    """Query count, database time and slowest statements of one unit of work."""
+
+    def __init__(self, label):
+        self.label = label
+        self.queries = 0
+        self.db_time = 0.0
+        self.slowest = []
+        self.started = None
+        self.finished = None
+        self._keep = _setting('PROFILER_TOP_QUERIES', 5)
+
+    def __call__(self, execute, sql, params, many, context):
+        """Execute wrapper: time the statement and keep it if it is among the slowest."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.queries += 1
+            self.db_time += duration
+            entry = (duration, self.queries, sql)
+            if len(self.slowest) < self._keep:
+                heapq.heappush(self.slowest, entry)
+            elif self._keep:
+                heapq.heappushpop(self.slowest, entry)
+
+    @contextmanager
+    def capture(self):
+        """Record every statement run on this thread's connections inside the block."""
+        self.started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(self))
+                yield self
+        finally:
+            self.finished = time.perf_counter()
+
+    @property
+    def total_time(self):
+        return ((self.finished or time.perf_counter()) - self.started) if self.started else 0.0
+
+    @property
+    def python_time(self):
+        return max(self.total_time - self.db_time, 0.0)
+
+    def slow_queries(self):
+        """The slowest statements, slowest first, as (milliseconds, sql)."""
+        return [(duration * 1000, sql) for duration, order, sql in sorted(self.slowest, reverse=True)]
+
+    def is_slow(self):
+        """True when the work exceeds any of the configured thresholds."""
+        slowest = max((duration for duration, order, sql in self.slowest), default=0.0)
+        return (
+            self.queries > _setting('PROFILER_MAX_QUERIES', 50)
+            or self.total_time * 1000 > _setting('PROFILER_SLOW_REQUEST_MS', 1000)
+            or slowest * 1000 > _setting('PROFILER_SLOW_QUERY_MS', 100)
+        )
+
+    def record(self, **extra):
+        return {
+            'label': self.label,
+            'queries': self.queries,
+            'db_ms': round(self.db_time * 1000, 2),
+            'python_ms': round(self.python_time * 1000, 2),
+            'total_ms': round(self.total_time * 1000, 2),
+            'slowest': [
+                {'ms': round(ms, 2), 'sql': sql[:SQL_MAX_LENGTH]} for ms, sql in self.slow_queries()
+            ],
+            **extra,
+        }
+
+    def log(self, **extra):
+        level = logging.WARNING if self.is_slow() else logging.INFO
+        logger.log(level, json.dumps(self.record(**extra), default=str))
+
+    def server_timing(self):
+        """Server-Timing header value for the profile."""
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+            f'app;dur={self.python_time * 1000:.1f}',
+            f'total;dur={self.total_time * 1000:.1f}',
+        ])
+
+
+@contextmanager
+def profile(label, log=True):
+    """Profile the queries of a block of code, logging the record on exit unless log is False."""
+    work = Profile(label)
+    with work.capture():
+        yield work
+    if log:
+        work.log()
+
+
+def should_profile(request):
+    if not _setting('PROFILER_ENABLED', True):
+        return False
+    return settings.DEBUG or random.random() < _setting('PROFILER_SAMPLE_RATE', 0.01)
+
+
+class QueryProfilerMiddleware:
+    """Profile a sample of requests; see the module docstring."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not should_profile(request):
+            return self.get_response(request)
+
+        work = Profile(request.path)
+        with work.capture():
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        if match is not None:
+            work.label = match.view_name
+        if _setting('PROFILER_SERVER_TIMING', True):
+            response['Server-Timing'] = work.server_timing()
+        work.log(method=request.method, path=request.path, status=response.status_code)
+        return response
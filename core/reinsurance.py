@@ -0,0 +1,163 @@
+"""
+Reinsurance counterparty exposure aggregator.
+
+Institutions file their reinsurance assets per counterparty (the
+reinsurance_counterparties template, stored as ReinsuranceExposure). The
+aggregator keeps two compact tables that the supervisory views read
+directly instead of scanning every filing:
+
+- ReinsurerExposureSummary: per period and currency, the industry's total
+  exposure to each reinsurer, how many institutions use it and its share of
+  all ceded exposure;
+- ReinsuranceConcentration: per period and currency, the Herfindahl-Hirschman
+  index (sum of squared percentage shares, 0-10000) and the
+  REINSURANCE_TOP_N largest counterparties, once for the whole industry
+  (institution empty) and once per institution.
+
+Runs are incremental: only periods with changed exposures (per the
+FactChange log) are re-aggregated, with a single GROUP BY query per period,
+and only the changed institutions' concentration rows are rebuilt. Uploads
+of the counterparty template queue a run on the background pool.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .background import submit_background
+from .changelog import consume_changes
+from .models import ReinsuranceExposure, ReinsurerExposureSummary, ReinsuranceConcentration
+
+
+EXPOSURE_CONSUMER = 'reinsurance_exposure'
+
+
+def concentration(exposures, names):
+    """
+    HHI and top counterparties for {reinsurer_id: exposure}. Returns
+    (total, shares in percent by reinsurer_id, hhi, top counterparties).
+    """
+    total = sum(exposures.values(), Decimal('0'))
+    if total <= 0:
+        return total, {}, 0.0, []
+    shares = {reinsurer_id: float(exposure / total * 100) for reinsurer_id, exposure in exposures.items()}
+    hhi = sum(share ** 2 for share in shares.values())
+    largest = sorted(exposures, key=lambda reinsurer_id: exposures[reinsurer_id], reverse=True)
+    top = [
+        {
+            'reinsurer_id': reinsurer_id,
+            'name': names.get(reinsurer_id, ''),
+            'exposure': float(exposures[reinsurer_id]),
+            'share': round(shares[reinsurer_id], 2),
+        }
+        for reinsurer_id in largest[:getattr(settings, 'REINSURANCE_TOP_N', 5)]
+    ]
+    return total, shares, hhi, top
+
+
+def _exposures(reporting_period, institution_ids=None):
+    """Positive exposures of a period, optionally limited to some institutions."""
+    rows = ReinsuranceExposure.objects.filter(reporting_period=reporting_period, exposure__gt=0)
+    if institution_ids is not None:
+        rows = rows.filter(institution_id__in=institution_ids)
+    return rows
+
+
+def refresh_period(reporting_period, institution_ids=None):
+    """
+    Rebuild the industry summary of a period and the concentration rows of
+    some institutions (or all). Returns the number of summary rows written.
+    """
+    industry = defaultdict(dict)
+    names, users = {}, {}
+    for row in _exposures(reporting_period).values('currency', 'reinsurer_id', 'reinsurer__name').annotate(
+        total=Sum('exposure'), institutions=Count('institution', distinct=True)
+    ).order_by():
+        industry[row['currency']][row['reinsurer_id']] = row['total']
+        names[row['reinsurer_id']] = row['reinsurer__name']
+        users[row['currency'], row['reinsurer_id']] = row['institutions']
+
+    per_institution = defaultdict(dict)
+    for institution_id, currency, reinsurer_id, exposure in _exposures(reporting_period, institution_ids).values_list(
+        'institution_id', 'currency', 'reinsurer_id', 'exposure'
+    ):
+        per_institution[institution_id, currency][reinsurer_id] = exposure
+
+    summaries, concentrations = [], []
+    for currency, exposures in industry.items():
+        total, shares, hhi, top = concentration(exposures, names)
+        concentrations.append(ReinsuranceConcentration(
+            reporting_period=reporting_period, currency=currency, total_exposure=total,
+            counterparties=len(exposures), hhi=hhi, top_counterparties=top,
+        ))
+        summaries.extend(
+            ReinsurerExposureSummary(
+                reporting_period=reporting_period, currency=currency, reinsurer_id=reinsurer_id,
+                total_exposure=exposure, institutions=users[currency, reinsurer_id],
+                share=shares.get(reinsurer_id, 0.0),
+            )
+            for reinsurer_id, exposure in exposures.items()
+        )
+    for (institution_id, currency), exposures in per_institution.items():
+        total, shares, hhi, top = concentration(exposures, names)
+        concentrations.append(ReinsuranceConcentration(
+            reporting_period=reporting_period, currency=currency, institution_id=institution_id,
+            total_exposure=total, counterparties=len(exposures), hhi=hhi, top_counterparties=top,
+        ))
+
+    with transaction.atomic():
+        ReinsurerExposureSummary.objects.filter(reporting_period=reporting_period).delete()
+        stale = ReinsuranceConcentration.objects.filter(reporting_period=reporting_period)
+        if institution_ids is not None:
+            stale = stale.filter(institution__isnull=True) | stale.filter(institution_id__in=institution_ids)
+        stale.delete()
+        ReinsurerExposureSummary.objects.bulk_create(summaries, batch_size=1000)
+        ReinsuranceConcentration.objects.bulk_create(concentrations, batch_size=1000)
+    return len(summaries)
+
+
+def run_exposure_aggregator(full=False):
+    """
+    Re-aggregate the periods whose exposures changed since the last run, or
+    every period when full is True or nothing has been aggregated yet.
+    Returns (periods refreshed, summary rows written).
+    """
+    with consume_changes(EXPOSURE_CONSUMER, [ReinsuranceExposure]) as pairs:
+        if full or not ReinsuranceConcentration.objects.exists():
+            periods = dict.fromkeys(
+                ReinsuranceExposure.objects.values_list('reporting_period', flat=True).order_by().distinct()
+            )
+        else:
+            periods = defaultdict(set)
+            for institution_id, reporting_period in pairs:
+                periods[reporting_period].add(institution_id)
+        written = sum(
+            refresh_period(reporting_period, institution_ids)
+            for reporting_period, institution_ids in periods.items()
+        )
+    return len(periods), written
+
+
+def queue_aggregation():
+    """Fold newly filed counterparty exposures into the summary tables on the background pool."""
+    return submit_background(run_exposure_aggregator, description='Reinsurance exposure aggregation')
+
+
+def latest_period():
+    return ReinsuranceConcentration.objects.order_by('-reporting_period').values_list(
+        'reporting_period', flat=True
+    ).first()
+
+
+def industry_concentration(reporting_period=None):
+    """Industry concentration rows of a period (default: the latest aggregated one), one per currency."""
+    reporting_period = reporting_period or latest_period()
+    return ReinsuranceConcentration.objects.filter(reporting_period=reporting_period, institution__isnull=True)
+
+
+def institution_concentration(institution_id, reporting_period=None):
+    """One institution's concentration rows of a period (default: the latest aggregated one)."""
+    reporting_period = reporting_period or latest_period()
+    return ReinsuranceConcentration.objects.filter(reporting_period=reporting_period, institution_id=institution_id)
@@ -0,0 +1,148 @@
+"""
+Quarterly regulatory report packs.
+
+A pack is an XLSX workbook per institution and reporting period holding the
+CSM roll-forward, the risk adjustment reconciliation, discount rate and
+reinsurance data. Packs are built on the shared background pool, one job per
+institution, and stored under MEDIA_ROOT keyed by a data version derived
+from the underlying fact rows. A stored pack is served until those rows
+change.
+
+The pool lives in the web process, so a restart drops the jobs it was
+running. A pack left running for longer than REPORT_PACK_STALE_SECONDS is
+treated as failed and queued again.
+"""
+import hashlib
+import tempfile
+from concurrent.futures import wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connection
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .background import get_executor
+from .exports import EXPORT_DATASETS, export_queryset, write_workbook
+from .metrics import EXPORT_SECONDS
+from .models import Institution, ReportPack
+
+
+# Worksheet title -> export dataset
+REPORT_PACK_SECTIONS = [
+    ('CSM Roll-forward', 'csm_profitability'),
+    ('Risk Adjustment', 'risk_adjustment_reconciliation'),
+    ('Discount Rates', 'discount_rates'),
+    ('Reinsurance', 'reinsurance_held'),
+]
+
+
+def data_version(institution, reporting_period):
+    """Fingerprint the fact rows a pack is built from: row counts and last update per section."""
+    parts = []
+    for title, dataset in REPORT_PACK_SECTIONS:
+        model = EXPORT_DATASETS[dataset][1]
+        stats = model.objects.filter(
+            institution=institution,
+            reporting_period=reporting_period,
+        ).aggregate(count=Count('id'), latest=Max('updated_at'))
+        parts.append(f"{dataset}:{stats['count']}:{stats['latest']}")
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+def pack_sheets(institution, reporting_period):
+    """Build the (title, queryset, headers) worksheets of a pack."""
+    sheets = []
+    for title, dataset in REPORT_PACK_SECTIONS:
+        queryset, headers = export_queryset(
+            dataset,
+            institution=institution,
+            period_from=reporting_period,
+            period_to=reporting_period,
+        )
+        sheets.append((title, queryset, headers))
+    return sheets
+
+
+def build_pack(pack_id):
+    """Render a pending pack to MEDIA_ROOT. Runs on a worker thread."""
+    try:
+        # Claim the job so duplicate submissions of the same pack are no-ops
+        claimed = ReportPack.objects.filter(id=pack_id, status='pending').update(
+            status='running', updated_at=timezone.now()
+        )
+        if not claimed:
+            return
+
+        pack = ReportPack.objects.select_related('institution').get(id=pack_id)
+        filename = f'report_pack_{pack.reporting_period:%Y%m%d}.xlsx'
+        with tempfile.TemporaryFile() as fileobj, EXPORT_SECONDS.time(format='report_pack'):
+            write_workbook(pack_sheets(pack.institution, pack.reporting_period), fileobj)
+            fileobj.seek(0)
+            pack.file.save(filename, File(fileobj), save=False)
+
+        pack.status = 'ready'
+        pack.error = ''
+        pack.generated_at = timezone.now()
+        pack.save()
+
+        # Earlier versions of this pack are now stale
+        stale = ReportPack.objects.filter(
+            institution=pack.institution,
+            reporting_period=pack.reporting_period,
+        ).exclude(id=pack.id)
+        for old_pack in stale:
+            if old_pack.file:
+                old_pack.file.delete(save=False)
+        stale.delete()
+    except Exception as e:
+        ReportPack.objects.filter(id=pack_id).update(status='failed', error=str(e))
+    finally:
+        # Worker threads hold their own connection
+        connection.close()
+
+
+def queue_report_packs(reporting_period, institutions=None, block=False):
+    """
+    Queue pack generation for each institution whose data has no current pack.
+
+    Returns the ReportPack rows for the current data versions. With block=True
+    the call waits for all queued jobs to finish.
+    """
+    if institutions is None:
+        institutions = Institution.objects.filter(status='active')
+    # Failed packs, and running packs whose job was lost with its process, are built again
+    stale_before = timezone.now() - timedelta(seconds=getattr(settings, 'REPORT_PACK_STALE_SECONDS', 1800))
+    retry = Q(status='failed') | Q(status='running', updated_at__lt=stale_before)
+
+    packs = []
+    futures = []
+    for institution in institutions:
+        version = data_version(institution, reporting_period)
+        pack, created = ReportPack.objects.get_or_create(
+            institution=institution,
+            reporting_period=reporting_period,
+            data_version=version,
+        )
+        if ReportPack.objects.filter(retry, id=pack.id).update(status='pending', updated_at=timezone.now()):
+            pack.status = 'pending'
+        if pack.status == 'pending':
+            futures.append(get_executor().submit(build_pack, pack.id))
+        packs.append(pack)
+
+    if block:
+        wait(futures)
+        for pack in packs:
+            pack.refresh_from_db()
+    return packs
+
+
+def current_pack(institution, reporting_period):
+    """Return the ready pack matching the current data, or None if it must be rebuilt."""
+    return ReportPack.objects.filter(
+        institution=institution,
+        reporting_period=reporting_period,
+        data_version=data_version(institution, reporting_period),
+        status='ready',
+    ).first()
@@ -0,0 +1,99 @@
+"""
+Bulk review of submissions and resolution of compliance alerts.
+
+A batch is applied with one UPDATE ... WHERE id IN (...) restricted to rows
+in a state the workflow allows the transition from, audited with one bulk
+insert into the admin LogEntry table (and, for submissions, the
+SubmissionEvent log). Reviewed submissions are announced with a single signal
+per batch so that listeners refresh derived data once rather than once per
+row; alert resolution feeds no cached or derived data, so it sends none.
+"""
+from django.contrib.admin.models import LogEntry, CHANGE
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import IFRS17Submission, ComplianceAlert
+from .workflow import REVIEWED_STATUSES, adjust_counts, count_moves, record_events, sources
+
+
+# Sent once per batch with ids=[...] and status=<new status>
+submissions_reviewed = Signal()
+
+REVIEW_ACTIONS = {
+    'start_review': 'under_review',
+    'approve': 'approved',
+    'reject': 'rejected',
+}
+
+
+def review_submissions(ids, action, user, note=''):
+    """
+    Move the given submissions to the action's status. Submissions whose
+    status cannot make that transition are left alone. Returns the ids that
+    changed.
+    """
+    status = REVIEW_ACTIONS[action]
+    now = timezone.now()
+
+    with transaction.atomic():
+        rows = list(IFRS17Submission.current.filter(id__in=ids, status__in=sources(status)).values_list(
+            'id', 'status', 'institution__name', 'reporting_period'
+        ))
+        changed = [row[0] for row in rows]
+        update = {'status': status, 'updated_at': now}
+        if status in REVIEWED_STATUSES:
+            update.update(reviewed_by=user, review_date=now)
+        IFRS17Submission.current.filter(id__in=changed).update(**update)
+        record_events([
+            (submission_id, 'reviewed', user, previous, status, note)
+            for submission_id, previous, name, period in rows
+        ])
+        adjust_counts(count_moves((previous, status) for submission_id, previous, name, period in rows))
+        _log_changes(IFRS17Submission, user, [
+            (submission_id, f'{name} - {period}', f'Bulk {action}: {previous} → {status}. {note}'.strip())
+            for submission_id, previous, name, period in rows
+        ])
+        if changed:
+            transaction.on_commit(lambda: submissions_reviewed.send(
+                sender=IFRS17Submission, ids=changed, status=status
+            ))
+    return changed
+
+
+def resolve_alerts(ids, user, note=''):
+    """Mark the given open alerts resolved. Returns the ids that changed."""
+    now = timezone.now()
+
+    with transaction.atomic():
+        rows = list(ComplianceAlert.objects.filter(id__in=ids, is_resolved=False).values_list(
+            'id', 'institution__name', 'title'
+        ))
+        changed = [row[0] for row in rows]
+        ComplianceAlert.objects.filter(id__in=changed).update(
+            is_resolved=True, resolved_by=user, resolved_date=now, updated_at=now
+        )
+        _log_changes(ComplianceAlert, user, [
+            (alert_id, f'{name} - {title}', f'Bulk resolve. {note}'.strip())
+            for alert_id, name, title in rows
+        ])
+    return changed
+
+
+def _log_changes(model, user, entries):
+    """Write one admin history entry per (object_id, repr, message) in a single insert."""
+    if user is None or not entries:
+        return
+    content_type = ContentType.objects.get_for_model(model)
+    LogEntry.objects.bulk_create([
+        LogEntry(
+            user_id=user.pk,
+            content_type=content_type,
+            object_id=str(object_id),
+            object_repr=object_repr[:200],
+            action_flag=CHANGE,
+            change_message=message,
+        )
+        for object_id, object_repr, message in entries
+    ], batch_size=1000)
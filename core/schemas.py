@@ -0,0 +1,501 @@
+"""
+Template schema registry for uploaded IFRS 17 submission files.
+
+Every supported upload layout is described by a TemplateSchema. The registry
+is keyed by the set of normalised header names, so detecting the template of
+an uploaded file only needs its header row and a single dictionary lookup.
+Once detected, the file is read with explicit per-column dtypes so pandas
+never has to infer types over the whole file.
+"""
+import os
+from collections import namedtuple
+
+import pandas as pd
+from django.apps import apps
+from django.db import transaction
+
+
+# Column kinds: the dtype applied at read time and how rows are combined per
+# currency when written to a fact model. Amounts and counts add up; rates,
+# ratios and scores are averaged; text keeps the first value.
+ColumnKind = namedtuple('ColumnKind', ['dtype', 'aggregate'])
+
+MONEY = ColumnKind('float64', 'sum')
+RATIO = ColumnKind('float64', 'mean')
+COUNT = ColumnKind('Int64', 'sum')
+TEXT = ColumnKind('string', 'first')
+FLAG = ColumnKind('boolean', 'all')
+
+# Descriptive columns that may appear in any template and are not part of the fingerprint
+CONTEXT_COLUMNS = {
+    'institution': TEXT,
+    'reporting_period': TEXT,
+    'report_section': TEXT,
+}
+
+# Headline metrics a summary template may set on its IFRS17Submission
+SUMMARY_FIELDS = [
+    'contractual_service_margin', 'risk_adjustment', 'loss_component', 'total_liabilities',
+    'equity_impact', 'profit_margin', 'solvency_ratio',
+]
+
+
+def normalize_column(name):
+    """Normalise a header cell to its lower_snake_case form."""
+    return str(name).strip().lower().replace(' ', '_').replace('-', '_')
+
+
+class TemplateSchema:
+    """Layout of one upload template and the fact model its rows feed."""
+
+    def __init__(self, key, label, columns, model=None, renames=None, key_fields=()):
+        self.key = key
+        self.label = label
+        # Normalised column name -> ColumnKind
+        self.columns = columns
+        # Name of the core model the rows are routed to, if any
+        self.model_name = model
+        # Normalised column name -> model field name, where they differ
+        self.renames = renames or {}
+        # Extra model fields (besides institution/period/currency) identifying a row
+        self.key_fields = key_fields
+
+    @property
+    def model(self):
+        if self.model_name is None:
+            return None
+        return apps.get_model('core', self.model_name)
+
+    @property
+    def fingerprint(self):
+        return frozenset(self.columns)
+
+    def dtypes_for(self, header):
+        """Map the raw header cells of a file to read-time dtypes."""
+        dtypes = {}
+        for raw in header:
+            name = normalize_column(raw)
+            kind = self.columns.get(name) or CONTEXT_COLUMNS.get(name)
+            if kind:
+                dtypes[raw] = kind.dtype
+        return dtypes
+
+    def aggregations(self, fields):
+        """How each of the given model fields is combined, for the template columns that feed them."""
+        aggregations = {}
+        for name, kind in self.columns.items():
+            field = self.renames.get(name, name)
+            if field in fields and field != 'currency' and field not in self.key_fields:
+                aggregations[field] = kind.aggregate
+        return aggregations
+
+    def renames_for(self, header):
+        """Map the raw header cells of a file to model field names."""
+        return {raw: self.renames.get(normalize_column(raw), normalize_column(raw)) for raw in header}
+
+    def __repr__(self):
+        return f'<TemplateSchema {self.key}>'
+
+
+SCHEMAS = [
+    TemplateSchema(
+        'ifrs17_summary', 'IFRS 17 Summary',
+        columns={
+            'contract_group': TEXT,
+            'contractual_service_margin': MONEY,
+            'risk_adjustment': MONEY,
+            'loss_component': MONEY,
+            'total_liabilities': MONEY,
+            'equity_impact': MONEY,
+            'profit_margin': RATIO,
+            'solvency_ratio': RATIO,
+            'currency': TEXT,
+        },
+        model='IFRS17Submission',
+    ),
+    TemplateSchema(
+        'contract_liabilities', 'Insurance Contract Liabilities',
+        columns={
+            'measurement_model': TEXT,
+            'contract_group': TEXT,
+            'contract_liability_balance': MONEY,
+            'risk_adjustment': MONEY,
+            'csm_balance': MONEY,
+            'loss_component': MONEY,
+            'total_liability': MONEY,
+            'currency': TEXT,
+        },
+        model='IFRS17Submission',
+        renames={
+            'csm_balance': 'contractual_service_margin',
+            'total_liability': 'total_liabilities',
+        },
+    ),
+    TemplateSchema(
+        'csm_rollforward', 'CSM Roll-forward',
+        columns={
+            'contract_group': TEXT,
+            'opening_csm_balance': MONEY,
+            'new_contracts_csm': MONEY,
+            'interest_accretion': MONEY,
+            'experience_adjustments': MONEY,
+            'csm_release': MONEY,
+            'closing_csm_balance': MONEY,
+            'currency': TEXT,
+        },
+        model='CSMRollforward',
+        key_fields=('contract_group',),
+    ),
+    TemplateSchema(
+        'risk_adjustment_reconciliation', 'Risk Adjustment Reconciliation',
+        columns={
+            'contract_group': TEXT,
+            'opening_risk_adjustment': MONEY,
+            'new_contracts_risk_adj': MONEY,
+            'experience_adjustments': MONEY,
+            'risk_adj_release': MONEY,
+            'closing_risk_adjustment': MONEY,
+            'risk_adj_impact_on_liabilities': MONEY,
+            'currency': TEXT,
+        },
+        model='RiskAdjustmentReconciliation',
+        key_fields=('contract_group',),
+    ),
+    TemplateSchema(
+        'loss_component_analysis', 'Loss Component Analysis',
+        columns={
+            'contract_group': TEXT,
+            'onerous_contracts_count': COUNT,
+            'total_loss_component': MONEY,
+            'immediate_recognition': MONEY,
+            'deferred_recognition': MONEY,
+            'impact_on_pl': MONEY,
+            'currency': TEXT,
+        },
+        model='LossComponentAnalysis',
+        key_fields=('contract_group',),
+    ),
+    TemplateSchema(
+        'csm_profitability', 'CSM Profitability',
+        columns={
+            'contract_group': TEXT,
+            'opening_csm': MONEY,
+            'new_contracts_csm': MONEY,
+            'interest_accretion': MONEY,
+            'experience_adjustments': MONEY,
+            'csm_release': MONEY,
+            'closing_csm': MONEY,
+            'csm_profit_margin': RATIO,
+            'csm_roi': RATIO,
+            'expected_profit': MONEY,
+            'actual_profit': MONEY,
+            'profit_variance': MONEY,
+            'profitable_contracts': COUNT,
+            'loss_making_contracts': COUNT,
+            'break_even_contracts': COUNT,
+            'currency': TEXT,
+        },
+        model='CSMProfitability',
+    ),
+    TemplateSchema(
+        'insurance_revenue', 'Insurance Revenue',
+        columns={
+            'product_line': TEXT,
+            'insurance_revenue': MONEY,
+            'service_revenue': MONEY,
+            'total_revenue': MONEY,
+            'contracts_fulfilled': COUNT,
+            'contracts_ongoing': COUNT,
+            'service_performance_ratio': RATIO,
+            'currency': TEXT,
+        },
+        model='InsuranceRevenue',
+    ),
+    TemplateSchema(
+        'discount_rates', 'Discount Rates',
+        columns={
+            'rate_component': TEXT,
+            'risk_free_rate': RATIO,
+            'liquidity_premium': RATIO,
+            'credit_spread': RATIO,
+            'total_discount_rate': RATIO,
+            'finance_income': MONEY,
+            'finance_expense': MONEY,
+            'net_finance_result': MONEY,
+            'rate_sensitivity_1bp': MONEY,
+            'rate_sensitivity_10bp': MONEY,
+            'rate_sensitivity_100bp': MONEY,
+            'usd_discount_rate': RATIO,
+            'zwl_discount_rate': RATIO,
+            'exchange_rate': RATIO,
+            'currency': TEXT,
+        },
+        model='DiscountRates',
+    ),
+    TemplateSchema(
+        'reinsurance_held', 'Reinsurance Held',
+        columns={
+            'reinsurance_type': TEXT,
+            'reinsurance_assets': MONEY,
+            'recoverable_amounts': MONEY,
+            'expected_recoveries': MONEY,
+            'proportional_reinsurance': MONEY,
+            'non_proportional_reinsurance': MONEY,
+            'facultative_reinsurance': MONEY,
+            'treaty_reinsurance': MONEY,
+            'domestic_reinsurers': MONEY,
+            'international_reinsurers': MONEY,
+            'total_reinsurance_held': MONEY,
+            'risk_transfer_ratio': RATIO,
+            'concentration_risk': RATIO,
+            'counterparty_credit_risk': RATIO,
+            'currency': TEXT,
+        },
+        model='ReinsuranceHeld',
+    ),
+    TemplateSchema(
+        'reinsurance_counterparties', 'Reinsurance Counterparties',
+        columns={
+            'reinsurer': TEXT,
+            'reinsurer_country': TEXT,
+            'exposure': MONEY,
+            'currency': TEXT,
+        },
+        model='ReinsuranceExposure',
+        key_fields=('reinsurer_id',),
+    ),
+    TemplateSchema(
+        'ifrs4_transition', 'IFRS 4 Transition',
+        columns={
+            'transition_phase': TEXT,
+            'ifrs4_liabilities': MONEY,
+            'ifrs4_premiums': MONEY,
+            'ifrs4_claims': MONEY,
+            'ifrs17_liabilities': MONEY,
+            'ifrs17_csm': MONEY,
+            'ifrs17_risk_adjustment': MONEY,
+            'liability_adjustment': MONEY,
+            'equity_impact': MONEY,
+            'pnl_impact': MONEY,
+            'implementation_status': TEXT,
+            'data_quality_score': RATIO,
+            'process_maturity_score': RATIO,
+            'system_readiness_score': RATIO,
+            'currency': TEXT,
+        },
+        model='IFRS4Transition',
+    ),
+    TemplateSchema(
+        'contract_grouping', 'Contract Grouping',
+        columns={
+            'product_line': TEXT,
+            'contract_type': TEXT,
+            'measurement_model': TEXT,
+            'number_of_contracts': COUNT,
+            'total_contract_value': MONEY,
+            'average_contract_value': MONEY,
+            'contracts_per_group': COUNT,
+            'materiality_threshold': MONEY,
+            'grouping_efficiency': RATIO,
+            'risk_profile': TEXT,
+            'volatility_score': RATIO,
+            'correlation_score': RATIO,
+            'currency': TEXT,
+        },
+        model='ContractGrouping',
+        key_fields=('product_line', 'contract_type'),
+    ),
+    TemplateSchema(
+        'data_quality', 'Data Quality',
+        columns={
+            'quality_metric': TEXT,
+            'completeness_score': RATIO,
+            'accuracy_score': RATIO,
+            'consistency_score': RATIO,
+            'timeliness_score': RATIO,
+            'overall_quality_score': RATIO,
+            'data_governance_score': RATIO,
+            'control_effectiveness': RATIO,
+            'audit_trail_completeness': RATIO,
+            'regulatory_compliance': RATIO,
+            'exchange_rate_consistency': FLAG,
+            'currency_conversion_accuracy': RATIO,
+            'multi_currency_reconciliation': FLAG,
+            'missing_data_points': COUNT,
+            'data_anomalies': COUNT,
+            'validation_errors': COUNT,
+            'critical_issues': COUNT,
+            'issues_resolved': COUNT,
+            'pending_issues': COUNT,
+            'currency': TEXT,
+        },
+        model='DataQualityCheck',
+    ),
+]
+
+SCHEMA_REGISTRY = {schema.fingerprint: schema for schema in SCHEMAS}
+SCHEMAS_BY_KEY = {schema.key: schema for schema in SCHEMAS}
+TEMPLATE_CHOICES = [(schema.key, schema.label) for schema in SCHEMAS]
+
+
+def read_header(file_path):
+    """Read only the header row of a CSV or Excel file."""
+    if _is_excel(file_path):
+        return list(pd.read_excel(file_path, nrows=0).columns)
+    return list(pd.read_csv(file_path, nrows=0).columns)
+
+
+def detect_schema(header):
+    """Return the TemplateSchema matching a header row, or None if it is unknown."""
+    names = {normalize_column(column) for column in header}
+    return SCHEMA_REGISTRY.get(frozenset(names - CONTEXT_COLUMNS.keys()))
+
+
+def read_template(file_path, schema=None, rename=True):
+    """
+    Read an uploaded file using its template's dtypes and column names.
+
+    Returns a (schema, DataFrame) tuple. Columns are renamed to model field
+    names unless rename is False. Raises ValueError if the header does not
+    match any registered template.
+    """
+    header = read_header(file_path)
+    if schema is None:
+        schema = detect_schema(header)
+        if schema is None:
+            raise ValueError('File layout does not match any known template')
+
+    dtypes = schema.dtypes_for(header)
+    if _is_excel(file_path):
+        df = pd.read_excel(file_path, usecols=list(dtypes), dtype=dtypes)
+    else:
+        df = pd.read_csv(file_path, usecols=list(dtypes), dtype=dtypes)
+    if rename:
+        df = df.rename(columns=schema.renames_for(df.columns))
+    return schema, df
+
+
+def route_rows(submission, schema, df):
+    """
+    Write the rows of a parsed template into the schema's fact model.
+
+    Rows naming another institution or reporting period than the
+    submission's are left out. The rest are aggregated per currency (and
+    per key_fields) before writing, following each column's kind. Returns
+    the number of fact rows written.
+    """
+    if schema.model is None or df.empty:
+        return 0
+    df = _submission_rows(submission, df)
+
+    if schema.model_name == 'IFRS17Submission':
+        # Summary templates fill in the headline metrics of the submission itself
+        values = _summary(df, schema.aggregations(SUMMARY_FIELDS))
+        for field, value in values.items():
+            setattr(submission, field, _to_db(value))
+        submission.save(update_fields=list(values) + ['updated_at'])
+        return 1
+
+    # Consolidated rows (e.g. a 'Multi' currency total) have no place in per-currency facts
+    currencies = [value for value, label in schema.model._meta.get_field('currency').choices]
+    df = df[df['currency'].isin(currencies)]
+
+    if schema.model_name == 'ReinsuranceExposure':
+        df = df.assign(reinsurer_id=_reinsurer_ids(df, submission.institution)).drop(columns=['reinsurer'])
+
+    group_by = ['currency', *schema.key_fields]
+    fields = {field.name for field in schema.model._meta.concrete_fields}
+    aggregations = schema.aggregations(fields & set(df.columns))
+    aggregates = df.groupby(group_by, sort=False).agg(aggregations).reset_index()
+
+    with transaction.atomic():
+        written = []
+        for row in aggregates.to_dict('records'):
+            lookup = {field: row.pop(field) for field in group_by}
+            obj, created = schema.model.objects.update_or_create(
+                institution=submission.institution,
+                reporting_period=submission.reporting_period,
+                defaults={field: _to_db(value) for field, value in row.items()},
+                **lookup
+            )
+            written.append(obj.pk)
+        if schema.model_name == 'ReinsuranceExposure':
+            # A counterparty file is the full list; counterparties left out of it no longer apply
+            for stale in schema.model.objects.filter(
+                institution=submission.institution, reporting_period=submission.reporting_period
+            ).exclude(pk__in=written):
+                stale.delete()
+    return len(aggregates)
+
+
+def _submission_rows(submission, df):
+    """
+    Keep the rows of a file that belong to the submission, for files that
+    carry institution or reporting period columns. Raises ValueError when
+    none do.
+    """
+    keep = pd.Series(True, index=df.index)
+    if 'institution' in df:
+        names = df['institution'].astype(str).str.strip().str.casefold()
+        keep &= df['institution'].isna() | (names == submission.institution.name.strip().casefold())
+    if 'reporting_period' in df:
+        # Periods that do not parse as a date (e.g. 'Q3-2024') cannot be checked and are kept
+        periods = pd.to_datetime(df['reporting_period'], errors='coerce', format='mixed').dt.date
+        keep &= periods.isna() | (periods == submission.reporting_period)
+    if not keep.any():
+        raise ValueError(
+            f'File has no rows for {submission.institution.name} on {submission.reporting_period}'
+        )
+    return df[keep].drop(columns=[column for column in CONTEXT_COLUMNS if column != 'report_section' and column in df])
+
+
+def _summary(df, aggregations):
+    """
+    Headline values of a summary file. Files split into report sections
+    repeat figures across sections, so each metric comes from the first
+    section that reports it (with any non-zero value) rather than from
+    every row of the file.
+    """
+    sections = [df] if 'report_section' not in df else [
+        rows for section, rows in df.groupby('report_section', sort=False)
+    ]
+    values = {}
+    for field, how in aggregations.items():
+        for rows in sections:
+            column = rows[field]
+            if 'report_section' not in df or column.fillna(0).ne(0).any():
+                values[field] = column.agg(how)
+                break
+        else:
+            values[field] = None
+    return values
+
+
+def _reinsurer_ids(df, institution):
+    """Match counterparty names to Reinsurer rows, creating the ones seen for the first time."""
+    Reinsurer = apps.get_model('core', 'Reinsurer')
+    names = df['reinsurer'].astype(str).str.strip()
+    countries = df['reinsurer_country'] if 'reinsurer_country' in df else pd.Series('', index=df.index)
+    known = dict(Reinsurer.objects.filter(name__in=set(names)).values_list('name', 'id'))
+    for name, country in zip(names, countries.fillna('').astype(str).str.strip()):
+        if name not in known:
+            reinsurer, created = Reinsurer.objects.get_or_create(
+                name=name, defaults={'country': country, 'is_domestic': country == institution.country}
+            )
+            known[name] = reinsurer.id
+    return names.map(known)
+
+
+def _to_db(value):
+    """Convert a pandas scalar to a value the ORM will accept."""
+    if pd.isna(value):
+        return None
+    if isinstance(value, float):
+        return round(value, 4)
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+def _is_excel(file_path):
+    return os.path.splitext(str(file_path))[1].lower() in ['.xlsx', '.xls']
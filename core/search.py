@@ -0,0 +1,146 @@
+"""
+Full-text search over institutions, submission notes and alert text.
+
+The searchable text of each object is kept in SearchDocument, which the
+database indexes with its own full-text engine: an FTS5 external-content
+table maintained by triggers on SQLite, or a generated tsvector column with
+a GIN index on PostgreSQL (see migration 0012). Documents are refreshed by
+signals on save and delete; code that writes with bulk_create must call
+index_objects itself. Every query term is matched as a prefix and results
+are ordered by relevance (bm25 / ts_rank).
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+
+from .models import SearchDocument, Institution, IFRS17Submission, ComplianceAlert
+
+
+SEARCH_DOCUMENTS = {
+    'institution': (Institution, ['name', 'registration_number', 'license_number', 'contact_person', 'email']),
+    'submission': (IFRS17Submission, ['notes']),
+    'alert': (ComplianceAlert, ['title', 'description']),
+}
+
+KIND_BY_MODEL = {model: kind for kind, (model, fields) in SEARCH_DOCUMENTS.items()}
+
+FTS_TABLE = f'{SearchDocument._meta.db_table}_fts'
+
+
+def document_body(values, fields):
+    """Join the non-empty text fields of an object (instance or values dict) into one document."""
+    if isinstance(values, dict):
+        parts = [values[field] for field in fields]
+    else:
+        parts = [getattr(values, field) for field in fields]
+    return ' '.join(str(part) for part in parts if part)
+
+
+def index_objects(objects):
+    """Create, refresh or drop the search documents of saved objects of one model."""
+    objects = list(objects)
+    if not objects:
+        return
+    kind = KIND_BY_MODEL[type(objects[0])]
+    fields = SEARCH_DOCUMENTS[kind][1]
+    bodies = {obj.pk: document_body(obj, fields) for obj in objects}
+
+    existing = {
+        document.object_id: document
+        for document in SearchDocument.objects.filter(kind=kind, object_id__in=list(bodies))
+    }
+    to_create, to_update, to_delete = [], [], []
+    for object_id, body in bodies.items():
+        document = existing.get(object_id)
+        if not body:
+            if document:
+                to_delete.append(document.id)
+        elif document is None:
+            to_create.append(SearchDocument(kind=kind, object_id=object_id, body=body))
+        elif document.body != body:
+            document.body = body
+            to_update.append(document)
+
+    SearchDocument.objects.bulk_create(to_create)
+    SearchDocument.objects.bulk_update(to_update, ['body'])
+    SearchDocument.objects.filter(id__in=to_delete).delete()
+
+
+def remove_objects(kind, object_ids):
+    SearchDocument.objects.filter(kind=kind, object_id__in=list(object_ids)).delete()
+
+
+def rebuild_index(chunk_size=2000):
+    """Re-create every search document from the source tables. Returns the number indexed."""
+    SearchDocument.objects.all().delete()
+    total = 0
+    for kind, (model, fields) in SEARCH_DOCUMENTS.items():
+        batch = []
+        for values in model.objects.values('id', *fields).iterator(chunk_size=chunk_size):
+            body = document_body(values, fields)
+            if body:
+                batch.append(SearchDocument(kind=kind, object_id=values['id'], body=body))
+            if len(batch) >= chunk_size:
+                total += len(SearchDocument.objects.bulk_create(batch))
+                batch = []
+        total += len(SearchDocument.objects.bulk_create(batch))
+    return total
+
+
+def terms(query):
+    """Split a query into lower-case word terms, dropping punctuation and operators."""
+    return re.findall(r'[^\W_]+', query.lower())
+
+
+def search(query, kinds=None, limit=None):
+    """Return [(kind, object_id, rank)] matching every term of query as a prefix, best first."""
+    words = terms(query)
+    if not words:
+        return []
+    if limit is None:
+        limit = getattr(settings, 'SEARCH_RESULT_LIMIT', 1000)
+
+    table = SearchDocument._meta.db_table
+    params = []
+    kind_clause = ''
+    if kinds:
+        kind_clause = f"AND d.kind IN ({', '.join(['%s'] * len(kinds))})"
+
+    if connection.vendor == 'sqlite':
+        sql = f"""
+            SELECT d.kind, d.object_id, -bm25({FTS_TABLE}) AS rank
+            FROM {FTS_TABLE} f
+            INNER JOIN {table} d ON d.id = f.rowid
+            WHERE {FTS_TABLE} MATCH %s {kind_clause}
+            ORDER BY rank DESC
+            LIMIT %s
+        """
+        params.append(' '.join(f'"{word}"*' for word in words))
+    elif connection.vendor == 'postgresql':
+        sql = f"""
+            SELECT d.kind, d.object_id, ts_rank(d.search_vector, q.query) AS rank
+            FROM {table} d, to_tsquery('simple', %s) AS q(query)
+            WHERE d.search_vector @@ q.query {kind_clause}
+            ORDER BY rank DESC
+            LIMIT %s
+        """
+        params.append(' & '.join(f'{word}:*' for word in words))
+    else:
+        documents = SearchDocument.objects.all()
+        if kinds:
+            documents = documents.filter(kind__in=kinds)
+        for word in words:
+            documents = documents.filter(body__icontains=word)
+        return [(kind, object_id, 0.0) for kind, object_id in documents.values_list('kind', 'object_id')[:limit]]
+
+    params.extend(kinds or [])
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def search_ids(kind, query, limit=None):
+    """Return the ids of one kind of object matching query, best first."""
+    return [object_id for document_kind, object_id, rank in search(query, [kind], limit)]
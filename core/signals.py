@@ -0,0 +1,110 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .anomalies import ANOMALY_MODELS, INSTITUTIONS, invalidate_period as invalidate_anomalies
+from .blobs import queue_reclaim
+from .changelog import TRACKED_MODELS, record_change, record_changes
+from .fx import FX_FACT_MODELS, invalidate_period
+from .lookups import invalidate_institution_choices, invalidate_distinct_values
+from .models import FXRate, Institution, IFRS17Submission
+from .reviews import submissions_reviewed
+from .workflow import DELETED, adjust_counts, record_event, reinstate_previous
+from .search import SEARCH_DOCUMENTS, KIND_BY_MODEL, index_objects, remove_objects
+
+
+@receiver([post_save, post_delete], sender=FXRate)
+def fx_rate_changed(sender, instance, **kwargs):
+    """Converted figures for the period are stale once a rate changes."""
+    invalidate_period(instance.reporting_period)
+
+
+def fact_row_changed(sender, instance, **kwargs):
+    """Consolidated totals for the period are stale once a fact row changes."""
+    invalidate_period(instance.reporting_period)
+
+
+for model in FX_FACT_MODELS:
+    post_save.connect(fact_row_changed, sender=model, dispatch_uid=f'fx_{model._meta.model_name}_saved')
+    post_delete.connect(fact_row_changed, sender=model, dispatch_uid=f'fx_{model._meta.model_name}_deleted')
+
+
+def anomaly_inputs_changed(sender, instance, **kwargs):
+    """Anomaly scores read every institution's values for the period."""
+    invalidate_anomalies(instance.reporting_period)
+
+
+for model in ANOMALY_MODELS:
+    post_save.connect(anomaly_inputs_changed, sender=model, dispatch_uid=f'anomalies_{model._meta.model_name}_saved')
+    post_delete.connect(anomaly_inputs_changed, sender=model, dispatch_uid=f'anomalies_{model._meta.model_name}_deleted')
+
+
+def log_fact_change(sender, instance, **kwargs):
+    """Queue the institution and period for incremental re-evaluation."""
+    record_change(instance)
+
+
+def fact_values_changed(sender, instance, **kwargs):
+    """Admin filter choices for the model may have changed."""
+    invalidate_distinct_values(sender)
+
+
+for model in TRACKED_MODELS:
+    post_save.connect(log_fact_change, sender=model, dispatch_uid=f'changelog_{model._meta.model_name}_saved')
+    post_delete.connect(log_fact_change, sender=model, dispatch_uid=f'changelog_{model._meta.model_name}_deleted')
+    post_save.connect(fact_values_changed, sender=model, dispatch_uid=f'lookups_{model._meta.model_name}_saved')
+    post_delete.connect(fact_values_changed, sender=model, dispatch_uid=f'lookups_{model._meta.model_name}_deleted')
+
+
+@receiver(post_save, sender=IFRS17Submission)
+def submission_status_saved(sender, instance, created, update_fields=None, **kwargs):
+    """Keep the running status counts in step with single-row saves."""
+    if not instance.is_current or (update_fields is not None and 'status' not in update_fields):
+        return
+    previous = None if created else getattr(instance, '_loaded_status', None)
+    if created:
+        adjust_counts({instance.status: 1})
+    elif previous is not None and previous != instance.status:
+        adjust_counts({previous: -1, instance.status: 1})
+    instance._loaded_status = instance.status
+
+
+@receiver(post_delete, sender=IFRS17Submission)
+def submission_deleted(sender, instance, **kwargs):
+    """Drop the row from the status counts, fall back to the prior version and reclaim unused files."""
+    record_event(instance, 'deleted', to_status=DELETED)
+    if instance.is_current:
+        adjust_counts({getattr(instance, '_loaded_status', instance.status): -1})
+        reinstate_previous(instance)
+    if instance.blob_id:
+        transaction.on_commit(queue_reclaim)
+
+
+@receiver(submissions_reviewed)
+def submissions_batch_reviewed(sender, ids, status, **kwargs):
+    """Bulk reviews bypass post_save; log the affected periods once per batch."""
+    record_changes(IFRS17Submission, IFRS17Submission.current.filter(id__in=ids).values_list(
+        'institution_id', 'reporting_period'
+    ))
+
+
+@receiver([post_save, post_delete], sender=Institution)
+def institution_changed(sender, instance, **kwargs):
+    """Institution names or membership changed; rebuild the dropdown lists."""
+    invalidate_institution_choices()
+    invalidate_distinct_values(Institution)
+    invalidate_anomalies(INSTITUTIONS)
+
+
+def search_document_saved(sender, instance, **kwargs):
+    """Keep the full-text index in step with the searchable text."""
+    index_objects([instance])
+
+
+def search_document_deleted(sender, instance, **kwargs):
+    remove_objects(KIND_BY_MODEL[sender], [instance.pk])
+
+
+for kind, (model, fields) in SEARCH_DOCUMENTS.items():
+    post_save.connect(search_document_saved, sender=model, dispatch_uid=f'search_{kind}_saved')
+    post_delete.connect(search_document_deleted, sender=model, dispatch_uid=f'search_{kind}_deleted')
@@ -0,0 +1,222 @@
+"""
+Industry stress-test runner.
+
+Scenarios from scenarios.py are applied to every institution with a
+reported solvency ratio for a period. The inputs (solvency ratio, IFRS 17
+liabilities and CSM, reinsurance assets and counterparty credit risk, in the
+reporting currency) are loaded once, cut into slices of STRESS_SLICE_SIZE
+institutions and evaluated on a process pool of STRESS_WORKERS workers,
+every (scenario, slice) pair as a separate job.
+
+Each run is stored as a StressRun keyed by the scenario hash (definition
+plus balance-sheet parameters) and the data version (a hash of the loaded
+inputs), with one StressResult per institution for the dashboards. Asking
+for a scenario whose hash and data version already have a run returns the
+stored run without evaluating anything.
+"""
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Min, Max, OuterRef, Subquery
+
+from .fx import normalize_frame, normalize_queryset
+from .models import IFRS17Submission, IFRS4Transition, ReinsuranceHeld, StressRun, StressResult
+from .scenarios import SCENARIOS, evaluate, scenario_hash, validate
+
+
+INPUT_COLUMNS = ['solvency_ratio', 'liabilities', 'csm', 'reinsurance_assets', 'counterparty_risk']
+
+
+def parameters():
+    """Balance-sheet assumptions shared by every scenario; part of the scenario hash."""
+    return {
+        'capital_factor': getattr(settings, 'STRESS_CAPITAL_FACTOR', 0.1),
+        'liability_duration': getattr(settings, 'STRESS_LIABILITY_DURATION', 8.0),
+        'asset_duration': getattr(settings, 'STRESS_ASSET_DURATION', 5.0),
+        'minimum_ratio': getattr(settings, 'ALERT_MIN_SOLVENCY_RATIO', 100),
+    }
+
+
+def load_inputs(reporting_period):
+    """One row per institution (indexed by institution_id) with the INPUT_COLUMNS of a period."""
+    ratios = pd.DataFrame.from_records(
+        IFRS17Submission.current.filter(reporting_period=reporting_period, solvency_ratio__isnull=False)
+        .values('institution_id').annotate(solvency_ratio=Min('solvency_ratio')).order_by('institution_id'),
+        columns=['institution_id', 'solvency_ratio'],
+    ).set_index('institution_id').astype(float)
+
+    transition = normalize_queryset(
+        IFRS4Transition.objects.filter(reporting_period=reporting_period), ['ifrs17_liabilities', 'ifrs17_csm']
+    ).groupby('institution_id')[['ifrs17_liabilities', 'ifrs17_csm']].sum(min_count=1)
+    transition.columns = ['liabilities', 'csm']
+
+    reinsurance = pd.DataFrame.from_records(
+        ReinsuranceHeld.objects.filter(reporting_period=reporting_period).values(
+            'institution_id', 'reporting_period', 'currency', 'reinsurance_assets', 'counterparty_credit_risk'
+        ),
+        columns=['institution_id', 'reporting_period', 'currency', 'reinsurance_assets', 'counterparty_credit_risk'],
+    )
+    reinsurance = normalize_frame(reinsurance, ['reinsurance_assets'])
+    reinsurance['counterparty_credit_risk'] = reinsurance['counterparty_credit_risk'].astype(float)
+    # Counterparty risk is weighted by the reinsurance assets it applies to
+    reinsurance['weighted_risk'] = reinsurance['counterparty_credit_risk'] * reinsurance['reinsurance_assets']
+    reinsurance = reinsurance.groupby('institution_id')[['reinsurance_assets', 'weighted_risk']].sum()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        reinsurance['counterparty_risk'] = reinsurance['weighted_risk'] / reinsurance['reinsurance_assets']
+
+    inputs = ratios.join(transition).join(reinsurance[['reinsurance_assets', 'counterparty_risk']])
+    return inputs.dropna(subset=['solvency_ratio', 'liabilities'])[INPUT_COLUMNS].sort_index()
+
+
+def data_version(inputs):
+    """Hash of the input rows, so any change to the underlying facts produces a new version."""
+    digest = hashlib.sha256(pd.util.hash_pandas_object(inputs, index=True).to_numpy().tobytes())
+    digest.update(','.join(inputs.columns).encode())
+    return digest.hexdigest()
+
+
+def slices(inputs):
+    """Cut the inputs into per-institution slices of column arrays."""
+    size = getattr(settings, 'STRESS_SLICE_SIZE', 250)
+    for start in range(0, len(inputs), size):
+        chunk = inputs.iloc[start:start + size]
+        yield chunk.index.to_numpy(), {column: chunk[column].to_numpy(dtype=float) for column in INPUT_COLUMNS}
+
+
+def workers():
+    return getattr(settings, 'STRESS_WORKERS', 0) or os.cpu_count() or 1
+
+
+def resolve(scenario):
+    """Return (key, definition) for a scenario key or an inline definition."""
+    if isinstance(scenario, str):
+        if scenario not in SCENARIOS:
+            raise ValueError(f'Unknown scenario: {scenario}')
+        return scenario, SCENARIOS[scenario]
+    validate(scenario)
+    return scenario.get('key', 'custom'), scenario
+
+
+def run_scenarios(reporting_period, scenarios=None, force=False):
+    """
+    Evaluate scenarios (keys or definitions, default all of SCENARIOS) for a
+    period and return their StressRuns. Runs already stored for the same
+    scenario hash and data version are reused unless force is True.
+    """
+    scenarios = [resolve(scenario) for scenario in (scenarios or list(SCENARIOS))]
+    params = parameters()
+    inputs = load_inputs(reporting_period)
+    version = data_version(inputs)
+
+    runs, pending = {}, []
+    for key, definition in scenarios:
+        digest = scenario_hash(definition, params)
+        existing = StressRun.objects.filter(
+            scenario_hash=digest, data_version=version, reporting_period=reporting_period
+        ).first()
+        if existing and not force:
+            runs[key] = existing
+        else:
+            pending.append((key, definition, digest, existing))
+
+    if pending:
+        outcomes = _evaluate(pending, list(slices(inputs)), params)
+        for key, definition, digest, existing in pending:
+            runs[key] = _store(
+                key, definition, digest, version, reporting_period, outcomes[key], params, replace=existing
+            )
+    return [runs[key] for key, definition in scenarios]
+
+
+def _evaluate(pending, parts, params):
+    """Evaluate every (scenario, slice) pair, on a process pool when there is more than one worker."""
+    jobs = [(key, definition, ids, inputs) for key, definition, digest, existing in pending for ids, inputs in parts]
+    count = min(workers(), len(jobs))
+    if count <= 1:
+        results = [evaluate(definition, inputs, params) for key, definition, ids, inputs in jobs]
+    else:
+        # Spawned workers only import scenarios.py, never Django or the parent's connections
+        with ProcessPoolExecutor(count, mp_context=multiprocessing.get_context('spawn')) as executor:
+            results = list(executor.map(
+                evaluate,
+                [definition for key, definition, ids, inputs in jobs],
+                [inputs for key, definition, ids, inputs in jobs],
+                [params] * len(jobs),
+            ))
+
+    outcomes = {}
+    for (key, definition, ids, inputs), result in zip(jobs, results):
+        outcomes.setdefault(key, []).append((ids, result))
+    return outcomes
+
+
+def _store(key, definition, digest, version, reporting_period, parts, params, replace=None):
+    minimum = params['minimum_ratio']
+    results = []
+    for ids, outcome in parts:
+        for index, institution_id in enumerate(ids):
+            after = outcome['solvency_ratio_after'][index]
+            if np.isnan(after):
+                continue
+            results.append(StressResult(
+                institution_id=int(institution_id),
+                own_funds_before=round(float(outcome['own_funds_before'][index]), 2),
+                own_funds_after=round(float(outcome['own_funds_after'][index]), 2),
+                required_capital_after=round(float(outcome['required_capital_after'][index]), 2),
+                solvency_ratio_before=float(outcome['solvency_ratio_before'][index]),
+                solvency_ratio_after=float(after),
+                breach=bool(after < minimum),
+            ))
+
+    try:
+        with transaction.atomic():
+            if replace is not None:
+                replace.delete()
+            run = StressRun.objects.create(
+                scenario=key,
+                label=definition.get('label', key),
+                scenario_hash=digest,
+                data_version=version,
+                reporting_period=reporting_period,
+                definition=definition,
+                institutions=len(results),
+                breaches=sum(result.breach for result in results),
+            )
+            for result in results:
+                result.run = run
+            StressResult.objects.bulk_create(results, batch_size=1000)
+    except IntegrityError:
+        # A concurrent runner stored the same scenario and data version first
+        run = StressRun.objects.get(scenario_hash=digest, data_version=version, reporting_period=reporting_period)
+    return run
+
+
+def latest_runs(reporting_period=None):
+    """
+    The most recent run of each scenario for a period (default: the latest
+    period with runs), annotated with average, lowest and highest post-stress
+    solvency ratios.
+    """
+    if reporting_period is None:
+        reporting_period = StressRun.objects.order_by('-reporting_period').values_list(
+            'reporting_period', flat=True
+        ).first()
+        if reporting_period is None:
+            return StressRun.objects.none()
+
+    newest = StressRun.objects.filter(
+        reporting_period=reporting_period, scenario=OuterRef('scenario')
+    ).order_by('-created_at', '-id').values('id')[:1]
+    return StressRun.objects.filter(
+        reporting_period=reporting_period, id=Subquery(newest)
+    ).annotate(
+        average_ratio=Avg('results__solvency_ratio_after'),
+        lowest_ratio=Min('results__solvency_ratio_after'),
+        highest_ratio=Max('results__solvency_ratio_after'),
+    ).order_by('scenario')
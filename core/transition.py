@@ -0,0 +1,154 @@
+"""
+IFRS 4 to IFRS 17 transition analytics.
+
+The liability bridge walks from the IFRS 4 carrying amount to the IFRS 17
+insurance contract liabilities: the contractual service margin and risk
+adjustment recognised on transition, the other remeasurement making up the
+rest of the reported liability adjustment, and any difference between the
+reported IFRS 17 liabilities and IFRS 4 plus the adjustment, which should
+be nil. Amounts are converted to the reporting currency and summed per
+institution and for the industry.
+
+Readiness distributions summarise each institution's data quality, process
+maturity and system readiness scores (averaged over its currency rows in
+SQL) as quantiles and READINESS_BANDS counts, next to how many institutions
+are at each implementation status.
+
+Each period's results are cached and keyed on the FX generation of the
+period, which moves whenever a rate or a transition row of the period
+changes, so repeated page loads read a single cache entry.
+"""
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count
+
+from .fx import REPORTING_CURRENCY, generation, normalize_queryset
+from .models import IFRS4Transition
+
+
+AMOUNT_FIELDS = ['ifrs4_liabilities', 'ifrs17_csm', 'ifrs17_risk_adjustment', 'liability_adjustment', 'ifrs17_liabilities']
+
+BRIDGE_STEPS = [
+    ('ifrs4_liabilities', 'IFRS 4 liabilities'),
+    ('ifrs17_csm', 'Contractual service margin'),
+    ('ifrs17_risk_adjustment', 'Risk adjustment'),
+    ('other_remeasurement', 'Other remeasurement'),
+    ('unexplained', 'Unexplained difference'),
+]
+BRIDGE_TOTAL = ('ifrs17_liabilities', 'IFRS 17 liabilities')
+
+READINESS_FIELDS = {
+    'data_quality_score': 'Data Quality',
+    'process_maturity_score': 'Process Maturity',
+    'system_readiness_score': 'System Readiness',
+}
+
+# Score bands as (label, lower bound inclusive, upper bound exclusive)
+READINESS_BANDS = [('Below 50', 0, 50), ('50-70', 50, 70), ('70-85', 70, 85), ('85 and above', 85, np.inf)]
+
+
+def bridge_frame(frame):
+    """Add the derived bridge steps to a frame of transition amounts."""
+    frame = frame.copy()
+    frame['other_remeasurement'] = frame['liability_adjustment'] - frame['ifrs17_csm'] - frame['ifrs17_risk_adjustment']
+    frame['unexplained'] = frame['ifrs17_liabilities'] - frame['ifrs4_liabilities'] - frame['liability_adjustment']
+    return frame
+
+
+def bridge_steps(row):
+    """Waterfall of one bridge row as {field, label, value, running} dicts ending in the IFRS 17 total."""
+    steps, running = [], 0.0
+    for field, label in BRIDGE_STEPS:
+        value = float(row[field])
+        running += value
+        steps.append({'field': field, 'label': label, 'value': value, 'running': running})
+    field, label = BRIDGE_TOTAL
+    steps.append({'field': field, 'label': label, 'value': float(row[field]), 'running': float(row[field])})
+    return steps
+
+
+def distribution(scores):
+    """Count, mean, quantiles and band counts of a series of scores."""
+    scores = scores.dropna().astype(float)
+    if scores.empty:
+        return {'count': 0, 'bands': [(label, 0) for label, lower, upper in READINESS_BANDS]}
+    quantiles = scores.quantile([0, 0.25, 0.5, 0.75, 1]).to_numpy()
+    return {
+        'count': int(scores.size),
+        'mean': float(scores.mean()),
+        'min': float(quantiles[0]),
+        'p25': float(quantiles[1]),
+        'median': float(quantiles[2]),
+        'p75': float(quantiles[3]),
+        'max': float(quantiles[4]),
+        'bands': [
+            (label, int(((scores >= lower) & (scores < upper)).sum())) for label, lower, upper in READINESS_BANDS
+        ],
+    }
+
+
+def compute_summary(reporting_period):
+    """Bridges, readiness distributions and status counts for a period (uncached)."""
+    rows = IFRS4Transition.objects.filter(reporting_period=reporting_period)
+
+    amounts = normalize_queryset(rows, AMOUNT_FIELDS)
+    unconverted = int(amounts[AMOUNT_FIELDS].isna().any(axis=1).sum()) if not amounts.empty else 0
+    institutions = bridge_frame(amounts.groupby('institution_id')[AMOUNT_FIELDS].sum(min_count=1))
+    # Institutions with amounts that could not be converted are left out of the industry bridge
+    complete = institutions.dropna(subset=AMOUNT_FIELDS)
+
+    scores = pd.DataFrame.from_records(
+        rows.values('institution_id').annotate(**{field: Avg(field) for field in READINESS_FIELDS}).order_by(),
+        columns=['institution_id', *READINESS_FIELDS],
+    )
+    statuses = dict(
+        rows.values_list('implementation_status').annotate(institutions=Count('institution', distinct=True)).order_by()
+    )
+
+    return {
+        'reporting_period': reporting_period,
+        'currency': REPORTING_CURRENCY,
+        'institution_count': len(complete),
+        'unconverted': unconverted,
+        'industry': None if complete.empty else bridge_steps(complete.sum()),
+        'institutions': institutions,
+        'readiness': [(label, distribution(scores[field])) for field, label in READINESS_FIELDS.items()],
+        'statuses': [
+            (label, statuses.get(value, 0))
+            for value, label in IFRS4Transition._meta.get_field('implementation_status').choices
+        ],
+    }
+
+
+def transition_summary(reporting_period=None):
+    """Cached transition summary of a period (default: the latest with transition data), or None."""
+    if reporting_period is None:
+        reporting_period = latest_period()
+        if reporting_period is None:
+            return None
+    key = f'transition:summary:{reporting_period}:{generation(reporting_period)}'
+    summary = cache.get(key)
+    if summary is None:
+        summary = compute_summary(reporting_period)
+        cache.set(key, summary, getattr(settings, 'TRANSITION_CACHE_TIMEOUT', 3600))
+    return summary
+
+
+def institution_bridge(institution_id, reporting_period=None):
+    """One institution's bridge steps for a period (default: its latest), as (period, steps) or (None, None)."""
+    if reporting_period is None:
+        reporting_period = IFRS4Transition.objects.filter(institution_id=institution_id).order_by(
+            '-reporting_period'
+        ).values_list('reporting_period', flat=True).first()
+        if reporting_period is None:
+            return None, None
+    institutions = transition_summary(reporting_period)['institutions']
+    if institution_id not in institutions.index or institutions.loc[institution_id, AMOUNT_FIELDS].isna().any():
+        return reporting_period, None
+    return reporting_period, bridge_steps(institutions.loc[institution_id])
+
+
+def latest_period():
+    return IFRS4Transition.objects.order_by('-reporting_period').values_list('reporting_period', flat=True).first()
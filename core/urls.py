@@ -1,5 +1,6 @@
 from django.urls import path
 from . import views
+from .metrics import metrics_view
 
 app_name = 'core'
 
@@ -16,9 +17,19 @@ urlpatterns = [
     path('profitability-risk/', views.profitability_risk, name='profitability-risk'),
     path('liquidity-solvency/', views.liquidity_solvency, name='liquidity-solvency'),
     path('compliance-alerts/', views.compliance_alerts, name='compliance-alerts'),
+    path('api/compliance-alerts/', views.compliance_alerts_api, name='compliance-alerts-api'),
+    path('api/search/', views.search_api, name='search-api'),
+    path('api/bulk-review/', views.bulk_review, name='bulk-review'),
+    path('api/rate-sensitivity/', views.rate_sensitivity_api, name='rate-sensitivity-api'),
+    path('api/anomalies/', views.anomalies_api, name='anomalies-api'),
+    path('api/reinsurance-concentration/', views.reinsurance_concentration_api, name='reinsurance-concentration-api'),
+    path('api/contract-cube/', views.contract_cube_api, name='contract-cube-api'),
     path('industry-comparison/', views.industry_comparison, name='industry-comparison'),
     path('data-validation/', views.data_validation, name='data-validation'),
     path('reports-exports/', views.reports_exports, name='reports-exports'),
+    path('reports-exports/export/', views.export_data, name='export-data'),
+    path('reports-exports/report-packs/', views.generate_report_packs, name='generate-report-packs'),
+    path('reports-exports/report-packs/<int:pack_id>/', views.download_report_pack, name='download-report-pack'),
     path('settings-admin/', views.settings_admin, name='settings-admin'),
     
     # Institution Management
@@ -30,6 +41,7 @@ urlpatterns = [
     # IFRS 17 Submissions
     path('ifrs17-submissions/', views.ifrs17_submissions, name='ifrs17-submissions'),
     path('ifrs17-submissions/<int:submission_id>/', views.ifrs17_submission_detail, name='ifrs17-submission-detail'),
+    path('ifrs17-submissions/<int:submission_id>/files/', views.ifrs17_submission_files_api, name='ifrs17-submission-files'),
     path('upload-ifrs17-data/', views.upload_ifrs17_data, name='upload_ifrs17_data'),
     
     # Institution Data
@@ -43,4 +55,7 @@ urlpatterns = [
     path('data-quality-review/', views.data_quality_review, name='data-quality-review'),
     path('reporting-period/<int:year>/<int:month>/', views.reporting_period_detail, name='reporting-period-detail'),
     path('run-data-quality-checks/', views.run_data_quality_checks, name='run-data-quality-checks'),
+    
+    # Monitoring
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -1,16 +1,48 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse, JsonResponse
+from django.urls import reverse
+from django.conf import settings
+from django.http import HttpResponse, FileResponse
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
-from django.db.models import Q, Count, Avg
+from django.db import transaction
+from django.db.models import Q, Count, Avg, OuterRef, Subquery
 from django.utils import timezone
+from django.core.exceptions import ValidationError
 import pandas as pd
 import json
 import os
-from .models import Institution, IFRS17Submission, ComplianceAlert
-from .forms import InstitutionForm, IFRS17SubmissionForm, IFRS17FileUploadForm
+import logging
+from datetime import date
+from .models import (
+    Institution, IFRS17Submission, ComplianceAlert, InsuranceRevenue,
+    CSMProfitability, DiscountRates, ReinsuranceHeld, IFRS4Transition,
+    ContractGrouping, DataQualityCheck, ReportPack
+)
+from .forms import InstitutionForm, IFRS17SubmissionForm, IFRS17FileUploadForm, ExportForm, ReportPackForm
+from .encoders import FastJsonResponse, StreamingJsonResponse
+from .exports import export_response
+from .reports import queue_report_packs, current_pack
+from .fx import institution_total
+from .lookups import institution_choices
+from .pagination import KeysetPaginator, approximate_count
+from .search import SEARCH_DOCUMENTS, search, search_ids
+from .reviews import REVIEW_ACTIONS, review_submissions, resolve_alerts
+from .workflow import record_event, record_events, status_counts, supersede, transition
+from .blobs import store_blob
+from .deltas import headline_deltas
+from .reconciliation import reconcile_frame
+from .sensitivity import parse_shocks, rate_sensitivities
+from .stress import latest_runs
+from .anomalies import anomaly_counts, detect_anomalies, queue_scan
+from .cube import DIMENSIONS, breakdowns, cube_slice, queue_cube_refresh
+from .transition import institution_bridge, transition_summary
+from .metrics import PARSE_SECONDS, UPLOADS, UPLOAD_BYTES, VALIDATION_SECONDS
+from .reinsurance import industry_concentration, institution_concentration, latest_period, queue_aggregation
+from .schemas import SCHEMAS_BY_KEY, read_template, route_rows
+
+
+logger = logging.getLogger(__name__)
 
 
 def home(request):
@@ -70,7 +102,8 @@ def financial_performance(request):
     """Financial Performance & Position view."""
     context = {
         'title': 'Financial Performance & Position',
-        'message': 'Insurance Contract Liabilities and IFRS 17 Analysis'
+        'message': 'Insurance Contract Liabilities and IFRS 17 Analysis',
+        'transition': transition_summary(),
     }
     return render(request, 'financial_performance.html', context)
 
@@ -80,7 +113,8 @@ def profitability_risk(request):
     """Profitability & Risk view."""
     context = {
         'title': 'Profitability & Risk',
-        'message': 'Insurance Service Results and Risk Analysis'
+        'message': 'Insurance Service Results and Risk Analysis',
+        'stress_runs': latest_runs(),
     }
     return render(request, 'profitability_risk.html', context)
 
@@ -90,21 +124,89 @@ def liquidity_solvency(request):
     """Liquidity & Solvency view."""
     context = {
         'title': 'Liquidity & Solvency',
-        'message': 'Solvency II Ratios and Cashflow Analysis'
+        'message': 'Solvency II Ratios and Cashflow Analysis',
+        'stress_runs': latest_runs(),
     }
     return render(request, 'liquidity_solvency.html', context)
 
 
+def filter_alerts(params):
+    """
+    Apply the alert listing filters (severity, type, institution, resolved)
+    from query params. Raises ValueError if institution is not an id.
+    """
+    alerts = ComplianceAlert.objects.all()
+    
+    if params.get('severity'):
+        alerts = alerts.filter(severity=params['severity'])
+    if params.get('type'):
+        alerts = alerts.filter(alert_type=params['type'])
+    if params.get('institution'):
+        alerts = alerts.filter(institution_id=int(params['institution']))
+    if params.get('resolved') in ['true', 'false']:
+        alerts = alerts.filter(is_resolved=params['resolved'] == 'true')
+    
+    return alerts
+
+
 @login_required
 def compliance_alerts(request):
     """Compliance & Supervisory Alerts view."""
+    summary = ComplianceAlert.objects.aggregate(
+        critical=Count('id', filter=Q(is_resolved=False, severity='critical')),
+        warning=Count('id', filter=Q(is_resolved=False, alert_type='warning')),
+        info=Count('id', filter=Q(is_resolved=False, alert_type='info')),
+        resolved=Count('id', filter=Q(is_resolved=True)),
+    )
+    
+    # Alert register, paginated by seeking on (created_at, id); a malformed institution filter is ignored
+    params = request.GET.copy()
+    try:
+        alerts = filter_alerts(params)
+    except ValueError:
+        params.pop('institution')
+        alerts = filter_alerts(params)
+    paginator = KeysetPaginator(alerts.select_related('institution'), per_page=20)
+    alerts = paginator.page(request.GET.get('cursor'))
+    
     context = {
         'title': 'Compliance & Supervisory Alerts',
-        'message': 'Regulatory Compliance Monitoring and Alert Management'
+        'message': 'Regulatory Compliance Monitoring and Alert Management',
+        'summary': summary,
+        'alerts': alerts,
+        'severity_filter': request.GET.get('severity'),
+        'type_filter': request.GET.get('type'),
+        'resolved_filter': request.GET.get('resolved'),
+        'filter_query': filter_query(request),
     }
     return render(request, 'compliance_alerts.html', context)
 
 
+@login_required
+def compliance_alerts_api(request):
+    """Keyset-paginated compliance alert listing as JSON."""
+    try:
+        page_size = min(max(int(request.GET.get('page_size', 50)), 1), 500)
+    except ValueError:
+        page_size = 50
+    
+    try:
+        alerts = filter_alerts(request.GET)
+    except ValueError as e:
+        return FastJsonResponse({'error': str(e)}, status=400)
+    alerts = alerts.values(
+        'id', 'institution_id', 'institution__name', 'alert_type', 'severity', 'title',
+        'description', 'rule', 'reporting_period', 'is_resolved', 'resolved_date', 'created_at'
+    )
+    page = KeysetPaginator(alerts, per_page=page_size).page(request.GET.get('cursor'))
+    
+    return FastJsonResponse({
+        'results': page.object_list,
+        'next_cursor': page.next_cursor,
+        'has_next': page.has_next,
+    })
+
+
 @login_required
 def industry_comparison(request):
     """Industry Comparison view."""
@@ -122,13 +224,14 @@ def data_validation(request):
     institutions = Institution.objects.filter(status='active').order_by('name')
     
     # Get recent submissions for display
-    recent_submissions = IFRS17Submission.objects.select_related('institution').order_by('-submission_date')[:10]
+    recent_submissions = IFRS17Submission.current.select_related('institution').order_by('-submission_date')[:10]
     
-    # Calculate summary statistics
-    total_submissions = IFRS17Submission.objects.count()
-    successful_submissions = IFRS17Submission.objects.filter(status='approved').count()
-    failed_submissions = IFRS17Submission.objects.filter(status='rejected').count()
-    pending_submissions = IFRS17Submission.objects.filter(status__in=['draft', 'submitted', 'under_review']).count()
+    # Calculate summary statistics from the running status counts
+    counts = status_counts()
+    total_submissions = sum(counts.values())
+    successful_submissions = counts['approved']
+    failed_submissions = counts['rejected']
+    pending_submissions = counts['draft'] + counts['submitted'] + counts['under_review']
     
     # Initialize upload form
     upload_form = IFRS17FileUploadForm()
@@ -152,11 +255,67 @@ def reports_exports(request):
     """Reports & Exports view."""
     context = {
         'title': 'Reports & Exports',
-        'message': 'Regulatory Reporting and Custom Export Tools'
+        'message': 'Regulatory Reporting and Custom Export Tools',
+        'export_form': ExportForm(),
+        'report_pack_form': ReportPackForm(),
+        'report_packs': ReportPack.objects.select_related('institution')[:10],
     }
     return render(request, 'reports_exports.html', context)
 
 
+@login_required
+def generate_report_packs(request):
+    """Queue background generation of quarterly report packs."""
+    if request.method != 'POST':
+        return redirect('core:reports-exports')
+    
+    form = ReportPackForm(request.POST)
+    if not form.is_valid():
+        messages.error(request, f'Please correct the report pack request: {form.errors}')
+        return redirect('core:reports-exports')
+    
+    institution = form.cleaned_data['institution']
+    packs = queue_report_packs(
+        form.cleaned_data['reporting_period'],
+        institutions=[institution] if institution else None,
+    )
+    ready = sum(1 for pack in packs if pack.status == 'ready')
+    messages.success(request, f'{len(packs) - ready} report pack(s) queued, {ready} already up to date.')
+    return redirect('core:reports-exports')
+
+
+@login_required
+def download_report_pack(request, pack_id):
+    """Serve a cached report pack, regenerating it if the underlying data changed."""
+    pack = get_object_or_404(ReportPack.objects.select_related('institution'), id=pack_id)
+    
+    latest = current_pack(pack.institution, pack.reporting_period)
+    if latest is None:
+        queue_report_packs(pack.reporting_period, institutions=[pack.institution])
+        messages.info(request, f'Data for {pack.institution.name} has changed; the report pack is being regenerated.')
+        return redirect('core:reports-exports')
+    
+    return FileResponse(latest.file.open('rb'), as_attachment=True, filename=os.path.basename(latest.file.name))
+
+
+@login_required
+def export_data(request):
+    """Stream a filtered data extract as CSV or Excel."""
+    form = ExportForm(request.GET)
+    if not form.is_valid():
+        messages.error(request, f'Please correct the export filters: {form.errors}')
+        return redirect('core:reports-exports')
+    
+    return export_response(
+        form.cleaned_data['dataset'],
+        form.cleaned_data['file_format'],
+        institution=form.cleaned_data['institution'],
+        period_from=form.cleaned_data['period_from'],
+        period_to=form.cleaned_data['period_to'],
+        currency=form.cleaned_data['currency'],
+    )
+
+
 @login_required
 def settings_admin(request):
     """Settings & Administration view."""
@@ -168,6 +327,179 @@ def settings_admin(request):
 
 
 # Institution Management Views
+@login_required
+def search_api(request):
+    """Ranked, prefix-matching full-text search across institutions, submissions and alerts."""
+    query = request.GET.get('q', '')
+    kinds = [kind for kind in request.GET.getlist('kind') if kind in SEARCH_DOCUMENTS] or None
+    hits = search(query, kinds, limit=50)
+    
+    # Resolve labels with one query per kind
+    ids_by_kind = {}
+    for kind, object_id, rank in hits:
+        ids_by_kind.setdefault(kind, []).append(object_id)
+    labels = {}
+    for institution in Institution.objects.filter(id__in=ids_by_kind.get('institution', [])).only('name'):
+        labels['institution', institution.id] = (institution.name, reverse('core:institution-detail', args=[institution.id]))
+    for submission in IFRS17Submission.current.filter(id__in=ids_by_kind.get('submission', [])).select_related('institution'):
+        labels['submission', submission.id] = (str(submission), reverse('core:ifrs17-submission-detail', args=[submission.id]))
+    for alert in ComplianceAlert.objects.filter(id__in=ids_by_kind.get('alert', [])).select_related('institution'):
+        labels['alert', alert.id] = (f'{alert.institution.name}: {alert.title}', reverse('core:compliance-alerts'))
+    
+    results = []
+    for kind, object_id, rank in hits:
+        if (kind, object_id) in labels:
+            label, url = labels[kind, object_id]
+            results.append({'kind': kind, 'id': object_id, 'label': label, 'url': url, 'rank': rank})
+    
+    return FastJsonResponse({'query': query, 'results': results})
+
+
+@login_required
+def rate_sensitivity_api(request):
+    """
+    Recompute discount-rate sensitivities for a reporting period.
+    
+    Query params: period (YYYY-MM-DD, defaults to the latest with discount rates),
+    parallel=-100,100 and twist=-50:50 for custom shocks, institution=<id> (repeatable).
+    """
+    period = request.GET.get('period') or DiscountRates.objects.order_by('-reporting_period').values_list(
+        'reporting_period', flat=True
+    ).first()
+    if period is None:
+        return FastJsonResponse({'period': None, 'results': []})
+    try:
+        shocks = parse_shocks(request.GET.get('parallel'), request.GET.get('twist'))
+        institution_ids = [int(value) for value in request.GET.getlist('institution')] or None
+        results = rate_sensitivities(period, shocks, institution_ids)
+    except ValidationError as e:
+        return FastJsonResponse({'error': ' '.join(e.messages)}, status=400)
+    except ValueError as e:
+        return FastJsonResponse({'error': str(e)}, status=400)
+    
+    return FastJsonResponse({'period': period, 'results': results.to_dict('records')})
+
+
+@login_required
+def anomalies_api(request):
+    """Flagged fact cells with their anomaly scores for a reporting period (default: the latest)."""
+    try:
+        period = request.GET.get('period')
+        period = date.fromisoformat(period) if period else IFRS17Submission.current.order_by(
+            '-reporting_period'
+        ).values_list('reporting_period', flat=True).first()
+        institution_id = int(request.GET['institution']) if request.GET.get('institution') else None
+    except ValueError as e:
+        return FastJsonResponse({'error': str(e)}, status=400)
+    if period is None:
+        return FastJsonResponse({'period': None, 'results': []})
+    
+    flagged = detect_anomalies(period)
+    if institution_id is not None:
+        flagged = flagged[flagged['institution_id'] == institution_id]
+    if request.GET.get('check'):
+        flagged = flagged[flagged['check'] == request.GET['check']]
+    
+    return FastJsonResponse({'period': period, 'count': len(flagged), 'results': flagged.to_dict('records')})
+
+
+@login_required
+def reinsurance_concentration_api(request):
+    """
+    Reinsurance concentration for a reporting period (default: the latest
+    aggregated one): HHI and top counterparties per currency for the industry,
+    or for one institution when institution is given.
+    """
+    try:
+        period = request.GET.get('period')
+        period = date.fromisoformat(period) if period else latest_period()
+        institution_id = int(request.GET['institution']) if request.GET.get('institution') else None
+    except ValueError as e:
+        return FastJsonResponse({'error': str(e)}, status=400)
+    if period is None:
+        return FastJsonResponse({'period': None, 'results': []})
+    
+    if institution_id is None:
+        rows = industry_concentration(period)
+    else:
+        rows = institution_concentration(institution_id, period)
+    if request.GET.get('currency'):
+        rows = rows.filter(currency=request.GET['currency'])
+    
+    results = list(rows.values('currency', 'total_exposure', 'counterparties', 'hhi', 'top_counterparties'))
+    return FastJsonResponse({'period': period, 'institution': institution_id, 'results': results})
+
+
+@login_required
+def contract_cube_api(request):
+    """
+    Drill into the contract group cube: cells of a period broken down by the
+    comma-separated dimensions in by, with any dimension given as a parameter
+    pinned to that value and the rest rolled up.
+    """
+    try:
+        period = date.fromisoformat(request.GET.get('period', ''))
+        by = [dimension for dimension in request.GET.get('by', '').split(',') if dimension]
+        fixed = {dimension: request.GET[dimension] for dimension in DIMENSIONS if request.GET.get(dimension)}
+        if 'institution' in fixed:
+            fixed['institution'] = int(fixed['institution'])
+        cells = cube_slice(period, by=by, currency=request.GET.get('currency'), **fixed)
+    except ValueError as e:
+        return FastJsonResponse({'error': str(e)}, status=400)
+    
+    results = list(cells.order_by('currency', '-total_contract_value').values(
+        'currency', 'institution_id', 'product_line', 'measurement_model', 'risk_profile', 'groups',
+        'number_of_contracts', 'total_contract_value', 'materiality_threshold', 'average_contract_value',
+        'grouping_efficiency', 'volatility_score', 'correlation_score',
+    ))
+    return FastJsonResponse({'period': period, 'by': by, 'filters': fixed, 'results': results})
+
+
+@login_required
+def bulk_review(request):
+    """
+    Apply a review action to many submissions, or resolve many alerts, in one batch.
+    
+    Expects a JSON body {"action": "approve"|"reject"|"start_review"|"resolve", "ids": [...], "note": ""}.
+    """
+    if request.method != 'POST':
+        return FastJsonResponse({'error': 'Invalid request method'}, status=400)
+    if not request.user.is_staff:
+        return FastJsonResponse({'error': 'Reviewer permissions required'}, status=403)
+    
+    try:
+        payload = json.loads(request.body)
+        action = payload['action']
+        ids = [int(object_id) for object_id in payload['ids']]
+    except (ValueError, KeyError, TypeError):
+        return FastJsonResponse({'error': 'Expected a JSON body with action and ids'}, status=400)
+    
+    max_ids = getattr(settings, 'BULK_ACTION_MAX_IDS', 10000)
+    if len(ids) > max_ids:
+        return FastJsonResponse({'error': f'At most {max_ids} ids per request'}, status=400)
+    
+    note = str(payload.get('note', ''))
+    if action == 'resolve':
+        changed = resolve_alerts(ids, request.user, note)
+    elif action in REVIEW_ACTIONS:
+        changed = review_submissions(ids, action, request.user, note)
+    else:
+        return FastJsonResponse({'error': f'Unknown action: {action}'}, status=400)
+    
+    return FastJsonResponse({
+        'action': action,
+        'updated': changed,
+        'skipped': sorted(set(ids) - set(changed)),
+    })
+
+
+def filter_query(request):
+    """Current GET filters minus the cursor, for building pagination links."""
+    params = request.GET.copy()
+    params.pop('cursor', None)
+    return params.urlencode()
+
+
 @login_required
 def institutions_list(request):
     """List all registered institutions."""
@@ -176,11 +508,7 @@ def institutions_list(request):
     # Search functionality
     search_query = request.GET.get('search')
     if search_query:
-        institutions = institutions.filter(
-            Q(name__icontains=search_query) |
-            Q(registration_number__icontains=search_query) |
-            Q(license_number__icontains=search_query)
-        )
+        institutions = institutions.filter(id__in=search_ids('institution', search_query))
     
     # Filter by status
     status_filter = request.GET.get('status')
@@ -193,13 +521,18 @@ def institutions_list(request):
         institutions = institutions.filter(institution_type=type_filter)
     
     # Pagination
-    paginator = Paginator(institutions, 20)
-    page_number = request.GET.get('page')
-    institutions = paginator.get_page(page_number)
+    total, total_exact = approximate_count(institutions)
+    latest = IFRS17Submission.current.filter(institution=OuterRef('pk')).order_by('-submission_date')
+    institutions = institutions.annotate(latest_period=Subquery(latest.values('reporting_period')[:1]))
+    paginator = KeysetPaginator(institutions, ordering=('name', 'id'), per_page=20)
+    institutions = paginator.page(request.GET.get('cursor'))
     
     context = {
         'title': 'Registered Institutions',
         'institutions': institutions,
+        'total': total,
+        'total_exact': total_exact,
+        'filter_query': filter_query(request),
         'search_query': search_query,
         'status_filter': status_filter,
         'type_filter': type_filter,
@@ -211,7 +544,7 @@ def institutions_list(request):
 def institution_detail(request, institution_id):
     """View detailed information about a specific institution."""
     institution = get_object_or_404(Institution, id=institution_id)
-    submissions = institution.ifrs17_submissions.all()[:10]  # Latest 10 submissions
+    submissions = IFRS17Submission.current.filter(institution=institution)[:10]  # Latest 10 submissions
     alerts = institution.alerts.filter(is_resolved=False)[:5]  # Latest 5 unresolved alerts
     
     context = {
@@ -267,7 +600,7 @@ def institution_edit(request, institution_id):
 @login_required
 def ifrs17_submissions(request):
     """List all IFRS 17 submissions."""
-    submissions = IFRS17Submission.objects.select_related('institution').all()
+    submissions = IFRS17Submission.current.select_related('institution').all()
     
     # Filter by institution
     institution_filter = request.GET.get('institution')
@@ -285,17 +618,17 @@ def ifrs17_submissions(request):
         submissions = submissions.filter(reporting_period__year=period_filter)
     
     # Pagination
-    paginator = Paginator(submissions, 20)
-    page_number = request.GET.get('page')
-    submissions = paginator.get_page(page_number)
-    
-    # Get institutions for filter dropdown
-    institutions = Institution.objects.all()
+    total, total_exact = approximate_count(submissions)
+    paginator = KeysetPaginator(submissions, ordering=('-submission_date', '-id'), per_page=20)
+    submissions = paginator.page(request.GET.get('cursor'))
     
     context = {
         'title': 'IFRS 17 Submissions',
         'submissions': submissions,
-        'institutions': institutions,
+        'total': total,
+        'total_exact': total_exact,
+        'filter_query': filter_query(request),
+        'institutions': institution_choices(),
         'institution_filter': institution_filter,
         'status_filter': status_filter,
         'period_filter': period_filter,
@@ -305,33 +638,77 @@ def ifrs17_submissions(request):
 
 @login_required
 def ifrs17_submission_detail(request, submission_id):
-    """View detailed information about a specific IFRS 17 submission showing all data for that institution and reporting period."""
-    submission = get_object_or_404(IFRS17Submission, id=submission_id)
-    
-    # Get all submissions for the same institution and reporting period
-    all_submissions = IFRS17Submission.objects.filter(
-        institution=submission.institution,
-        reporting_period=submission.reporting_period
-    ).order_by('submission_date')
-    
-    # Group submissions by file type for better organization
-    submissions_by_type = {}
-    for sub in all_submissions:
-        file_type = sub.file_type or 'other'
-        if file_type not in submissions_by_type:
-            submissions_by_type[file_type] = []
-        submissions_by_type[file_type].append(sub)
+    """
+    Shell page for one IFRS 17 submission. The files of the institution and
+    reporting period are only counted per file type here; each file type's
+    list is fetched as JSON when its tab is opened.
+    """
+    submission = get_object_or_404(
+        IFRS17Submission.objects.select_related('institution', 'reviewed_by', 'blob'), id=submission_id
+    )
+    
+    # One GROUP BY query, however many files were uploaded for the period
+    file_types = [
+        (row['file_type'] or 'other', row['files'])
+        for row in IFRS17Submission.current.filter(
+            institution_id=submission.institution_id,
+            reporting_period=submission.reporting_period,
+        ).values('file_type').annotate(files=Count('id')).order_by('file_type')
+    ]
     
     context = {
         'title': f'IFRS 17 Submission - {submission.institution.name}',
         'submission': submission,
-        'all_submissions': all_submissions,
-        'submissions_by_type': submissions_by_type,
-        'total_files': all_submissions.count()
+        'file_types': file_types,
+        'total_files': sum(files for file_type, files in file_types),
     }
     return render(request, 'ifrs17_submission_detail.html', context)
 
 
+@login_required
+def ifrs17_submission_files_api(request, submission_id):
+    """Keyset-paginated files of one file type uploaded for a submission's institution and period."""
+    submission = get_object_or_404(
+        IFRS17Submission.objects.only('institution_id', 'reporting_period'), id=submission_id
+    )
+    try:
+        page_size = min(max(int(request.GET.get('page_size', 20)), 1), 100)
+    except ValueError:
+        page_size = 20
+    
+    files = IFRS17Submission.current.filter(
+        institution_id=submission.institution_id,
+        reporting_period=submission.reporting_period,
+    ).select_related('blob')
+    file_type = request.GET.get('file_type')
+    if file_type == 'other':
+        files = files.filter(file_type__isnull=True)
+    elif file_type:
+        files = files.filter(file_type=file_type)
+    page = KeysetPaginator(files, ordering=('submission_date', 'id'), per_page=page_size).page(
+        request.GET.get('cursor')
+    )
+    
+    results = [{
+        'id': sub.id,
+        'name': sub.original_filename or (sub.uploaded_file.name[-50:] if sub.uploaded_file else f'Document {sub.id}'),
+        'file_type': sub.file_type,
+        'file_type_display': sub.get_file_type_display() if sub.file_type else None,
+        'template': sub.get_template_display() if sub.template else None,
+        'status': sub.status,
+        'status_display': sub.get_status_display(),
+        'version': sub.version,
+        'submission_date': sub.submission_date,
+        # Sizes come from the stored blob rather than a stat() of every file
+        'size': sub.blob.size if sub.blob else None,
+    } for sub in page]
+    return FastJsonResponse({
+        'results': results,
+        'next_cursor': page.next_cursor,
+        'has_next': page.has_next,
+    })
+
+
 @login_required
 def upload_ifrs17_data(request):
     """Handle IFRS 17 data file uploads."""
@@ -345,10 +722,10 @@ def upload_ifrs17_data(request):
             file_name = uploaded_file.name
             
             # Check if a file with the same name exists for this institution and period
-            existing_submission = IFRS17Submission.objects.filter(
+            existing_submission = IFRS17Submission.current.filter(
                 institution=institution,
                 reporting_period=reporting_period,
-                uploaded_file__icontains=file_name
+                original_filename=file_name
             ).first()
             
             if existing_submission and not request.POST.get('override_file'):
@@ -363,15 +740,63 @@ def upload_ifrs17_data(request):
                 }
                 return render(request, 'data_validation.html', context)
             
-            # If override is confirmed, delete the existing file
-            if existing_submission and request.POST.get('override_file'):
-                existing_submission.delete()
-            
-            # Create new submission
-            submission = form.save(commit=False)
-            submission.status = 'submitted'
-            submission.submission_date = timezone.now()
-            submission.save()
+            # Create new submission, reusing the stored file if this content was uploaded before
+            file_type = form.cleaned_data.get('file_type') or 'other'
+            UPLOAD_BYTES.observe(uploaded_file.size, file_type=file_type)
+            blob = store_blob(uploaded_file)
+            try:
+                # One transaction for the new version, the version switch and the loaded rows, so an
+                # unexpected failure leaves the previous version current (the blob is reclaimed later)
+                with transaction.atomic():
+                    submission = form.save(commit=False)
+                    submission.blob = blob
+                    submission.uploaded_file = blob.file.name
+                    submission.original_filename = file_name
+                    submission.submission_date = timezone.now()
+                    
+                    # If override is confirmed, the new upload becomes the next version of the existing one
+                    if existing_submission:
+                        submission.version = existing_submission.version + 1
+                        submission.supersedes = existing_submission
+                    submission.save()
+                    transition(submission, 'submitted', request.user, detail=file_name, event='uploaded')
+                    if existing_submission:
+                        supersede(existing_submission, submission, request.user)
+                    
+                    # Detect the file's template and load its rows into the matching fact model
+                    if submission.file_type in ['csv', 'xlsx']:
+                        try:
+                            with PARSE_SECONDS.time(source='upload', file_type=file_type):
+                                schema, df = read_template(submission.uploaded_file.path)
+                            submission.template = schema.key
+                            submission.save(update_fields=['template'])
+                            if route_rows(submission, schema, df):
+                                transaction.on_commit(lambda: queue_scan(submission.reporting_period))
+                                if schema.model_name == 'ReinsuranceExposure':
+                                    transaction.on_commit(queue_aggregation)
+                                elif schema.model_name == 'ContractGrouping':
+                                    transaction.on_commit(queue_cube_refresh)
+                            detail = f'{schema.label}: {len(df)} row(s)'
+                            reconciled = reconcile_frame(schema, df)
+                            if reconciled is not None and reconciled['is_break'].any():
+                                breaks = int(reconciled['is_break'].sum())
+                                detail += f', {breaks} reconciliation break(s)'
+                                messages.warning(
+                                    request, f'{breaks} contract group(s) do not reconcile: {reconciled["check"].iloc[0]}'
+                                )
+                            record_event(submission, 'parsed', request.user, detail=detail)
+                            UPLOADS.inc(file_type=file_type, outcome='loaded')
+                        except ValueError as e:
+                            record_event(submission, 'parsed', request.user, detail=f'Not loaded: {e}')
+                            messages.warning(request, f'File stored but not loaded: {e}')
+                            UPLOADS.inc(file_type=file_type, outcome='not_loaded')
+                    else:
+                        UPLOADS.inc(file_type=file_type, outcome='stored')
+            except Exception:
+                logger.exception('Upload of %s failed', file_name)
+                UPLOADS.inc(file_type=file_type, outcome='failed')
+                messages.error(request, f'{file_name} could not be processed; no changes were saved.')
+                return redirect('core:data-validation')
             
             messages.success(request, f'IFRS 17 data uploaded successfully for {submission.institution.name}')
             return redirect('core:data-validation')
@@ -389,13 +814,14 @@ def upload_ifrs17_data(request):
     institutions = Institution.objects.filter(status='active').order_by('name')
     
     # Get recent submissions for display
-    recent_submissions = IFRS17Submission.objects.select_related('institution').order_by('-submission_date')[:10]
+    recent_submissions = IFRS17Submission.current.select_related('institution').order_by('-submission_date')[:10]
     
-    # Calculate summary statistics
-    total_submissions = IFRS17Submission.objects.count()
-    successful_submissions = IFRS17Submission.objects.filter(status='approved').count()
-    failed_submissions = IFRS17Submission.objects.filter(status='rejected').count()
-    pending_submissions = IFRS17Submission.objects.filter(status__in=['draft', 'submitted', 'under_review']).count()
+    # Calculate summary statistics from the running status counts
+    counts = status_counts()
+    total_submissions = sum(counts.values())
+    successful_submissions = counts['approved']
+    failed_submissions = counts['rejected']
+    pending_submissions = counts['draft'] + counts['submitted'] + counts['under_review']
     
     context = {
         'title': 'Data & Validation',
@@ -417,7 +843,7 @@ def institution_data(request, institution_id):
     institution = get_object_or_404(Institution, id=institution_id)
     
     # Get all data for this institution
-    ifrs17_submissions = IFRS17Submission.objects.filter(institution=institution).order_by('-reporting_period')
+    ifrs17_submissions = IFRS17Submission.current.filter(institution=institution).order_by('-reporting_period')
     revenue_data = InsuranceRevenue.objects.filter(institution=institution).order_by('-reporting_period')
     csm_data = CSMProfitability.objects.filter(institution=institution).order_by('-reporting_period')
     discount_data = DiscountRates.objects.filter(institution=institution).order_by('-reporting_period')
@@ -431,6 +857,18 @@ def institution_data(request, institution_id):
     latest_revenue = revenue_data.first()
     latest_csm = csm_data.first()
     
+    # Consolidated USD figures across currencies for the latest periods
+    consolidated_revenue_usd = None
+    consolidated_csm_usd = None
+    if latest_revenue:
+        consolidated_revenue_usd = institution_total(
+            InsuranceRevenue, latest_revenue.reporting_period, institution.id, 'total_revenue'
+        )
+    if latest_csm:
+        consolidated_csm_usd = institution_total(
+            CSMProfitability, latest_csm.reporting_period, institution.id, 'closing_csm'
+        )
+    
     # Calculate overall quality scores
     zwl_quality = quality_data.filter(currency='ZWL').first()
     usd_quality = quality_data.filter(currency='USD').first()
@@ -448,6 +886,9 @@ def institution_data(request, institution_id):
     else:
         overall_quality_score = None
     
+    grouping_period, grouping_cube = breakdowns(institution.id)
+    transition_period, transition_bridge = institution_bridge(institution.id)
+    
     context = {
         'title': f'{institution.name} - Data Overview',
         'institution': institution,
@@ -462,9 +903,16 @@ def institution_data(request, institution_id):
         'latest_ifrs17': latest_ifrs17,
         'latest_revenue': latest_revenue,
         'latest_csm': latest_csm,
+        'consolidated_revenue_usd': consolidated_revenue_usd,
+        'consolidated_csm_usd': consolidated_csm_usd,
         'overall_quality_score': overall_quality_score,
         'zwl_quality_score': zwl_quality_score,
         'usd_quality_score': usd_quality_score,
+        'headline_deltas': headline_deltas(institution.id),
+        'grouping_period': grouping_period,
+        'grouping_cube': grouping_cube,
+        'transition_period': transition_period,
+        'transition_bridge': transition_bridge,
     }
     return render(request, 'institution_data.html', context)
 
@@ -530,22 +978,37 @@ def validate_institution_data(request, institution_id):
                 quality_data.remediation_plan = validation_results[f'{currency.lower()}_remediation_plan']
                 quality_data.save()
         
+        # Log the validation against the institution's latest period of submissions
+        latest = IFRS17Submission.current.filter(institution=institution).order_by('-reporting_period').values_list('reporting_period', flat=True).first()
+        record_events([
+            (submission_id, 'validated', request.user, status, status, 'Data quality checks run')
+            for submission_id, status in IFRS17Submission.current.filter(
+                institution=institution,
+                reporting_period=latest
+            ).values_list('id', 'status')
+        ])
+        
         messages.success(request, f'Data validation completed for {institution.name}')
         return redirect('core:institution-data', institution_id=institution.id)
     
     return redirect('core:institution-data', institution_id=institution.id)
 
 
+@VALIDATION_SECONDS.time()
 def run_data_validation(institution):
     """Run comprehensive data validation and governance checks."""
     # This is a simplified validation - in a real system, this would be much more comprehensive
     
     # Get all data for the institution
-    ifrs17_data = IFRS17Submission.objects.filter(institution=institution)
+    ifrs17_data = IFRS17Submission.current.filter(institution=institution)
     revenue_data = InsuranceRevenue.objects.filter(institution=institution)
     csm_data = CSMProfitability.objects.filter(institution=institution)
     quality_data = DataQualityCheck.objects.filter(institution=institution)
     
+    # Statistical anomalies in the latest period, scored against the whole industry
+    latest_period = ifrs17_data.order_by('-reporting_period').values_list('reporting_period', flat=True).first()
+    anomalies_by_currency = anomaly_counts(latest_period, institution.id) if latest_period else {}
+    
     results = {}
     
     for currency in ['ZWL', 'USD']:
@@ -553,7 +1016,8 @@ def run_data_validation(institution):
         total_expected_records = 8  # All data types
         actual_records = 0
         
-        if ifrs17_data.filter(currency=currency).exists():
+        # Submissions are not split by currency; they count towards both
+        if ifrs17_data.exists():
             actual_records += 1
         if revenue_data.filter(currency=currency).exists():
             actual_records += 1
@@ -588,7 +1052,7 @@ def run_data_validation(institution):
         
         # Issues
         missing_data = max(0, total_expected_records - actual_records)
-        anomalies = 2
+        anomalies = anomalies_by_currency.get(currency, 0)
         validation_errors = 1
         critical_issues = 0
         issues_resolved = 3
@@ -629,40 +1093,58 @@ def parse_file_data(request, submission_id):
         submission = get_object_or_404(IFRS17Submission, id=submission_id)
         
         if not submission.uploaded_file:
-            return JsonResponse({'error': 'No file uploaded'}, status=400)
+            return FastJsonResponse({'error': 'No file uploaded'}, status=400)
         
         file_path = submission.uploaded_file.path
         file_extension = os.path.splitext(file_path)[1].lower()
         
-        # Parse file based on extension
-        if file_extension == '.csv':
-            df = pd.read_csv(file_path)
-        elif file_extension in ['.xlsx', '.xls']:
-            df = pd.read_excel(file_path)
-        else:
-            return JsonResponse({'error': 'Unsupported file format'}, status=400)
+        if file_extension not in ['.csv', '.xlsx', '.xls']:
+            return FastJsonResponse({'error': 'Unsupported file format'}, status=400)
+        
+        # Parse with the template's dtypes, falling back to pandas inference for unknown layouts
+        schema = SCHEMAS_BY_KEY.get(submission.template)
+        with PARSE_SECONDS.time(source='preview', file_type=submission.file_type or 'other'):
+            try:
+                schema, df = read_template(file_path, schema, rename=False)
+            except ValueError:
+                schema = None
+                if file_extension == '.csv':
+                    df = pd.read_csv(file_path)
+                else:
+                    df = pd.read_excel(file_path)
+        
+        # Blank cells show as empty strings; nullable Int64/boolean columns cannot hold '' themselves
+        df = df.astype(object).where(df.notna(), '')
         
-        # Convert DataFrame to list of dictionaries
-        data = df.fillna('').to_dict('records')
+        # Stream every row when the full file is requested
+        if request.GET.get('rows') == 'all':
+            columns = list(df.columns)
+            return StreamingJsonResponse(
+                (dict(zip(columns, row)) for row in df.itertuples(index=False, name=None)),
+                envelope={
+                    'success': True,
+                    'total_rows': len(df),
+                    'columns': columns,
+                    'template': schema.label if schema else None
+                }
+            )
         
         # Limit to first 50 rows for performance
-        if len(data) > 50:
-            data = data[:50]
-            truncated = True
-        else:
-            truncated = False
+        data = df.head(50).to_dict('records')
+        truncated = len(df) > 50
         
-        return JsonResponse({
+        return FastJsonResponse({
             'success': True,
             'data': data,
             'total_rows': len(df),
             'displayed_rows': len(data),
             'truncated': truncated,
-            'columns': list(df.columns)
+            'columns': list(df.columns),
+            'template': schema.label if schema else None
         })
         
     except Exception as e:
-        return JsonResponse({
+        return FastJsonResponse({
             'success': False,
             'error': f'Error parsing file: {str(e)}'
         }, status=500)
@@ -672,7 +1154,7 @@ def parse_file_data(request, submission_id):
 def data_quality_review(request):
     """Data Quality & Governance review page - shows institutions and reporting dates."""
     # Get all submissions grouped by reporting period
-    submissions = IFRS17Submission.objects.all().order_by('-reporting_period', 'institution__name')
+    submissions = IFRS17Submission.current.all().order_by('-reporting_period', 'institution__name')
     
     # Group by reporting period
     reporting_periods = {}
@@ -721,7 +1203,7 @@ def reporting_period_detail(request, year, month):
     period_date = date(year, month, 1)
     
     # Get all submissions for this reporting period
-    submissions = IFRS17Submission.objects.filter(
+    submissions = IFRS17Submission.current.filter(
         reporting_period__year=year,
         reporting_period__month=month
     ).order_by('institution__name', 'submission_date')
@@ -765,7 +1247,7 @@ def run_data_quality_checks(request):
         try:
             # This is where you'll implement the actual data quality checks
             # For now, just return a success response
-            return JsonResponse({
+            return FastJsonResponse({
                 'success': True,
                 'message': 'Data quality checks completed successfully',
                 'checks_run': [
@@ -780,9 +1262,9 @@ def run_data_quality_checks(request):
                 'warnings': 4
             })
         except Exception as e:
-            return JsonResponse({
+            return FastJsonResponse({
                 'success': False,
                 'error': f'Error running data quality checks: {str(e)}'
             }, status=500)
     
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
+    return FastJsonResponse({'error': 'Invalid request method'}, status=400)
@@ -0,0 +1,178 @@
+"""
+Submission workflow.
+
+IFRS17Submission.status only moves along TRANSITIONS:
+
+    draft ──► submitted ──► under_review ──► approved / rejected
+      │           │
+      └───────────┴──► approved / rejected
+
+Every status write goes through transition() (or review_submissions for
+batches). Every lifecycle step (upload, parse, validation, review, override,
+deletion) is appended to SubmissionEvent, which is never updated or deleted
+and outlives the submission, so the status of a submission at any point in
+time can be read back through the (submission, ts) index. Per-status totals
+of current versions are kept in SubmissionStatusCount and adjusted by the
+delta of each change instead of being recounted. A superseded or deleted
+version leaves the counts and its final event moves it to SUPERSEDED or
+DELETED.
+
+The submission_status_counts management command prints the counts, rebuilds
+them, or reads them back as of a past moment.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.utils import timezone
+
+from .models import IFRS17Submission, SubmissionEvent, SubmissionStatusCount
+
+
+TRANSITIONS = {
+    'draft': ['submitted', 'approved', 'rejected'],
+    'submitted': ['under_review', 'approved', 'rejected'],
+    'under_review': ['approved', 'rejected'],
+    'approved': [],
+    'rejected': [],
+}
+
+REVIEWED_STATUSES = ['approved', 'rejected']
+
+# Pseudo-statuses recorded on the event that retires a version
+SUPERSEDED = 'superseded'
+DELETED = 'deleted'
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+def can_transition(current, target):
+    return target in TRANSITIONS.get(current, [])
+
+
+def sources(target):
+    """Statuses from which target can be reached."""
+    return [status for status, targets in TRANSITIONS.items() if target in targets]
+
+
+def transition(submission, status, user=None, detail='', event='reviewed'):
+    """Move one submission to status, log the event ('reviewed' by default) and return it."""
+    previous = submission.status
+    if not can_transition(previous, status):
+        raise InvalidTransition(f'Cannot move submission from {previous} to {status}')
+
+    with transaction.atomic():
+        submission.status = status
+        if status in REVIEWED_STATUSES:
+            submission.reviewed_by = user
+            submission.review_date = timezone.now()
+        submission.save(update_fields=['status', 'reviewed_by', 'review_date', 'updated_at'])
+        record_event(submission, event, user, previous, status, detail)
+    return submission
+
+
+def supersede(previous, replacement, user=None):
+    """Retire previous in favour of replacement, which must already be saved as the next version."""
+    with transaction.atomic():
+        IFRS17Submission.objects.filter(id=previous.id).update(is_current=False, updated_at=timezone.now())
+        previous.is_current = False
+        adjust_counts({previous.status: -1})
+        record_event(previous, 'overridden', user, to_status=SUPERSEDED,
+                     detail=f'Superseded by version {replacement.version} (#{replacement.id})')
+        record_event(replacement, 'overridden', user,
+                     detail=f'Replaces version {previous.version} (#{previous.id})')
+
+
+def reinstate_previous(deleted):
+    """Make the version a deleted current version superseded current again."""
+    previous = IFRS17Submission.objects.filter(id=deleted.supersedes_id, is_current=False).first()
+    if previous is None:
+        return None
+    IFRS17Submission.objects.filter(id=previous.id).update(is_current=True, updated_at=timezone.now())
+    previous.is_current = True
+    adjust_counts({previous.status: 1})
+    record_event(previous, 'overridden', from_status=SUPERSEDED, to_status=previous.status,
+                 detail=f'Reinstated after version {deleted.version} was deleted')
+    return previous
+
+
+def record_event(submission, event, user=None, from_status=None, to_status=None, detail=''):
+    """Append one event. Statuses default to the submission's current status (no change)."""
+    return SubmissionEvent.objects.create(
+        submission=submission,
+        event=event,
+        from_status=submission.status if from_status is None else from_status,
+        to_status=submission.status if to_status is None else to_status,
+        user=user,
+        detail=detail,
+    )
+
+
+def record_events(events):
+    """Append many events at once from (submission_id, event, user, from_status, to_status, detail) tuples."""
+    now = timezone.now()
+    SubmissionEvent.objects.bulk_create([
+        SubmissionEvent(
+            submission_id=submission_id, event=event, user=user,
+            from_status=from_status, to_status=to_status, detail=detail, ts=now,
+        )
+        for submission_id, event, user, from_status, to_status, detail in events
+    ], batch_size=1000)
+
+
+def adjust_counts(deltas):
+    """Apply {status: change} to the running status counts."""
+    for status, delta in deltas.items():
+        if not delta:
+            continue
+        updated = SubmissionStatusCount.objects.filter(status=status).update(count=F('count') + delta)
+        if not updated:
+            SubmissionStatusCount.objects.get_or_create(status=status, defaults={'count': 0})
+            SubmissionStatusCount.objects.filter(status=status).update(count=F('count') + delta)
+
+
+def count_moves(moves):
+    """Turn (from_status, to_status) pairs into count deltas."""
+    deltas = Counter()
+    for from_status, to_status in moves:
+        deltas[from_status] -= 1
+        deltas[to_status] += 1
+    return deltas
+
+
+def status_counts():
+    """Return {status: number of submissions} for every status."""
+    counts = dict.fromkeys(TRANSITIONS, 0)
+    counts.update(SubmissionStatusCount.objects.values_list('status', 'count'))
+    return counts
+
+
+def rebuild_status_counts():
+    """Recount current statuses from the submissions table, e.g. after rows were changed outside the ORM."""
+    with transaction.atomic():
+        SubmissionStatusCount.objects.all().delete()
+        SubmissionStatusCount.objects.bulk_create([
+            SubmissionStatusCount(status=row['status'], count=row['count'])
+            for row in IFRS17Submission.current.order_by().values('status').annotate(count=Count('id'))
+        ])
+    return status_counts()
+
+
+def status_counts_at(when):
+    """
+    Return {status: number of submissions} as they stood at a past moment,
+    read from the latest event of each submission at that time. Submissions
+    deleted since then still count.
+    """
+    latest = SubmissionEvent.objects.filter(
+        submission_id=OuterRef('submission_id'), ts__lte=when
+    ).order_by('-ts', '-id').values('id')[:1]
+    counts = dict.fromkeys(TRANSITIONS, 0)
+    counts.update(
+        SubmissionEvent.objects.order_by().filter(
+            ts__lte=when, id=Subquery(latest), to_status__in=list(TRANSITIONS)
+        ).values_list('to_status').annotate(count=Count('id'))
+    )
+    return counts
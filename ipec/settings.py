@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 from pathlib import Path
 from decouple import config
 import os
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -49,7 +50,9 @@ TAILWIND_APP_NAME = 'theme'
 NPM_BIN_PATH = 'C:/Program Files/nodejs/npm.cmd'
 
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.profiling.QueryProfilerMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -86,10 +89,49 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Seconds a write waits for another connection's lock (uploads
+            # and background refreshes write concurrently) before failing
+            # with "database is locked"
+            'timeout': config('DATABASE_TIMEOUT', default=20, cast=int),
+        },
     }
 }
 
 
+# Cache
+# The FX, lookup, anomaly and transition caches are invalidated through
+# generation counters kept in the cache, so it must be shared by every worker
+# process: CACHE_URL selects Redis (redis://...) or Memcached
+# (memcached://host:port), otherwise entries are files under CACHE_DIR
+# (default: ipec-cache in the system temp directory, outside the source tree).
+
+CACHE_URL = config('CACHE_URL', default='')
+if CACHE_URL.startswith(('redis://', 'rediss://')):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+elif CACHE_URL.startswith('memcached://'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': CACHE_URL.removeprefix('memcached://'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': config('CACHE_DIR', default=os.path.join(tempfile.gettempdir(), 'ipec-cache')),
+            # Culling drops entries at random, generation counters included, so keep it rare
+            'OPTIONS': {'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=10000, cast=int)},
+        }
+    }
+
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -144,6 +186,109 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# JSON encoder backend for API responses: 'auto' uses orjson when installed, 'stdlib' forces the json module
+JSON_BACKEND = config('JSON_BACKEND', default='auto')
+
+# Number of worker threads running background jobs (report packs, anomaly scans, cube refreshes)
+BACKGROUND_WORKERS = config('BACKGROUND_WORKERS', default=4, cast=int)
+
+# Seconds after which a pack still marked running is assumed lost (e.g. to a restart) and rebuilt
+REPORT_PACK_STALE_SECONDS = config('REPORT_PACK_STALE_SECONDS', default=1800, cast=int)
+
+# Seconds a change log consumer run may hold its cursor before another run can take it over
+CHANGE_CURSOR_LEASE_SECONDS = config('CHANGE_CURSOR_LEASE_SECONDS', default=3600, cast=int)
+
+# Seconds to keep memoised FX rates and consolidated currency totals
+FX_CACHE_TIMEOUT = config('FX_CACHE_TIMEOUT', default=3600, cast=int)
+
+# List pages stop counting rows beyond this and show "N+" instead
+PAGINATION_COUNT_LIMIT = config('PAGINATION_COUNT_LIMIT', default=1000, cast=int)
+ADMIN_COUNT_LIMIT = config('ADMIN_COUNT_LIMIT', default=10000, cast=int)
+
+# Seconds to keep cached filter dropdown lists
+LOOKUP_CACHE_TIMEOUT = config('LOOKUP_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Maximum number of ranked full-text search hits returned
+SEARCH_RESULT_LIMIT = config('SEARCH_RESULT_LIMIT', default=1000, cast=int)
+
+# Largest batch accepted by the bulk review endpoint
+BULK_ACTION_MAX_IDS = config('BULK_ACTION_MAX_IDS', default=10000, cast=int)
+
+# Unreferenced upload blobs older than the grace period are reclaimed in batches
+BLOB_GRACE_SECONDS = config('BLOB_GRACE_SECONDS', default=3600, cast=int)
+BLOB_RECLAIM_BATCH_SIZE = config('BLOB_RECLAIM_BATCH_SIZE', default=500, cast=int)
+
+# Reconciliation breaks: a difference is tolerated up to the larger of the
+# absolute amount and the relative share of the reported figure
+RECONCILIATION_ABS_TOLERANCE = config('RECONCILIATION_ABS_TOLERANCE', default=1.0, cast=float)
+RECONCILIATION_REL_TOLERANCE = config('RECONCILIATION_REL_TOLERANCE', default=0.0005, cast=float)
+
+# Discount-rate sensitivity engine: cash-flow horizon and scenarios per array chunk
+SENSITIVITY_HORIZON_YEARS = config('SENSITIVITY_HORIZON_YEARS', default=40, cast=int)
+SENSITIVITY_SCENARIO_CHUNK = config('SENSITIVITY_SCENARIO_CHUNK', default=64, cast=int)
+
+# Stress testing: balance-sheet assumptions, process pool size (0 = one per CPU)
+# and institutions per evaluated slice
+STRESS_CAPITAL_FACTOR = config('STRESS_CAPITAL_FACTOR', default=0.1, cast=float)
+STRESS_LIABILITY_DURATION = config('STRESS_LIABILITY_DURATION', default=8.0, cast=float)
+STRESS_ASSET_DURATION = config('STRESS_ASSET_DURATION', default=5.0, cast=float)
+STRESS_WORKERS = config('STRESS_WORKERS', default=0, cast=int)
+STRESS_SLICE_SIZE = config('STRESS_SLICE_SIZE', default=250, cast=int)
+
+# Anomaly detection: robust z-score cut-off, smallest peer group scored,
+# smallest quarter-on-quarter change (percent) reported as a jump
+ANOMALY_Z_THRESHOLD = config('ANOMALY_Z_THRESHOLD', default=3.5, cast=float)
+ANOMALY_MIN_PEERS = config('ANOMALY_MIN_PEERS', default=5, cast=int)
+ANOMALY_MIN_JUMP_PCT = config('ANOMALY_MIN_JUMP_PCT', default=50, cast=float)
+ANOMALY_CACHE_TIMEOUT = config('ANOMALY_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Reinsurance concentration: counterparties listed per period and currency
+REINSURANCE_TOP_N = config('REINSURANCE_TOP_N', default=5, cast=int)
+
+# Transition analytics: cached bridges and readiness distributions per period
+TRANSITION_CACHE_TIMEOUT = config('TRANSITION_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Query profiler: share of requests profiled (all of them when DEBUG is on),
+# thresholds that raise a record to WARNING, and slow statements kept per record
+PROFILER_ENABLED = config('PROFILER_ENABLED', default=True, cast=bool)
+PROFILER_SAMPLE_RATE = config('PROFILER_SAMPLE_RATE', default=0.01, cast=float)
+PROFILER_SERVER_TIMING = config('PROFILER_SERVER_TIMING', default=True, cast=bool)
+PROFILER_MAX_QUERIES = config('PROFILER_MAX_QUERIES', default=50, cast=int)
+PROFILER_SLOW_REQUEST_MS = config('PROFILER_SLOW_REQUEST_MS', default=1000, cast=float)
+PROFILER_SLOW_QUERY_MS = config('PROFILER_SLOW_QUERY_MS', default=100, cast=float)
+PROFILER_TOP_QUERIES = config('PROFILER_TOP_QUERIES', default=5, cast=int)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'record': {'format': '%(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'record'},
+    },
+    'loggers': {
+        'core.profiling': {
+            'handlers': ['console'],
+            'level': config('PROFILER_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# Prometheus metrics: directory shared by all worker processes (empty keeps
+# metrics per process), seconds between writes of a worker's values, and an
+# optional bearer token required to scrape /metrics
+METRICS_DIR = config('METRICS_DIR', default=config('PROMETHEUS_MULTIPROC_DIR', default=''))
+METRICS_FLUSH_SECONDS = config('METRICS_FLUSH_SECONDS', default=1.0, cast=float)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Compliance alert thresholds
+ALERT_MIN_SOLVENCY_RATIO = config('ALERT_MIN_SOLVENCY_RATIO', default=100, cast=int)
+ALERT_CONCENTRATION_LIMIT = config('ALERT_CONCENTRATION_LIMIT', default=40, cast=int)
+ALERT_CONCENTRATION_SPIKE = config('ALERT_CONCENTRATION_SPIKE', default=10, cast=int)
+SUBMISSION_DEADLINE_DAYS = config('SUBMISSION_DEADLINE_DAYS', default=45, cast=int)
+
 # Authentication settings
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'